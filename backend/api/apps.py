@@ -5,4 +5,9 @@ class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
     def ready(self):
-        import api.signals
\ No newline at end of file
+        import api.signals
+        from django.db.backends.signals import connection_created
+        from pymongo import monitoring
+        from .metricas import ListenerMongo, instalar_wrapper
+        connection_created.connect(instalar_wrapper)
+        monitoring.register(ListenerMongo())
\ No newline at end of file
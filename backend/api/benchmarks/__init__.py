@@ -0,0 +1,8 @@
+"""
+Suite de benchmarks de la API (ver `manage.py benchmark`).
+
+- datos.py: siembra volúmenes configurables de usuarios, proyectos y tareas.
+- escenarios.py: una o más peticiones por cada ruta de api/urls.py.
+- medicion.py: latencia p50/p95, cantidad de queries, memoria pico y
+  comparación contra un baseline guardado en JSON.
+"""
@@ -0,0 +1,121 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from api.models import EstadoTarea, Proyecto, Tarea
+
+"""
+Datos sembrados para los benchmarks, reproducibles con una semilla.
+"""
+
+LOTE = 5000
+# Distribución aproximada de estados en un tablero real
+ESTADOS = ((EstadoTarea.TODO, 0.4), (EstadoTarea.IN_PROGRESS, 0.3), (EstadoTarea.DONE, 0.3))
+PASSWORD = 'bench-password'
+# Vocabulario para títulos y descripciones (búsqueda de texto completo)
+PALABRAS = (
+    'revisar informe anual presupuesto cliente migrar servidor base datos diseño pantalla '
+    'login reporte ventas factura pago error corregir desplegar producción prueba integración '
+    'documentar manual usuario reunión equipo planificar sprint backlog tablero indicador '
+    'correo notificación exportar importar archivo búsqueda índice rendimiento consulta'
+).split()
+
+
+@contextmanager
+def _fechas_manuales(*modelos):
+    # Permite fijar created_at/updated_at al sembrar (auto_now lo pisaría)
+    campos = [
+        (campo, campo.auto_now, campo.auto_now_add)
+        for modelo in modelos
+        for campo in modelo._meta.concrete_fields
+        if getattr(campo, 'auto_now', False) or getattr(campo, 'auto_now_add', False)
+    ]
+    for campo, _, _ in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in campos:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+def _fechas(azar, ahora):
+    creado = ahora - timedelta(days=azar.random() * 90)
+    if azar.random() < 0.2:
+        return creado, None, None
+    # Repartidas en unos tres años (dos hacia atrás y uno hacia adelante), como
+    # un historial real: una ventana de días sólo toca una fracción de las filas
+    inicio = (ahora - timedelta(days=azar.randint(-365, 2 * 365))).date()
+    return creado, inicio, inicio + timedelta(days=azar.randint(1, 60))
+
+
+def _frase(azar, palabras):
+    return ' '.join(azar.choice(PALABRAS) for _ in range(palabras))
+
+
+def sembrar(usuarios, proyectos, tareas, semilla=42):
+    """
+    Crea ``usuarios`` (el primero staff), ``proyectos`` y ``tareas``.
+    Devuelve el contexto que usan los escenarios (usuarios e ids de ejemplo).
+    """
+    azar = random.Random(semilla)
+    ahora = timezone.now()
+    clave = make_password(PASSWORD)
+
+    User.objects.bulk_create([
+        User(username=f'bench{i}', email=f'bench{i}@example.com', password=clave, is_staff=(i == 0), is_superuser=(i == 0))
+        for i in range(usuarios)
+    ], batch_size=LOTE)
+    ids_usuarios = list(User.objects.filter(username__startswith='bench').order_by('id').values_list('id', flat=True))
+
+    with _fechas_manuales(Proyecto, Tarea):
+        nuevos = []
+        for i in range(proyectos):
+            creado, inicio, fin = _fechas(azar, ahora)
+            nuevos.append(Proyecto(
+                name=f'Proyecto {i} {_frase(azar, 2)}', description=_frase(azar, 12),
+                fecha_inicio=inicio, fecha_fin=fin, creador_id=azar.choice(ids_usuarios),
+                created_at=creado, updated_at=creado,
+            ))
+        Proyecto.objects.bulk_create(nuevos, batch_size=LOTE)
+        ids_proyectos = list(Proyecto.objects.order_by('id').values_list('id', flat=True))
+
+        estados, pesos = zip(*ESTADOS)
+        for desde in range(0, tareas, LOTE):
+            nuevas = []
+            for i in range(desde, min(desde + LOTE, tareas)):
+                creado, inicio, fin = _fechas(azar, ahora)
+                nuevas.append(Tarea(
+                    title=f'{_frase(azar, 4)} {i}', estado=azar.choices(estados, pesos)[0],
+                    fecha_inicio=inicio, fecha_fin=fin,
+                    proyecto_id=azar.choice(ids_proyectos) if azar.random() > 0.1 else None,
+                    asignado_a_id=azar.choice(ids_usuarios) if azar.random() > 0.2 else None,
+                    created_at=creado, updated_at=creado,
+                ))
+            Tarea.objects.bulk_create(nuevas, batch_size=LOTE)
+
+    return contexto()
+
+
+def contexto():
+    """
+    Usuarios e ids de ejemplo de los datos ya sembrados (también sirve para
+    reutilizar una base de prueba con --keepdb).
+    """
+    ids_usuarios = list(User.objects.filter(username__startswith='bench').order_by('id').values_list('id', flat=True))
+    if not ids_usuarios:
+        return None
+    staff = User.objects.get(pk=ids_usuarios[0])
+    normal = User.objects.get(pk=ids_usuarios[min(1, len(ids_usuarios) - 1)])
+    return {
+        'staff': staff,
+        'normal': normal,
+        'password': PASSWORD,
+        'proyecto_id': Proyecto.objects.filter(creador=normal).values_list('id', flat=True).first() or Proyecto.objects.values_list('id', flat=True).first(),
+        'tarea_id': Tarea.objects.filter(asignado_a=normal).values_list('id', flat=True).first(),
+        'tareas_bulk': list(Tarea.objects.filter(asignado_a=normal).values_list('id', flat=True)[:100]),
+    }
@@ -0,0 +1,237 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import get_resolver
+from django.urls.resolvers import URLResolver
+
+from api.bulk import crear_con_ids
+from api.models import Tarea
+
+"""
+Escenarios: una petición representativa por ruta de api/urls.py (y algunas
+variantes). Las rutas sin escenario se informan para no perder cobertura.
+
+COMPARACIONES junta escenarios que hacen el mismo trabajo antes y después
+de una optimización (p. ej. lo que descargaba el dashboard contra el
+resumen calculado en la base).
+"""
+
+
+class Escenario:
+    def __init__(self, nombre, ruta, metodo, path, datos=None, usuario='normal', mongo=False, multipart=False,
+                 preparar=None, entorno=None, token=False):
+        self.nombre = nombre
+        self.ruta = ruta  # nombre de la URL en api/urls.py
+        self.metodo = metodo
+        self.path = path  # str o callable(contexto) -> str
+        self.datos = datos  # None, dict/list o callable(contexto)
+        self.usuario = usuario  # 'normal', 'staff' o None (anónimo)
+        self.mongo = mongo
+        self.multipart = multipart  # datos como formulario (subida de archivos)
+        self.preparar = preparar  # callable(contexto) antes de cada petición, fuera de la medición
+        self.entorno = entorno  # callable() -> context manager activo mientras corre el escenario
+        self.token = token  # autenticar con Authorization: Bearer en vez de sesión
+
+    def construir(self, contexto):
+        path = self.path(contexto) if callable(self.path) else self.path
+        datos = self.datos(contexto) if callable(self.datos) else self.datos
+        return path, datos
+
+
+def _ventana(dias):
+    # Ventana que empieza hoy, dentro del rango de fechas sembradas (ver datos._fechas)
+    desde = date.today()
+    return lambda contexto: f'/api/timeline/?from={desde}&to={desde + timedelta(days=dias - 1)}'
+
+
+def _tareas_desechables(cantidad):
+    # Tareas nuevas en el proyecto del usuario normal para los escenarios que borran
+    def preparar(contexto):
+        # crear_con_ids: bulk_create no devuelve los ids en SQLite
+        tareas = crear_con_ids(Tarea, [
+            Tarea(title=f'desechable {i}', proyecto_id=contexto['proyecto_id']) for i in range(cantidad)
+        ])
+        contexto['desechables'] = [tarea.pk for tarea in tareas]
+    return preparar
+
+
+def _invalidar_indicadores(contexto):
+    from api.indicadores import repositorio_indicadores
+
+    repositorio_indicadores.invalidar()
+
+
+def _indicadores_djongo():
+    # list() de ModelViewSet: queryset de djongo + ModelSerializer, como antes del repositorio
+    from rest_framework import viewsets
+
+    from api.views import DashboardIndicatorViewSet
+
+    return mock.patch.object(DashboardIndicatorViewSet, 'list', viewsets.ReadOnlyModelViewSet.list)
+
+
+def _sin_lectura_rapida():
+    # list() sin plan de lectura: vuelve al ModelSerializer (ver api/lectura.py)
+    return mock.patch('api.lectura.plan_lectura', return_value=None)
+
+
+def _archivo_tareas(contexto, filas):
+    lineas = [f"importada {i},todo,{contexto['proyecto_id']}" for i in range(filas)]
+    return SimpleUploadedFile('t.csv', ('title,estado,proyecto\n' + '\n'.join(lineas)).encode())
+
+
+ESCENARIOS = [
+    Escenario('api-root', 'api-root', 'get', '/api/'),
+    Escenario('users', 'user-list', 'get', '/api/users/', usuario='staff'),
+    Escenario('users-pagina', 'user-list', 'get', '/api/users/?page_size=100', usuario='staff'),
+    Escenario('user', 'user-detail', 'get', lambda c: f"/api/users/{c['normal'].pk}/", usuario='staff'),
+    Escenario('indicadores', 'dashboardindicator-list', 'get', '/api/dashboard-stats/', mongo=True),
+    Escenario('indicadores-sin-cache', 'dashboardindicator-list', 'get', '/api/dashboard-stats/', mongo=True,
+              preparar=_invalidar_indicadores),
+    Escenario('indicadores-djongo', 'dashboardindicator-list', 'get', '/api/dashboard-stats/', mongo=True,
+              entorno=_indicadores_djongo),
+    Escenario('indicador', 'dashboardindicator-detail', 'get', '/api/dashboard-stats/1/', mongo=True),
+    Escenario('proyectos', 'proyecto-list', 'get', '/api/projects/'),
+    Escenario('proyectos-staff', 'proyecto-list', 'get', '/api/projects/', usuario='staff'),
+    Escenario('proyectos-staff-serializer', 'proyecto-list', 'get', '/api/projects/', usuario='staff',
+              entorno=_sin_lectura_rapida),
+    Escenario('proyectos-pagina', 'proyecto-list', 'get', '/api/projects/?page_size=100', usuario='staff'),
+    Escenario('proyectos-rollups-10', 'proyecto-list', 'get', '/api/projects/?include=rollups,tasks&page_size=10',
+              usuario='staff'),
+    Escenario('proyectos-rollups-1000', 'proyecto-list', 'get', '/api/projects/?include=rollups,tasks&page_size=1000',
+              usuario='staff'),
+    Escenario('proyectos-rollups', 'proyecto-list', 'get', '/api/projects/?include=rollups'),
+    Escenario('proyectos-export', 'proyecto-export', 'get', '/api/projects/export/', usuario='staff'),
+    Escenario('proyectos-import', 'proyecto-import', 'post', '/api/projects/import/', usuario='staff', multipart=True,
+              datos=lambda c: {'archivo': SimpleUploadedFile('p.csv', b'name\n' + b'importado\n' * 200)}),
+    Escenario('proyecto', 'proyecto-detail', 'get', lambda c: f"/api/projects/{c['proyecto_id']}/", usuario='staff'),
+    Escenario('proyecto-rollups', 'proyecto-detail', 'get',
+              lambda c: f"/api/projects/{c['proyecto_id']}/?include=rollups,tasks", usuario='staff'),
+    Escenario('tareas', 'tarea-list', 'get', '/api/tasks/'),
+    Escenario('tareas-serializer', 'tarea-list', 'get', '/api/tasks/', entorno=_sin_lectura_rapida),
+    Escenario('tareas-staff', 'tarea-list', 'get', '/api/tasks/', usuario='staff'),
+    Escenario('tareas-pagina', 'tarea-list', 'get', '/api/tasks/?page_size=100', usuario='staff'),
+    Escenario('tareas-estado-pagina', 'tarea-list', 'get', '/api/tasks/?estado=in_progress&page_size=50', usuario='staff'),
+    Escenario('tareas-filtro', 'tarea-list', 'get', '/api/tasks/?estado=done&fields=id,title', usuario='staff'),
+    Escenario('tareas-export', 'tarea-export', 'get', '/api/tasks/export/', usuario='staff'),
+    Escenario('tareas-export-ndjson', 'tarea-export', 'get', '/api/tasks/export/?formato=ndjson', usuario='staff'),
+    Escenario('tareas-import', 'tarea-import', 'post', '/api/tasks/import/', usuario='staff', multipart=True,
+              datos=lambda c: {'archivo': _archivo_tareas(c, 1000)}),
+    Escenario('tarea', 'tarea-detail', 'get', lambda c: f"/api/tasks/{c['tarea_id']}/"),
+    Escenario('tareas-bulk', 'tarea-bulk', 'patch', '/api/tasks/bulk/',
+              datos=lambda c: [{'id': pk, 'estado': 'in_progress'} for pk in c['tareas_bulk']]),
+    Escenario('tareas-bulk-crear', 'tarea-bulk', 'post', '/api/tasks/bulk/',
+              datos=lambda c: [{'title': f'bulk {i}', 'proyecto': c['proyecto_id']} for i in range(100)]),
+    Escenario('tareas-bulk-eliminar', 'tarea-bulk', 'delete', '/api/tasks/bulk/',
+              datos=lambda c: c['desechables'], preparar=_tareas_desechables(100)),
+    Escenario('tarea-crear', 'tarea-list', 'post', '/api/tasks/',
+              datos=lambda c: {'title': 'nueva', 'proyecto': c['proyecto_id']}),
+    Escenario('tarea-editar', 'tarea-detail', 'patch', lambda c: f"/api/tasks/{c['tarea_id']}/",
+              datos={'estado': 'in_progress'}),
+    Escenario('tarea-eliminar', 'tarea-detail', 'delete', lambda c: f"/api/tasks/{c['desechables'][0]}/",
+              preparar=_tareas_desechables(1)),
+    Escenario('me', 'get_current_user', 'get', '/api/me/'),
+    Escenario('me-token', 'get_current_user', 'get', '/api/me/', token=True),
+    Escenario('dashboard-summary', 'dashboard_summary', 'get', '/api/dashboard/summary/'),
+    Escenario('dashboard-summary-staff', 'dashboard_summary', 'get', '/api/dashboard/summary/', usuario='staff'),
+    Escenario('dashboard', 'dashboard', 'get', '/api/dashboard/', mongo=True),
+    Escenario('busqueda', 'search', 'get', '/api/search/?q=informe+anual'),
+    Escenario('busqueda-staff', 'search', 'get', '/api/search/?q=informe+anual', usuario='staff'),
+    Escenario('busqueda-prefijo', 'search', 'get', '/api/search/?q=migr&tipo=tareas', usuario='staff'),
+    Escenario('cambios-cursor', 'changes', 'get', '/api/changes/'),
+    Escenario('cambios', 'changes', 'get', '/api/changes/?since=0'),
+    Escenario('cambios-staff', 'changes', 'get', '/api/changes/?since=0', usuario='staff'),
+    Escenario('timeline', 'timeline', 'get', _ventana(7)),
+    Escenario('timeline-staff-dia', 'timeline', 'get', _ventana(1), usuario='staff'),
+    Escenario('timeline-staff', 'timeline', 'get', _ventana(7), usuario='staff'),
+    Escenario('timeline-staff-mes', 'timeline', 'get', _ventana(31), usuario='staff'),
+    Escenario('metrics', 'metrics', 'get', '/api/metrics/', usuario='staff'),
+    Escenario('login', 'login', 'post', '/api/login/', usuario=None,
+              datos=lambda c: {'username': c['normal'].username, 'password': c['password']}),
+    Escenario('login-token', 'login', 'post', '/api/login/', usuario=None,
+              datos=lambda c: {'username': c['normal'].username, 'password': c['password'], 'modo': 'token'}),
+    Escenario('logout', 'logout', 'post', '/api/logout/'),
+    Escenario('token-refresh', 'token_refresh', 'post', '/api/token/refresh/', usuario=None,
+              datos={'refresh': 'invalido'}),
+    Escenario('token-revoke', 'token_revoke', 'post', '/api/token/revoke/', usuario=None,
+              datos={'refresh': 'invalido'}),
+    Escenario('password-reset', 'password_reset_request', 'post', '/api/password-reset/', usuario=None,
+              datos=lambda c: {'email': c['normal'].email}),
+    Escenario('password-reset-confirm', 'password_reset_confirm', 'post', '/api/password-reset-confirm/', usuario=None,
+              datos={'uidb64': 'x', 'token': 'x', 'new_password': 'x'}),
+]
+
+
+# nombre -> (escenarios de antes, escenarios de después); se suman los p50
+COMPARACIONES = {
+    # El dashboard descargaba todos los proyectos y tareas visibles
+    'dashboard': (['proyectos', 'tareas'], ['dashboard-summary']),
+    'dashboard-staff': (['proyectos-staff', 'tareas-staff'], ['dashboard-summary-staff']),
+    # /api/dashboard/ (PostgreSQL y Mongo en paralelo) contra las dos peticiones seguidas
+    'dashboard-completo': (['dashboard-summary', 'indicadores'], ['dashboard']),
+    # 100 tareas de a una contra una sola petición a /api/tasks/bulk/
+    'bulk-crear': (['tarea-crear'] * 100, ['tareas-bulk-crear']),
+    'bulk-editar': (['tarea-editar'] * 100, ['tareas-bulk']),
+    'bulk-eliminar': (['tarea-eliminar'] * 100, ['tareas-bulk-eliminar']),
+    # Indicadores: djongo + ModelSerializer contra pymongo con proyección (con y sin caché)
+    'indicadores': (['indicadores-djongo'], ['indicadores']),
+    'indicadores-sin-cache': (['indicadores-djongo'], ['indicadores-sin-cache']),
+    # list() sin paginar: ModelSerializer contra el plan de lectura sobre values_list()
+    'lectura-tareas': (['tareas-serializer'], ['tareas']),
+    'lectura-proyectos': (['proyectos-staff-serializer'], ['proyectos-staff']),
+}
+
+
+def rutas_api():
+    """
+    Nombres de todas las rutas bajo /api/ (según el resolver de Django).
+    """
+    nombres = set()
+
+    def recorrer(patrones, prefijo):
+        for patron in patrones:
+            if isinstance(patron, URLResolver):
+                recorrer(patron.url_patterns, prefijo + str(patron.pattern))
+            elif prefijo.startswith('api/') and patron.name:
+                nombres.add(patron.name)
+
+    recorrer(get_resolver().url_patterns, '')
+    return nombres
+
+
+def rutas_sin_escenario():
+    return sorted(rutas_api() - {e.ruta for e in ESCENARIOS})
+
+
+def comparar_escenarios(resultados):
+    """
+    Para cada comparación con todos sus escenarios medidos: p50, p95 y
+    queries sumados de antes y de después, y cuántas veces más rápido (p50)
+    es después.
+    Si algún escenario falló o respondió algo distinto de 2xx, la
+    comparación queda con 'error' en vez de números: medir peticiones
+    fallidas no compara nada.
+    """
+    comparaciones = {}
+    for nombre, (antes, despues) in COMPARACIONES.items():
+        medidos = {e: resultados.get(e) for e in antes + despues}
+        if any(r is None for r in medidos.values()):
+            continue
+        fallidos = sorted(
+            e for e, r in medidos.items()
+            if 'error' in r or any(not 200 <= codigo < 300 for codigo in r['status'])
+        )
+        if fallidos:
+            comparaciones[nombre] = {'error': f"escenarios sin respuesta 2xx: {', '.join(fallidos)}"}
+            continue
+        lados = {}
+        for lado, escenarios in (('antes', antes), ('despues', despues)):
+            lados[lado] = {
+                'p50_ms': round(sum(resultados[e]['p50_ms'] for e in escenarios), 3),
+                'p95_ms': round(sum(resultados[e]['p95_ms'] for e in escenarios), 3),
+                'queries': sum(n for e in escenarios for n in resultados[e]['queries'].values()),
+            }
+        lados['mejora'] = round(lados['antes']['p50_ms'] / lados['despues']['p50_ms'], 1) if lados['despues']['p50_ms'] else None
+        comparaciones[nombre] = lados
+    return comparaciones
@@ -0,0 +1,112 @@
+import contextlib
+import statistics
+import time
+import tracemalloc
+
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from api.tokens import emitir_tokens
+
+"""
+Medición de escenarios y comparación contra un baseline.
+"""
+
+
+def _cliente(escenario, contexto):
+    if escenario.usuario is None:
+        return Client()
+    if escenario.token:
+        acceso = emitir_tokens(contexto[escenario.usuario])['access']
+        return Client(HTTP_AUTHORIZATION=f'Bearer {acceso}')
+    cliente = Client()
+    cliente.force_login(contexto[escenario.usuario])
+    return cliente
+
+
+def _ejecutar(cliente, escenario, contexto):
+    path, datos = escenario.construir(contexto)
+    metodo = getattr(cliente, escenario.metodo)
+    if datos is None:
+        respuesta = metodo(path)
+    elif escenario.multipart:
+        respuesta = metodo(path, datos)
+    else:
+        respuesta = metodo(path, datos, content_type='application/json')
+    if getattr(respuesta, 'streaming', False):
+        # Se descarta bloque a bloque, como lo haría el servidor
+        for _ in respuesta.streaming_content:
+            pass
+    return respuesta
+
+
+def _preparar(escenario, contexto):
+    if escenario.preparar is not None:
+        escenario.preparar(contexto)
+
+
+def medir(escenario, contexto, repeticiones, alias=('default',)):
+    """
+    Ejecuta el escenario ``repeticiones`` veces (más un calentamiento) y
+    devuelve latencias, queries por alias, memoria pico y códigos HTTP.
+    """
+    with escenario.entorno() if escenario.entorno else contextlib.nullcontext():
+        cliente = _cliente(escenario, contexto)
+        _preparar(escenario, contexto)
+        _ejecutar(cliente, escenario, contexto)
+
+        latencias, queries, codigos = [], {a: [] for a in alias}, set()
+        for _ in range(repeticiones):
+            if escenario.nombre == 'logout':
+                cliente = _cliente(escenario, contexto)
+            _preparar(escenario, contexto)
+            capturas = [CaptureQueriesContext(connections[a]) for a in alias]
+            for captura in capturas:
+                captura.__enter__()
+            inicio = time.perf_counter()
+            respuesta = _ejecutar(cliente, escenario, contexto)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            for a, captura in zip(alias, capturas):
+                captura.__exit__(None, None, None)
+                queries[a].append(len(captura))
+            codigos.add(respuesta.status_code)
+
+        # La memoria se mide aparte: tracemalloc distorsiona las latencias
+        if escenario.nombre == 'logout':
+            cliente = _cliente(escenario, contexto)
+        _preparar(escenario, contexto)
+        tracemalloc.start()
+        _ejecutar(cliente, escenario, contexto)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    cuantiles = statistics.quantiles(latencias, n=20) if len(latencias) > 1 else latencias * 19
+    return {
+        'ruta': escenario.ruta,
+        'p50_ms': round(statistics.median(latencias), 3),
+        'p95_ms': round(cuantiles[18], 3),
+        'queries': {a: max(v) for a, v in queries.items()},
+        'memoria_pico_kb': round(pico / 1024, 1),
+        'status': sorted(codigos),
+    }
+
+
+def comparar(resultados, baseline, umbral_latencia, umbral_memoria):
+    """
+    Devuelve la lista de regresiones respecto del baseline: p95 o memoria
+    por encima del umbral relativo, o más queries que antes.
+    """
+    regresiones = []
+    for nombre, actual in resultados.items():
+        anterior = baseline.get(nombre)
+        if anterior is None or 'error' in actual or 'error' in anterior:
+            continue
+        if actual['p95_ms'] > anterior['p95_ms'] * (1 + umbral_latencia):
+            regresiones.append(f"{nombre}: p95 {anterior['p95_ms']} -> {actual['p95_ms']} ms")
+        if actual['memoria_pico_kb'] > anterior['memoria_pico_kb'] * (1 + umbral_memoria):
+            regresiones.append(f"{nombre}: memoria {anterior['memoria_pico_kb']} -> {actual['memoria_pico_kb']} KB")
+        for alias, cantidad in actual['queries'].items():
+            if cantidad > anterior['queries'].get(alias, cantidad):
+                regresiones.append(f"{nombre}: queries[{alias}] {anterior['queries'][alias]} -> {cantidad}")
+    return regresiones
@@ -0,0 +1,166 @@
+import asyncio
+import random
+import re
+import resource
+import statistics
+import threading
+import time
+import tracemalloc
+
+from api.cambios import Audiencia
+from api.eventos import BrokerMemoria
+from api.sse import transmitir
+
+"""
+Prueba de carga del canal SSE (`manage.py benchmark_sse`).
+
+Todo corre en un solo event loop, como dentro de un worker de uvicorn:
+N conexiones ociosas atendidas por ``transmitir`` (con send/receive
+simulados, sin sockets) sobre un BrokerMemoria propio, y eventos
+publicados desde otro hilo, igual que los publica el on_commit de una
+vista síncrona. Se mide la memoria por conexión y la latencia de fan-out:
+desde ``publicar`` hasta que el mensaje llega a ``send`` de cada conexión
+que debía recibirlo.
+"""
+
+_ID = re.compile(rb'^id: (\d+)$', re.MULTILINE)
+
+
+def _percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+class _Conexion:
+    """
+    Extremo ASGI simulado: ``receive`` espera hasta ``cerrar`` y ``send``
+    anota la latencia de cada ``id:`` recibido.
+    """
+    def __init__(self, publicados, latencias):
+        self.publicados = publicados
+        self.latencias = latencias
+        self._cierre = asyncio.get_running_loop().create_future()
+
+    async def receive(self):
+        await self._cierre
+        return {'type': 'http.disconnect'}
+
+    async def send(self, mensaje):
+        if mensaje['type'] != 'http.response.body':
+            return
+        ahora = time.perf_counter()
+        for seq in _ID.findall(mensaje['body']):
+            self.latencias.append(ahora - self.publicados[int(seq)])
+
+    def cerrar(self):
+        if not self._cierre.done():
+            self._cierre.set_result(None)
+
+
+def _audiencias(cantidad, usuarios, proyectos, por_usuario, staff, azar):
+    duenos = {}
+    for proyecto in range(1, proyectos + 1):
+        duenos.setdefault(azar.randint(1, usuarios), []).append(proyecto)
+    audiencias = []
+    for i in range(cantidad):
+        user_id = i % usuarios + 1
+        if azar.random() < staff:
+            audiencias.append(Audiencia(user_id, True))
+        else:
+            audiencias.append(Audiencia(user_id, False, duenos.get(user_id, [])[:por_usuario]))
+    return audiencias
+
+
+def _eventos(cantidad, usuarios, proyectos, azar):
+    return [
+        {
+            'seq': seq, 'tipo': 'tarea.actualizada', 'id': azar.randint(1, 10 ** 6),
+            'payload': {
+                'proyecto': azar.randint(1, proyectos), 'asignado_a': azar.randint(1, usuarios),
+                'estado': 'done', 'estado_anterior': 'todo', 'proyecto_anterior': None, 'asignado_anterior': None,
+            },
+        }
+        for seq in range(1, cantidad + 1)
+    ]
+
+
+def _publicar(broker, eventos, tasa, publicados, costos):
+    pausa = 1 / tasa if tasa else 0
+    for evento in eventos:
+        inicio = publicados[evento['seq']] = time.perf_counter()
+        broker.publicar([evento])
+        costos.append(time.perf_counter() - inicio)
+        if pausa:
+            time.sleep(pausa)
+
+
+async def _carga(opciones):
+    azar = random.Random(opciones['semilla'])
+    broker = BrokerMemoria()
+    publicados, latencias, costos = {}, [], []
+    audiencias = _audiencias(
+        opciones['suscriptores'], opciones['usuarios'], opciones['proyectos'],
+        opciones['proyectos_por_usuario'], opciones['staff'], azar,
+    )
+
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    inicio = time.perf_counter()
+    conexiones = [_Conexion(publicados, latencias) for _ in audiencias]
+    tareas = [
+        asyncio.ensure_future(transmitir(c.send, c.receive, a, origen=broker, latido=opciones['latido']))
+        for c, a in zip(conexiones, audiencias)
+    ]
+    while broker.suscriptores < len(tareas):
+        await asyncio.sleep(0.01)
+    conexion_s = time.perf_counter() - inicio
+    await asyncio.sleep(0.1)
+    memoria = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop()
+
+    # Ociosas: sólo deberían despertar por el latido
+    await asyncio.sleep(opciones['ocioso'])
+
+    eventos = _eventos(opciones['eventos'], opciones['usuarios'], opciones['proyectos'], azar)
+    esperadas = sum(1 for evento in eventos for audiencia in audiencias if audiencia(evento))
+    hilo = threading.Thread(target=_publicar, args=(broker, eventos, opciones['tasa'], publicados, costos))
+    publicacion = time.perf_counter()
+    hilo.start()
+    while hilo.is_alive():
+        await asyncio.sleep(0.05)
+    # Se espera a que se vacíen las colas
+    anteriores = -1
+    while anteriores != len(latencias):
+        anteriores = len(latencias)
+        await asyncio.sleep(0.2)
+    publicacion_s = time.perf_counter() - publicacion
+
+    for conexion in conexiones:
+        conexion.cerrar()
+    await asyncio.gather(*tareas)
+
+    ms = [s * 1000 for s in latencias]
+    return {
+        'suscriptores': len(tareas),
+        'conexion_s': round(conexion_s, 3),
+        'memoria_por_suscriptor_kb': round(memoria / len(tareas) / 1024, 2),
+        'rss_max_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'eventos': opciones['eventos'],
+        'entregas': len(latencias),
+        'entregas_esperadas': esperadas,
+        'publicacion_s': round(publicacion_s, 3),
+        'publicar_ms_p50': round(statistics.median(costos) * 1000, 3) if costos else None,
+        'latencia_ms': {
+            'p50': round(_percentil(ms, 0.5), 2) if ms else None,
+            'p95': round(_percentil(ms, 0.95), 2) if ms else None,
+            'p99': round(_percentil(ms, 0.99), 2) if ms else None,
+            'max': round(max(ms), 2) if ms else None,
+        },
+        'suscriptores_al_final': broker.suscriptores,
+    }
+
+
+def medir_carga(**opciones):
+    return asyncio.run(_carga(opciones))
@@ -0,0 +1,167 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections, models, router, transaction
+from django.utils import timezone
+from rest_framework import status
+
+from .eliminacion import borrar_lote
+from .models import Proyecto, Tarea
+from .outbox import registrar_eventos, payload_tarea
+from .serializers import TareaSerializer, TareaBulkSerializer
+
+"""
+Operaciones masivas sobre Tareas (POST/PATCH/DELETE /api/tasks/bulk/).
+
+Cada item se valida por separado para poder informar errores por item,
+pero las escrituras se hacen con bulk_create / bulk_update / un solo
+DELETE (con sus eventos en un solo INSERT) dentro de una transacción por
+lote.
+"""
+
+
+def _ids_referenciados(items, campo):
+    ids = set()
+    for item in items:
+        valor = item.get(campo) if isinstance(item, dict) else item
+        if isinstance(valor, bool):
+            continue
+        try:
+            ids.add(int(valor))
+        except (TypeError, ValueError):
+            pass
+    return ids
+
+
+def _precargar_referencias(items):
+    # Un SELECT por tabla referenciada, en vez de uno por item. Los
+    # proyectos de baja diferida quedan fuera: no aceptan tareas nuevas
+    return {
+        'proyecto': Proyecto.objects.filter(eliminado_at__isnull=True).in_bulk(_ids_referenciados(items, 'proyecto')),
+        'asignado_a': User.objects.in_bulk(_ids_referenciados(items, 'asignado_a')),
+    }
+
+
+def _es_visible(user, tarea):
+    # Mismas reglas que tareas_visibles(): staff, creador del proyecto o asignado
+    if user.is_staff or tarea.asignado_a_id == user.pk:
+        return True
+    return tarea.proyecto is not None and tarea.proyecto.creador_id == user.pk
+
+
+def _error(indice, codigo, errores):
+    return {'index': indice, 'status': codigo, 'errors': errores}
+
+
+def _sin_permiso(indice):
+    return _error(indice, status.HTTP_403_FORBIDDEN, {'detail': 'No tienes permiso sobre esta tarea.'})
+
+
+def crear_con_ids(modelo, objetos, batch_size=None):
+    """
+    bulk_create que deja el pk en cada objeto también en las bases que no lo
+    devuelven en el INSERT (SQLite con Django 3.2). Ahí inserta igual en
+    bloque y recupera los ids con un SELECT max(id) en la misma transacción:
+    la transacción tiene el lock de escritura desde el primer INSERT, así
+    que los ids del bloque son los últimos y consecutivos. (En MySQL hace
+    falta innodb_autoinc_lock_mode <= 1 para la misma garantía.)
+    """
+    alias = router.db_for_write(modelo)
+    batch_size = batch_size or settings.API_BULK_BATCH_SIZE
+    consulta = modelo.objects.using(alias)
+    if connections[alias].features.can_return_rows_from_bulk_insert or not objetos:
+        return consulta.bulk_create(objetos, batch_size=batch_size)
+    with transaction.atomic(using=alias):
+        consulta.bulk_create(objetos, batch_size=batch_size)
+        ultimo = consulta.aggregate(ultimo=models.Max('pk'))['ultimo']
+    for pk, objeto in zip(range(ultimo - len(objetos) + 1, ultimo + 1), objetos):
+        objeto.pk = pk
+    return objetos
+
+
+def crear_tareas(user, items):
+    contexto = {'precargados': _precargar_referencias(items)}
+    resultados, nuevas = [], []
+
+    for indice, item in enumerate(items):
+        serializer = TareaBulkSerializer(data=item, context=contexto)
+        if not serializer.is_valid():
+            resultados.append(_error(indice, status.HTTP_400_BAD_REQUEST, serializer.errors))
+            continue
+        tarea = Tarea(**serializer.validated_data)
+        if not _es_visible(user, tarea):
+            resultados.append(_sin_permiso(indice))
+            continue
+        nuevas.append((indice, tarea))
+
+    with transaction.atomic():
+        creadas = crear_con_ids(Tarea, [tarea for _, tarea in nuevas])
+        # bulk_create no dispara post_save: los eventos se registran en bloque
+        registrar_eventos(('tarea.creada', t.pk, payload_tarea(t)) for t in creadas)
+
+    datos = TareaSerializer([tarea for _, tarea in nuevas], many=True).data
+    for (indice, _), dato in zip(nuevas, datos):
+        resultados.append({'index': indice, 'status': status.HTTP_201_CREATED, 'data': dato})
+    return sorted(resultados, key=lambda r: r['index'])
+
+
+def actualizar_tareas(user, items, queryset):
+    contexto = {'precargados': _precargar_referencias(items)}
+    existentes = queryset.select_related('proyecto').in_bulk(_ids_referenciados(items, 'id'))
+    resultados, modificadas, campos = [], [], set()
+
+    for indice, item in enumerate(items):
+        tarea_id = _ids_referenciados([item], 'id')
+        tarea = existentes.get(tarea_id.pop()) if tarea_id else None
+        if tarea is None:
+            resultados.append(_error(indice, status.HTTP_404_NOT_FOUND, {'id': 'Tarea no encontrada.'}))
+            continue
+        serializer = TareaBulkSerializer(tarea, data=item, partial=True, context=contexto)
+        if not serializer.is_valid():
+            resultados.append(_error(indice, status.HTTP_400_BAD_REQUEST, serializer.errors))
+            continue
+        for campo, valor in serializer.validated_data.items():
+            setattr(tarea, campo, valor)
+        if not _es_visible(user, tarea):
+            resultados.append(_sin_permiso(indice))
+            continue
+        campos.update(serializer.validated_data)
+        modificadas.append((indice, tarea))
+
+    if campos:
+        unicas = list({tarea.pk: tarea for _, tarea in modificadas}.values())
+        # bulk_update no aplica auto_now: updated_at se asigna a mano
+        ahora = timezone.now()
+        for tarea in unicas:
+            tarea.updated_at = ahora
+        with transaction.atomic():
+            Tarea.objects.bulk_update(
+                unicas,
+                fields=sorted(campos | {'updated_at'}),
+                batch_size=settings.API_BULK_BATCH_SIZE,
+            )
+            registrar_eventos(('tarea.actualizada', t.pk, payload_tarea(t)) for t in unicas)
+
+    datos = TareaSerializer([tarea for _, tarea in modificadas], many=True).data
+    for (indice, _), dato in zip(modificadas, datos):
+        resultados.append({'index': indice, 'status': status.HTTP_200_OK, 'data': dato})
+    return sorted(resultados, key=lambda r: r['index'])
+
+
+def eliminar_tareas(user, items, queryset):
+    ids = _ids_referenciados(items, 'id')
+    visibles = set(queryset.filter(id__in=ids).values_list('id', flat=True))
+
+    # Sin Collector ni un post_delete por tarea: las columnas del evento, un
+    # solo INSERT de eventos y un DELETE (ver eliminacion.borrar_lote)
+    if visibles:
+        with transaction.atomic():
+            borrar_lote(models.Q(id__in=visibles), len(visibles))
+
+    resultados = []
+    for indice, item in enumerate(items):
+        tarea_id = _ids_referenciados([item], 'id')
+        if tarea_id and tarea_id.pop() in visibles:
+            resultados.append({'index': indice, 'status': status.HTTP_204_NO_CONTENT})
+        else:
+            resultados.append(_error(indice, status.HTTP_404_NOT_FOUND, {'id': 'Tarea no encontrada.'}))
+    return resultados
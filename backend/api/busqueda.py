@@ -0,0 +1,107 @@
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+"""
+Búsqueda de texto completo sobre proyectos (name, description) y tareas
+(title), con resultados ordenados por relevancia.
+
+- PostgreSQL: columna generada ``busqueda`` (tsvector, índice GIN, ver la
+  migración 0009) contra to_tsquery con la configuración 'spanish'.
+- SQLite: tablas FTS5 <tabla>_fts (misma migración), rango con bm25().
+- Otros motores: icontains (sin índice).
+
+Cada término se busca como prefijo y todos deben aparecer (AND).
+"""
+
+CONFIG = 'spanish'
+# Campos indexados (el fallback genérico busca en ellos con icontains)
+CAMPOS = {
+    'Proyecto': ('name', 'description'),
+    'Tarea': ('title',),
+}
+MAX_TERMINOS = 10
+
+
+def crear_fts_sqlite(schema_editor, tabla, campos):
+    """
+    Tabla FTS5 de contenido externo <tabla>_fts y los triggers que la
+    mantienen al día. Idempotente. Las migraciones (0009 y las que rehacen
+    la tabla en SQLite, que pierde los triggers) usan la copia congelada de
+    migrations/_historico.py: si esto cambia, hace falta una migración nueva.
+    """
+    columnas = ', '.join(campos)
+    nuevos = ', '.join(f'new.{c}' for c in campos)
+    viejos = ', '.join(f'old.{c}' for c in campos)
+    fts = f'{tabla}_fts'
+    for sufijo in ('ai', 'ad', 'au'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {fts}_{sufijo}')
+    for sql in (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columnas}, content='{tabla}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabla} BEGIN "
+        f"INSERT INTO {fts}(rowid, {columnas}) VALUES (new.id, {nuevos}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabla} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columnas}) VALUES ('delete', old.id, {viejos}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {tabla} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columnas}) VALUES ('delete', old.id, {viejos}); "
+        f"INSERT INTO {fts}(rowid, {columnas}) VALUES (new.id, {nuevos}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ):
+        schema_editor.execute(sql)
+
+
+def terminos(q):
+    # Sólo palabras: nada de la sintaxis de tsquery / FTS5 llega a la base
+    return re.findall(r'\w+', (q or '').lower())[:MAX_TERMINOS]
+
+
+def _postgres(queryset, palabras):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+
+    vector = RawSQL(f'{queryset.model._meta.db_table}.busqueda', [], output_field=SearchVectorField())
+    consulta = SearchQuery(' & '.join(f'{p}:*' for p in palabras), config=CONFIG, search_type='raw')
+    return queryset.alias(vector_busqueda=vector).filter(vector_busqueda=consulta).annotate(
+        rango=SearchRank(vector, consulta),
+    )
+
+
+def _sqlite(queryset, palabras):
+    tabla = queryset.model._meta.db_table
+    fts = f'{tabla}_fts'
+    consulta = ' '.join(f'"{p}"*' for p in palabras)
+    # bm25() es menor cuanto más relevante: se invierte para ordenar descendente
+    return queryset.filter(
+        id__in=RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [consulta]),
+    ).annotate(rango=RawSQL(
+        f'SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND rowid = {tabla}.id', [consulta],
+        output_field=FloatField(),
+    ))
+
+
+def _generico(queryset, campos, palabras):
+    filtro = Q()
+    for palabra in palabras:
+        filtro &= Q(*[Q(**{f'{campo}__icontains': palabra}) for campo in campos], _connector=Q.OR)
+    return queryset.filter(filtro).annotate(rango=Value(0.0, output_field=FloatField()))
+
+
+def buscar(queryset, q, limite=None):
+    """
+    Filtra ``queryset`` (ya restringido a lo visible) por ``q`` y lo
+    devuelve anotado con ``rango``, del más al menos relevante.
+    """
+    palabras = terminos(q)
+    if not palabras:
+        return queryset.none()
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        resultado = _postgres(queryset, palabras)
+    elif vendor == 'sqlite':
+        resultado = _sqlite(queryset, palabras)
+    else:
+        resultado = _generico(queryset, CAMPOS[queryset.model.__name__], palabras)
+    return resultado.order_by('-rango', '-id')[:limite or settings.BUSQUEDA_LIMITE]
@@ -0,0 +1,166 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from .models import EventoOutbox, Proyecto
+from .outbox import agotados
+
+"""
+Feed de cambios (/api/changes/?since=<cursor>).
+
+La secuencia de cambios es el id de EventoOutbox: cada alta, modificación
+o baja de Proyecto/Tarea ya deja ahí una fila en la misma transacción (ver
+signals.py, bulk.py e importacion.py), también las bajas (lápidas). El
+feed lee los eventos posteriores al cursor que le incumben al usuario, se
+queda con el último de cada objeto y devuelve el estado actual de la fila
+o una lápida si ya no existe (o dejó de ser visible).
+
+Los ids se asignan al insertar, no al confirmar: una transacción lenta
+puede confirmar un id menor que otro ya leído. Por eso el feed sólo
+avanza hasta los eventos con más de settings.CAMBIOS_MARGEN_SEGUNDOS de
+antigüedad, que se asume mayor que lo que dura una escritura.
+"""
+
+MODELOS = ('proyecto', 'tarea')
+
+
+class CursorVencido(Exception):
+    """
+    Los eventos posteriores al cursor ya se purgaron: hay que recargar todo.
+    """
+
+
+def horizonte():
+    """
+    Menor id todavía presente de la secuencia contigua (purgar_procesados
+    sólo borra prefijos; los eventos que agotaron sus intentos quedan
+    fuera de la cuenta porque pueden quedar detrás del prefijo borrado).
+    """
+    return EventoOutbox.objects.exclude(agotados()).aggregate(minimo=models.Min('id'))['minimo']
+
+
+def _tope(desde):
+    """
+    Último id que ya se puede entregar: el mayor con más antigüedad que
+    el margen (en PostgreSQL, un recorrido hacia atrás del índice de la pk).
+    """
+    limite = timezone.now() - timedelta(seconds=settings.CAMBIOS_MARGEN_SEGUNDOS)
+    tope = EventoOutbox.objects.filter(id__gt=desde, created_at__lte=limite).aggregate(tope=models.Max('id'))['tope']
+    return desde if tope is None else tope
+
+
+def _relevantes(user):
+    """
+    Eventos que le incumben al usuario: todos para el staff; si no, los de
+    sus proyectos y los de tareas que ve o veía antes del cambio.
+    """
+    eventos = EventoOutbox.objects.filter(
+        models.Q(tipo__startswith='proyecto.') | models.Q(tipo__startswith='tarea.')
+    )
+    if user.is_staff:
+        return eventos
+    mis_proyectos = list(Proyecto.objects.filter(creador=user).values_list('id', flat=True))
+    return eventos.filter(
+        models.Q(tipo__startswith='proyecto.', payload__creador=user.pk)
+        | (models.Q(tipo__startswith='tarea.') & (
+            models.Q(payload__asignado_a=user.pk)
+            | models.Q(payload__asignado_anterior=user.pk)
+            | models.Q(payload__proyecto__in=mis_proyectos)
+            | models.Q(payload__proyecto_anterior__in=mis_proyectos)
+        ))
+    )
+
+
+class Audiencia:
+    """
+    Las mismas reglas que _relevantes, evaluadas en memoria sobre cada
+    evento del broker (ver eventos.py / sse.py). Los proyectos del usuario
+    se leen una vez al conectar y se mantienen con los propios eventos.
+    """
+    def __init__(self, user_id, es_staff, proyectos=()):
+        self.user_id = user_id
+        self.es_staff = es_staff
+        self.proyectos = set(proyectos)
+
+    @classmethod
+    def para(cls, user):
+        if user.is_staff:
+            return cls(user.pk, True)
+        return cls(user.pk, False, Proyecto.objects.filter(creador=user).values_list('id', flat=True))
+
+    def __call__(self, evento):
+        if self.es_staff:
+            return True
+        tipo, payload = evento['tipo'], evento['payload']
+        if tipo.startswith('proyecto.'):
+            if payload.get('creador') != self.user_id:
+                return False
+            if tipo == 'proyecto.creado':
+                self.proyectos.add(evento['id'])
+            elif tipo == 'proyecto.eliminado':
+                self.proyectos.discard(evento['id'])
+            return True
+        if tipo.startswith('tarea.'):
+            return (
+                self.user_id in (payload.get('asignado_a'), payload.get('asignado_anterior'))
+                or payload.get('proyecto') in self.proyectos
+                or payload.get('proyecto_anterior') in self.proyectos
+            )
+        return False
+
+
+def cambios_desde(user, desde, visibles, serializers, limite=None):
+    """
+    Devuelve {'cursor', 'mas', 'cambios'} con los cambios posteriores a
+    ``desde`` (None: sólo el cursor actual). ``visibles`` y ``serializers``
+    son diccionarios por modelo ('proyecto', 'tarea') con la función de
+    visibilidad y el serializer de la API.
+
+    Cada cambio es {'seq', 'tipo', 'id', 'accion': 'upsert', 'data'} o
+    {'seq', 'tipo', 'id', 'accion': 'delete'}, en orden de ``seq``. Al
+    borrarse un proyecto el cliente descarta también sus tareas.
+    """
+    limite = limite or settings.CAMBIOS_LIMITE
+    if desde is None:
+        # Primera llamada: sólo el cursor; el cliente carga las colecciones después
+        return {'cursor': _tope(0), 'mas': False, 'cambios': []}
+    minimo = horizonte()
+    if minimo is not None and desde + 1 < minimo:
+        raise CursorVencido()
+    tope = _tope(desde)
+
+    eventos = list(
+        _relevantes(user).filter(id__gt=desde, id__lte=tope)
+        .order_by('id').values_list('id', 'tipo', 'objeto_id')[:limite + 1]
+    )
+    mas = len(eventos) > limite
+    eventos = eventos[:limite]
+    if mas:
+        tope = eventos[-1][0]
+
+    # El último evento de cada objeto decide su posición en el feed
+    ultimos = {}
+    for seq, tipo, objeto_id in eventos:
+        clave = (tipo.split('.', 1)[0], objeto_id)
+        ultimos.pop(clave, None)
+        ultimos[clave] = seq
+
+    filas = {}
+    for modelo in MODELOS:
+        ids = [objeto_id for (m, objeto_id) in ultimos if m == modelo]
+        if ids:
+            encontrados = list(visibles[modelo](user).filter(id__in=ids))
+            datos = serializers[modelo](encontrados, many=True).data
+            filas.update({(modelo, o.pk): d for o, d in zip(encontrados, datos)})
+
+    cambios = []
+    for (modelo, objeto_id), seq in ultimos.items():
+        cambio = {'seq': seq, 'tipo': modelo, 'id': objeto_id}
+        if (modelo, objeto_id) in filas:
+            cambio.update(accion='upsert', data=filas[(modelo, objeto_id)])
+        else:
+            cambio['accion'] = 'delete'
+        cambios.append(cambio)
+    return {'cursor': tope, 'mas': mas, 'cambios': cambios}
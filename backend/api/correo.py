@@ -0,0 +1,115 @@
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CorreoPendiente, CorreoFallido
+
+"""
+Cola de correos salientes.
+
+Las vistas sólo llaman a encolar_correo() (un INSERT) y responden de
+inmediato. El worker (`manage.py enviar_correos`) envía los pendientes en
+lotes reutilizando una sola conexión SMTP abierta. Los envíos fallidos se
+reintentan con backoff exponencial; al agotar los intentos el correo pasa
+a la tabla CorreoFallido (dead-letter).
+
+El diálogo SMTP no corre dentro de una transacción: un servidor colgado
+(hasta EMAIL_TIMEOUT por correo) no debe mantener filas bloqueadas ni una
+transacción abierta. El lote se reclama en una transacción corta que
+corre ``siguiente_intento_at`` MAIL_QUEUE_LEASE segundos (el "lease": los
+otros workers ya no lo ven), se envía fuera de ella y el resultado se
+registra en una segunda transacción corta. Si el worker muere a mitad del
+lote, los correos no enviados vuelven a estar disponibles al vencer el
+lease; si el lease vence mientras se sigue enviando, otro worker puede
+reenviarlos (entrega al menos una vez).
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def encolar_correo(asunto, mensaje, destinatarios, remitente=None):
+    return CorreoPendiente.objects.create(
+        asunto=asunto,
+        mensaje=mensaje,
+        remitente=remitente or settings.DEFAULT_FROM_EMAIL,
+        destinatarios=list(destinatarios),
+    )
+
+
+def _enviar(conexion, correo):
+    mensaje = EmailMessage(
+        subject=correo.asunto,
+        body=correo.mensaje,
+        from_email=correo.remitente,
+        to=correo.destinatarios,
+        connection=conexion,
+    )
+    try:
+        conexion.send_messages([mensaje])
+    except smtplib.SMTPServerDisconnected:
+        # La conexión reutilizada expiró en el servidor: se reabre una vez
+        conexion.close()
+        conexion.send_messages([mensaje])
+
+
+def _registrar_fallo(correo, exc):
+    correo.intentos += 1
+    correo.ultimo_error = str(exc)[:1000]
+    if correo.intentos >= settings.MAIL_QUEUE_MAX_INTENTOS:
+        logger.error("Correo %s descartado tras %d intentos: %s", correo.pk, correo.intentos, exc)
+        CorreoFallido.objects.create(
+            asunto=correo.asunto,
+            mensaje=correo.mensaje,
+            remitente=correo.remitente,
+            destinatarios=correo.destinatarios,
+            created_at=correo.created_at,
+            intentos=correo.intentos,
+            ultimo_error=correo.ultimo_error,
+        )
+        correo.delete()
+        return
+    espera = settings.MAIL_QUEUE_BACKOFF * 2 ** (correo.intentos - 1)
+    correo.siguiente_intento_at = timezone.now() + timedelta(seconds=espera)
+    correo.save(update_fields=['intentos', 'ultimo_error', 'siguiente_intento_at'])
+
+
+def _reclamar(tamano):
+    ahora = timezone.now()
+    with transaction.atomic():
+        correos = list(
+            CorreoPendiente.objects.select_for_update(skip_locked=True)
+            .filter(siguiente_intento_at__lte=ahora)
+            .order_by('siguiente_intento_at', 'id')[:tamano]
+        )
+        lease = ahora + timedelta(seconds=settings.MAIL_QUEUE_LEASE)
+        CorreoPendiente.objects.filter(pk__in=[correo.pk for correo in correos]).update(siguiente_intento_at=lease)
+    return correos
+
+
+def enviar_lote(conexion, tamano=None):
+    """
+    Envía un lote de correos pendientes por ``conexion`` (un backend de
+    correo ya creado, que se mantiene abierto entre lotes).
+    Devuelve la cantidad de correos tomados del lote.
+    """
+    tamano = tamano or settings.MAIL_QUEUE_BATCH_SIZE
+    correos = _reclamar(tamano)
+    enviados, fallidos = [], []
+    for correo in correos:
+        try:
+            _enviar(conexion, correo)
+        except (smtplib.SMTPException, OSError) as exc:
+            conexion.close()
+            fallidos.append((correo, exc))
+        else:
+            enviados.append(correo.pk)
+    with transaction.atomic():
+        CorreoPendiente.objects.filter(pk__in=enviados).delete()
+        for correo, exc in fallidos:
+            _registrar_fallo(correo, exc)
+    return len(correos)
@@ -0,0 +1,164 @@
+from django.conf import settings
+from django.db import connections, models, router, transaction
+from django.utils import timezone
+
+from .models import CLAVES_ESTADO, EventoOutbox, Proyecto, Tarea
+from .outbox import eventos_insertados, payload_proyecto, payload_tarea, registrar_evento, registrar_eventos
+
+"""
+Bajas de proyectos y usuarios sin cargar sus tareas en memoria.
+
+``proyecto.delete()`` / ``user.delete()`` pasan por el Collector de Django:
+por los signals de Tarea lee todas las tareas relacionadas y las borra
+dentro de una sola transacción, que con 100k tareas dura segundos y
+bloquea todas esas filas. En su lugar:
+
+- Las tareas se borran en lotes de settings.API_ELIMINACION_LOTE, cada uno
+  en su transacción. En PostgreSQL es una sola sentencia: DELETE ...
+  RETURNING de las filas del lote encadenado con el INSERT de sus eventos
+  'tarea.eliminada' (el payload se arma en SQL). En el resto, un SELECT
+  acotado de las columnas del evento, los eventos con bulk_create y un
+  DELETE ... WHERE id IN.
+- Al final se bloquea la fila del proyecto (las altas de tareas en él
+  esperan), se borran las que hayan llegado mientras tanto y se borra el
+  proyecto. En PostgreSQL las FKs de Tarea.proyecto, Tarea.asignado_a y
+  Proyecto.creador tienen además ON DELETE CASCADE (ver la migración
+  0013): si algo quedara, lo borra la base y no el Collector.
+- Los proyectos con más de settings.API_ELIMINACION_ASINCRONA tareas se
+  marcan con ``eliminado_at`` (dejan de ser visibles y se emite
+  'proyecto.eliminado' en ese momento) y los purga el worker
+  `manage.py purgar_proyectos`. Sus tareas siguen existiendo hasta que las
+  alcanza la purga, que emite sus eventos igual que la baja inmediata.
+"""
+
+# Columnas que necesita payload_tarea (fuera de PostgreSQL, ver borrar_lote)
+CAMPOS_EVENTO = ('id', 'proyecto_id', 'asignado_a_id', 'estado')
+
+
+# -----------------
+# Borrado en lotes
+# -----------------
+def _sql_postgres(lote_sql, lote_params):
+    """
+    DELETE de las tareas del subquery ``lote_sql`` + INSERT de sus eventos.
+    El payload tiene que coincidir con outbox.payload_tarea de una tarea
+    recién leída (los valores "anteriores" son los actuales).
+    """
+    tarea, evento = Tarea._meta.db_table, EventoOutbox._meta.db_table
+    claves = ' '.join('WHEN %s THEN %s' for _ in CLAVES_ESTADO)
+    params_claves = [valor for par in CLAVES_ESTADO.items() for valor in par]
+    sql = (
+        f'WITH lote AS ({lote_sql}), '
+        f'borradas AS (DELETE FROM {tarea} t USING lote WHERE t.id = lote.id '
+        f'RETURNING t.id, t.proyecto_id, t.asignado_a_id, CASE t.estado {claves} END AS estado) '
+        f'INSERT INTO {evento} (tipo, objeto_id, payload, created_at, intentos) '
+        f"SELECT %s, id, jsonb_build_object('proyecto', proyecto_id, 'asignado_a', asignado_a_id, "
+        f"'estado', estado, 'estado_anterior', estado, 'proyecto_anterior', proyecto_id, "
+        f"'asignado_anterior', asignado_a_id), %s, 0 FROM borradas "
+        f'RETURNING id, tipo, objeto_id, payload::text'
+    )
+    return sql, [*lote_params, *params_claves, 'tarea.eliminada', timezone.now()]
+
+
+def borrar_lote(filtro, lote, saltar_bloqueadas=False):
+    """
+    Borra hasta ``lote`` tareas de ``filtro`` (un Q) con sus eventos, en la
+    transacción en curso. Devuelve cuántas borró.
+    """
+    alias = router.db_for_write(Tarea)
+    tareas = Tarea.objects.using(alias).select_for_update(skip_locked=saltar_bloqueadas).filter(filtro).order_by()
+    if connections[alias].vendor == 'postgresql':
+        sql, params = _sql_postgres(*tareas.values('id')[:lote].query.get_compiler(alias).as_sql())
+        with connections[alias].cursor() as cursor:
+            cursor.execute(sql, params)
+            return len(eventos_insertados(cursor.fetchall()))
+    tareas = list(tareas.only(*CAMPOS_EVENTO)[:lote])
+    if not tareas:
+        return 0
+    registrar_eventos(('tarea.eliminada', tarea.pk, payload_tarea(tarea)) for tarea in tareas)
+    # Sin Collector: Tarea no tiene dependientes y los eventos ya se registraron
+    Tarea.objects.filter(pk__in=[tarea.pk for tarea in tareas])._raw_delete(alias)
+    return len(tareas)
+
+
+def borrar_tareas(filtro, lote=None, saltar_bloqueadas=False):
+    """
+    Borra todas las tareas de ``filtro`` en lotes, una transacción por
+    lote. Con ``saltar_bloqueadas`` no espera a las filas que tiene
+    bloqueadas otra transacción (varios workers sobre el mismo proyecto).
+    """
+    lote = lote or settings.API_ELIMINACION_LOTE
+    total = 0
+    while True:
+        with transaction.atomic():
+            borradas = borrar_lote(filtro, lote, saltar_bloqueadas)
+        total += borradas
+        if borradas < lote:
+            return total
+
+
+def purgar_proyecto(proyecto_id, lote=None, saltar_bloqueadas=False):
+    """
+    Borra el proyecto y sus tareas. Emite 'proyecto.eliminado' salvo que ya
+    se haya emitido al marcarlo. Devuelve la cantidad de tareas borradas
+    (None si el proyecto ya no existía).
+    """
+    lote = lote or settings.API_ELIMINACION_LOTE
+    filtro = models.Q(proyecto_id=proyecto_id)
+    total = borrar_tareas(filtro, lote, saltar_bloqueadas)
+    with transaction.atomic():
+        proyecto = Proyecto.objects.select_for_update().filter(pk=proyecto_id).first()
+        if proyecto is None:
+            return None
+        # Con la fila bloqueada ya no pueden llegar tareas nuevas al proyecto
+        borradas = lote
+        while borradas == lote:
+            borradas = borrar_lote(filtro, lote, False)
+            total += borradas
+        if proyecto.eliminado_at is None:
+            registrar_evento('proyecto.eliminado', proyecto.pk, payload_proyecto(proyecto))
+        Proyecto.objects.filter(pk=proyecto.pk)._raw_delete(router.db_for_write(Proyecto))
+    return total
+
+
+def marcar_eliminado(proyecto):
+    """
+    Baja diferida: el proyecto deja de ser visible ya y lo purga el worker.
+    """
+    with transaction.atomic():
+        marcados = Proyecto.objects.filter(pk=proyecto.pk, eliminado_at__isnull=True).update(eliminado_at=timezone.now())
+        if marcados:
+            registrar_evento('proyecto.eliminado', proyecto.pk, payload_proyecto(proyecto))
+
+
+def eliminar_proyecto(proyecto):
+    """
+    Baja de un proyecto desde la API. Devuelve True si se borró ahora y
+    False si quedó marcado para el worker (más de
+    settings.API_ELIMINACION_ASINCRONA tareas).
+    """
+    umbral = settings.API_ELIMINACION_ASINCRONA
+    if umbral and Tarea.objects.filter(proyecto=proyecto)[:umbral + 1].count() > umbral:
+        marcar_eliminado(proyecto)
+        return False
+    purgar_proyecto(proyecto.pk)
+    return True
+
+
+def eliminar_usuario(user):
+    """
+    Baja de un usuario: sus tareas asignadas y sus proyectos en lotes, y
+    al final el usuario con el Collector (ya sólo le quedan relaciones
+    chicas: grupos, permisos, historial del admin...). Todo en el momento:
+    el usuario no tiene una marca de baja diferida.
+    """
+    borrar_tareas(models.Q(asignado_a=user))
+    for proyecto_id in list(Proyecto.objects.filter(creador=user).values_list('pk', flat=True)):
+        purgar_proyecto(proyecto_id)
+    with transaction.atomic():
+        user.delete()
+
+
+def proyectos_pendientes():
+    # Marcados con eliminado_at, los más antiguos primero
+    return Proyecto.objects.filter(eliminado_at__isnull=False).order_by('eliminado_at', 'pk')
@@ -0,0 +1,52 @@
+import hashlib
+
+from django.db import models
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+"""
+Respuestas condicionales (ETag / If-None-Match).
+
+El validador se calcula con una consulta barata (p. ej. max(updated_at) y
+count de la colección visible) y, si coincide con el que envía el cliente,
+se responde 304 sin ejecutar la consulta completa ni el serializer.
+"""
+
+
+def calcular_etag(*partes):
+    return quote_etag(hashlib.sha1(repr(partes).encode()).hexdigest())
+
+
+def respuesta_condicional(request, etag, construir_respuesta):
+    """
+    Devuelve 304 si ``etag`` está en If-None-Match; si no, llama a
+    ``construir_respuesta()``. En ambos casos agrega el ETag.
+    """
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        respuesta = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        respuesta = construir_respuesta()
+    respuesta['ETag'] = etag
+    respuesta['Cache-Control'] = 'private, no-cache'
+    return respuesta
+
+
+def version_coleccion(queryset):
+    """
+    Versión de una colección: cantidad de filas y última modificación.
+    Cambia al crear, modificar o eliminar cualquier fila visible.
+    """
+    resumen = queryset.order_by().aggregate(total=models.Count('pk'), ultima=models.Max('updated_at'))
+    return resumen['total'], resumen['ultima'] and resumen['ultima'].isoformat()
+
+
+class EtagColeccionMixin:
+    """
+    ``list`` condicional: el ETag depende del usuario, de la URL completa
+    (filtros, página) y de la versión de la colección.
+    """
+    def list(self, request, *args, **kwargs):
+        version = version_coleccion(self.filter_queryset(self.get_queryset()))
+        etag = calcular_etag(request.user.pk, request.get_full_path(), *version)
+        return respuesta_condicional(request, etag, lambda: super(EtagColeccionMixin, self).list(request, *args, **kwargs))
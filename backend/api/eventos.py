@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+"""
+Broker publish/subscribe de cambios para el canal SSE (ver api/sse.py).
+
+outbox.registrar_evento(s) publica cada evento de Proyecto/Tarea cuando su
+transacción se confirma. Cada conexión SSE es una Suscripcion con su cola
+asyncio y su filtro de visibilidad (cambios.Audiencia); el broker reparte
+con un solo ``call_soon_threadsafe`` por event loop, no uno por suscriptor.
+
+settings.EVENTOS_BROKER elige la implementación:
+
+- BrokerMemoria: dentro del proceso. Sirve con un solo worker (y en las
+  pruebas de carga); con varios, cada uno sólo ve lo que se escribe en él.
+- BrokerPostgres: publica con NOTIFY y cada proceso con suscriptores
+  escucha con LISTEN en un hilo propio, así que los cambios hechos en
+  cualquier worker (o en `manage.py importar`) llegan a todos.
+"""
+
+logger = logging.getLogger(__name__)
+
+CANAL_POSTGRES = 'api_eventos'
+
+
+def evento_de(objeto):
+    """
+    Lo que viaja por el broker a partir de una fila de EventoOutbox
+    (``seq`` es None si la base no devolvió el id en un bulk_create).
+    """
+    return {'seq': objeto.id, 'tipo': objeto.tipo, 'id': objeto.objeto_id, 'payload': objeto.payload}
+
+
+class Suscripcion:
+    """
+    Se crea dentro del event loop que la va a leer.
+    """
+    def __init__(self, filtro=None, tamano=None):
+        self.loop = asyncio.get_running_loop()
+        self.cola = asyncio.Queue(maxsize=tamano or settings.EVENTOS_COLA)
+        self.filtro = filtro
+        # La cola se llenó: el cliente debe reconectar y ponerse al día con /changes/
+        self.desbordada = False
+
+    def entregar(self, eventos):
+        for evento in eventos:
+            if self.filtro is not None and not self.filtro(evento):
+                continue
+            try:
+                self.cola.put_nowait(evento)
+            except asyncio.QueueFull:
+                self.desbordada = True
+                return
+
+
+def _repartir(suscripciones, eventos):
+    for suscripcion in suscripciones:
+        suscripcion.entregar(eventos)
+
+
+class BrokerMemoria:
+    def __init__(self):
+        self._por_loop = {}
+        self._lock = threading.Lock()
+
+    @property
+    def suscriptores(self):
+        with self._lock:
+            return sum(len(grupo) for grupo in self._por_loop.values())
+
+    def suscribir(self, filtro=None, tamano=None):
+        suscripcion = Suscripcion(filtro, tamano)
+        with self._lock:
+            self._por_loop.setdefault(suscripcion.loop, set()).add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        with self._lock:
+            grupo = self._por_loop.get(suscripcion.loop)
+            if grupo is not None:
+                grupo.discard(suscripcion)
+                if not grupo:
+                    del self._por_loop[suscripcion.loop]
+
+    def publicar(self, eventos):
+        self.repartir(list(eventos))
+
+    def repartir(self, eventos):
+        if not eventos:
+            return
+        with self._lock:
+            grupos = [(loop, tuple(grupo)) for loop, grupo in self._por_loop.items()]
+        try:
+            actual = asyncio.get_running_loop()
+        except RuntimeError:
+            actual = None
+        for loop, suscripciones in grupos:
+            if loop is actual:
+                _repartir(suscripciones, eventos)
+                continue
+            try:
+                loop.call_soon_threadsafe(_repartir, suscripciones, eventos)
+            except RuntimeError:
+                # Loop cerrado: sus suscripciones se cancelan al terminar
+                pass
+
+
+class BrokerPostgres(BrokerMemoria):
+    def __init__(self, alias='default'):
+        super().__init__()
+        self.alias = alias
+        self._escuchando = False
+
+    def publicar(self, eventos):
+        cuerpos = [json.dumps(evento) for evento in eventos]
+        if cuerpos:
+            with connections[self.alias].cursor() as cursor:
+                cursor.execute('SELECT pg_notify(%s, cuerpo) FROM unnest(%s::text[]) AS cuerpo', [CANAL_POSTGRES, cuerpos])
+
+    def suscribir(self, filtro=None, tamano=None):
+        self._escuchar()
+        return super().suscribir(filtro, tamano)
+
+    def _escuchar(self):
+        with self._lock:
+            if self._escuchando:
+                return
+            self._escuchando = True
+        threading.Thread(target=self._bucle, name='eventos-listen', daemon=True).start()
+
+    def _bucle(self):
+        base = connections[self.alias]
+        while True:
+            try:
+                conexion = base.get_new_connection(base.get_connection_params())
+                conexion.autocommit = True
+                with conexion.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CANAL_POSTGRES}')
+                while True:
+                    if select.select([conexion], [], [], 5) == ([], [], []):
+                        continue
+                    conexion.poll()
+                    eventos = [json.loads(aviso.payload) for aviso in conexion.notifies]
+                    conexion.notifies.clear()
+                    self.repartir(eventos)
+            except Exception:
+                logger.exception("Se perdió la conexión LISTEN de eventos; reintentando")
+                time.sleep(1)
+
+
+# -----------------
+# Instancia del proceso
+# -----------------
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.EVENTOS_BROKER)()
+    return _broker
+
+
+def usar_broker(instancia):
+    """
+    Reemplaza el broker del proceso (p. ej. por un BrokerMemoria en pruebas).
+    """
+    global _broker
+    _broker = instancia
+
+
+def publicar(objetos):
+    """
+    Publica filas de EventoOutbox ya confirmadas. Un error aquí sólo se
+    registra: el cambio ya está guardado y el cliente se pone al día con
+    /changes/ al reconectar.
+    """
+    try:
+        broker().publicar([evento_de(objeto) for objeto in objetos])
+    except Exception:
+        logger.exception("No se pudieron publicar %d eventos", len(objetos))
@@ -0,0 +1,70 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.permissions import SAFE_METHODS
+
+from .lectura import plan_lectura
+
+"""
+Filtros por query params y campos parciales (?fields=) para los ViewSets.
+"""
+
+
+class FiltrosBackend(BaseFilterBackend):
+    """
+    Aplica los filtros declarados en ``view.filtros`` (parámetro -> lookup
+    del ORM), p. ej. {'estado': 'estado', 'fecha_fin_desde': 'fecha_fin__gte'}.
+    Para FKs, el valor ``null`` filtra las filas sin relación.
+    """
+    def filter_queryset(self, request, queryset, view):
+        condiciones = {}
+        errores = {}
+        for parametro, lookup in getattr(view, 'filtros', {}).items():
+            valor = request.query_params.get(parametro)
+            if valor is None:
+                continue
+            campo = queryset.model._meta.get_field(lookup.split('__')[0])
+            if valor == 'null' and campo.null:
+                condiciones[f"{campo.name}__isnull"] = True
+                continue
+            try:
+                condiciones[lookup] = campo.target_field.to_python(valor) if campo.is_relation else campo.to_python(valor)
+            except DjangoValidationError as exc:
+                errores[parametro] = exc.messages
+        if errores:
+            raise ValidationError(errores)
+        return queryset.filter(**condiciones)
+
+
+class CamposParcialesMixin:
+    """
+    ?fields=id,title devuelve sólo esas columnas en las lecturas (GET).
+    Las columnas no pedidas no se leen de la base (.only() / values_list()).
+    """
+    def campos_solicitados(self):
+        if self.request.method not in SAFE_METHODS:
+            return None
+        valor = self.request.query_params.get('fields')
+        if not valor:
+            return None
+        campos = tuple(dict.fromkeys(c.strip() for c in valor.split(',') if c.strip()))
+        disponibles = {n for n, campo in self.get_serializer_class()().fields.items() if not campo.write_only}
+        desconocidos = [c for c in campos if c not in disponibles]
+        if desconocidos:
+            raise ValidationError({'fields': f"Campos desconocidos: {', '.join(desconocidos)}"})
+        return campos or None
+
+    def get_serializer_context(self):
+        contexto = super().get_serializer_context()
+        contexto['campos'] = self.campos_solicitados()
+        return contexto
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        campos = self.campos_solicitados()
+        plan = campos and plan_lectura(self.get_serializer_class(), campos)
+        if not plan:
+            return queryset
+        # Las columnas de orden se necesitan para calcular el cursor de la página
+        orden = [c.lstrip('-') for c in (*queryset.query.order_by, *getattr(self, 'cursor_ordering', ()))]
+        return queryset.only(*dict.fromkeys([*plan.columnas, *orden]))
@@ -0,0 +1,238 @@
+import codecs
+import csv
+import io
+import json
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections, router, transaction
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+
+from .bulk import _es_visible, crear_con_ids
+from .models import Proyecto, Tarea
+from .outbox import registrar_eventos, payload_proyecto, payload_tarea
+from .serializers import ProyectoSerializer, TareaBulkSerializer
+
+"""
+Importación en streaming de proyectos y tareas desde CSV / NDJSON
+(POST /api/<coleccion>/import/ y `manage.py importar`).
+
+El archivo se lee línea a línea, las filas se validan por bloques de
+settings.API_IMPORT_CHUNK_SIZE y cada bloque se inserta en su propia
+transacción: una fila inválida se informa y no aborta el resto. Las
+referencias (proyecto, asignado_a) se resuelven contra una tabla en
+memoria armada una sola vez por importación, y cada fila se valida con
+``run_validation`` sobre una única instancia del serializer (como hace
+ListSerializer), sin reconstruir sus campos por fila.
+"""
+
+FORMATOS = ('csv', 'ndjson')
+
+
+class FilaInvalida(Exception):
+    pass
+
+
+def detectar_formato(nombre, formato=None):
+    if formato:
+        return formato
+    return 'ndjson' if nombre and nombre.lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+
+
+def leer_filas(lineas, formato):
+    """
+    Genera (número de línea, dict | FilaInvalida) desde un iterable de
+    líneas en bytes (un UploadedFile o un django.core.files.File).
+    Las celdas vacías del CSV se omiten (el campo toma su valor por defecto).
+    """
+    texto = codecs.iterdecode(lineas, 'utf-8-sig')
+    if formato == 'csv':
+        lector = csv.DictReader(texto)
+        for fila in lector:
+            yield lector.line_num, {k: v for k, v in fila.items() if k and v not in ('', None)}
+        return
+    for numero, linea in enumerate(texto, 1):
+        if not linea.strip():
+            continue
+        try:
+            fila = json.loads(linea)
+        except ValueError as exc:
+            yield numero, FilaInvalida(f'JSON inválido: {exc}')
+            continue
+        yield numero, fila if isinstance(fila, dict) else FilaInvalida('Cada línea debe ser un objeto JSON.')
+
+
+# -----------------
+# Inserción: COPY en PostgreSQL, bulk_create (crear_con_ids) en el resto
+# -----------------
+def _valor_copy(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return 't' if valor else 'f'
+    # Entre comillas: "" es cadena vacía y sin comillas es NULL
+    return '"' + str(valor).replace('"', '""') + '"'
+
+
+def _copiar(modelo, objetos, conexion):
+    """
+    COPY ... FROM STDIN con ids reservados antes desde la secuencia, para
+    poder registrar los eventos del outbox con su pk.
+    """
+    opciones = modelo._meta
+    campos = opciones.concrete_fields
+    qn = conexion.ops.quote_name
+    with conexion.cursor() as cursor:
+        cursor.execute(
+            'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+            [opciones.db_table, opciones.pk.column, len(objetos)],
+        )
+        for objeto, (pk,) in zip(objetos, cursor.fetchall()):
+            objeto.pk = pk
+
+        lineas = []
+        for objeto in objetos:
+            valores = (campo.get_db_prep_save(campo.pre_save(objeto, True), conexion) for campo in campos)
+            lineas.append(','.join(_valor_copy(v) for v in valores))
+        columnas = ', '.join(qn(campo.column) for campo in campos)
+        cursor.copy_expert(
+            f'COPY {qn(opciones.db_table)} ({columnas}) FROM STDIN WITH (FORMAT csv)',
+            io.StringIO('\n'.join(lineas) + '\n'),
+        )
+    for objeto in objetos:
+        objeto._state.adding = False
+        objeto._state.db = conexion.alias
+    return objetos
+
+
+def insertar(modelo, objetos):
+    conexion = connections[router.db_for_write(modelo)]
+    if conexion.vendor == 'postgresql':
+        return _copiar(modelo, objetos, conexion)
+    # Sin RETURNING en bulk_create (SQLite con Django 3.2) hace falta la pk para el evento
+    return crear_con_ids(modelo, objetos)
+
+
+# -----------------
+# Importadores por modelo
+# -----------------
+class ImportadorTareas:
+    modelo = Tarea
+    evento = 'tarea.creada'
+
+    def __init__(self, user):
+        self.user = user
+        # Tabla de referencias en memoria: una sola vez por importación
+        self.serializer = TareaBulkSerializer(context={'precargados': {
+            'proyecto': Proyecto.objects.filter(eliminado_at__isnull=True).only('id', 'creador_id').in_bulk(),
+            'asignado_a': User.objects.only('id').in_bulk(),
+        }})
+
+    def construir(self, datos):
+        try:
+            tarea = Tarea(**self.serializer.run_validation(datos))
+        except ValidationError as exc:
+            return None, exc.detail
+        if not _es_visible(self.user, tarea):
+            return None, {'detail': 'No tienes permiso sobre esta tarea.'}
+        return tarea, None
+
+    def payload(self, tarea):
+        return payload_tarea(tarea)
+
+
+class ImportadorProyectos:
+    modelo = Proyecto
+    evento = 'proyecto.creado'
+
+    def __init__(self, user):
+        self.user = user
+        self.serializer = ProyectoSerializer()
+
+    def construir(self, datos):
+        # Como en la API: el creador es quien importa
+        datos.pop('creador', None)
+        try:
+            return Proyecto(creador=self.user, **self.serializer.run_validation(datos)), None
+        except ValidationError as exc:
+            return None, exc.detail
+
+    def payload(self, proyecto):
+        return payload_proyecto(proyecto)
+
+
+IMPORTADORES = {'tareas': ImportadorTareas, 'proyectos': ImportadorProyectos}
+
+
+def _guardar_bloque(importador, bloque):
+    with transaction.atomic():
+        creados = insertar(importador.modelo, bloque)
+        registrar_eventos((importador.evento, o.pk, importador.payload(o)) for o in creados)
+    return len(creados)
+
+
+def importar(importador, filas, al_avanzar=None):
+    """
+    Consume ``filas`` (ver leer_filas) y devuelve el resumen de la
+    importación. ``al_avanzar(resumen)`` se llama después de cada bloque.
+    """
+    inicio = time.perf_counter()
+    resumen = {'filas': 0, 'creadas': 0, 'errores_total': 0, 'errores': []}
+
+    def error(numero, errores):
+        resumen['errores_total'] += 1
+        if len(resumen['errores']) < settings.API_IMPORT_MAX_ERRORES:
+            resumen['errores'].append({'linea': numero, 'errors': errores})
+
+    def cerrar_bloque(bloque):
+        if bloque:
+            resumen['creadas'] += _guardar_bloque(importador, bloque)
+        segundos = time.perf_counter() - inicio
+        resumen['segundos'] = round(segundos, 3)
+        resumen['filas_por_segundo'] = round(resumen['filas'] / segundos) if segundos else None
+        if al_avanzar:
+            al_avanzar(resumen)
+
+    bloque = []
+    for numero, datos in filas:
+        resumen['filas'] += 1
+        if isinstance(datos, FilaInvalida):
+            error(numero, {'detail': str(datos)})
+        else:
+            objeto, errores = importador.construir(datos)
+            if errores:
+                error(numero, errores)
+            else:
+                bloque.append(objeto)
+        if resumen['filas'] % settings.API_IMPORT_CHUNK_SIZE == 0:
+            cerrar_bloque(bloque)
+            bloque = []
+    cerrar_bloque(bloque)
+    return resumen
+
+
+class ImportacionMixin:
+    """
+    POST <coleccion>/import/ con un archivo multipart ``archivo`` (CSV o
+    NDJSON, según ?formato= o la extensión). 201 si todas las filas
+    entraron, 207 si alguna falló (ver ``errores``).
+    """
+    importador_class = None
+
+    @action(detail=False, methods=['post'], url_path='import', url_name='import', parser_classes=[MultiPartParser])
+    def importar_archivo(self, request):
+        archivo = request.FILES.get('archivo')
+        if archivo is None:
+            return Response({'error': "Falta el archivo ('archivo')."}, status=status.HTTP_400_BAD_REQUEST)
+        formato = detectar_formato(archivo.name, request.query_params.get('formato'))
+        if formato not in FORMATOS:
+            return Response({'error': f"formato debe ser uno de: {', '.join(FORMATOS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        resumen = importar(self.importador_class(request.user), leer_filas(archivo, formato))
+        codigo = status.HTTP_207_MULTI_STATUS if resumen['errores_total'] else status.HTTP_201_CREATED
+        return Response(resumen, status=codigo)
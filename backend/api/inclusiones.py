@@ -0,0 +1,160 @@
+from django.conf import settings
+from django.db import connections, models, router
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .etags import calcular_etag, respuesta_condicional, version_coleccion
+from .models import EstadoTarea, EventoOutbox, Proyecto, Tarea
+
+"""
+Datos relacionados embebidos en los proyectos (?include=rollups,tasks).
+
+Se calculan después de paginar, sobre los proyectos de la página, con una
+consulta cada uno (la cantidad no depende del tamaño de la página):
+
+- rollups: tareas por estado, vencidas y próxima fecha_fin, con agregados
+  condicionales (COUNT/MIN ... FILTER) agrupados por proyecto. Anotarlos
+  en la consulta de proyectos (JOIN + GROUP BY) obliga a PostgreSQL a
+  agregar todas las tareas visibles antes del LIMIT de la página.
+- tasks: las ?tasks_limit= tareas más recientes de cada proyecto con un
+  Prefetch cuyo queryset está acotado por una subconsulta con LIMIT por
+  proyecto (LATERAL en PostgreSQL, ROW_NUMBER() en el resto).
+"""
+
+INCLUSIONES = ('rollups', 'tasks')
+ORDEN_TAREAS = ('-created_at', '-id')
+ABIERTAS = [estado for estado in EstadoTarea if estado != EstadoTarea.DONE]
+
+
+def _agregados(hoy):
+    abiertas = models.Q(estado__in=ABIERTAS)
+    agregados = {
+        'total': models.Count('id'),
+        'vencidas': models.Count('id', filter=abiertas & models.Q(fecha_fin__lt=hoy)),
+        'proxima_fecha_fin': models.Min('fecha_fin', filter=abiertas & models.Q(fecha_fin__gte=hoy)),
+    }
+    for estado in EstadoTarea:
+        agregados[EstadoTarea.clave(estado)] = models.Count('id', filter=models.Q(estado=estado))
+    return agregados
+
+
+def adjuntar_rollups(proyectos, ids, hoy=None):
+    """
+    Deja en cada proyecto ``rollups`` (un dict). ``ids`` son los pk de
+    ``proyectos`` o un queryset con ellos (``values('pk')``).
+    """
+    agregados = _agregados(hoy or timezone.localdate())
+    filas = {
+        fila.pop('proyecto'): fila
+        for fila in Tarea.objects.filter(proyecto__in=ids).order_by().values('proyecto').annotate(**agregados)
+    }
+    vacio = {clave: None if clave == 'proxima_fecha_fin' else 0 for clave in agregados}
+    for proyecto in proyectos:
+        proyecto.rollups = filas.get(proyecto.pk, vacio)
+
+
+def _primeras_tareas(ids, limite):
+    """
+    Subconsulta (SQL, params) con los ids de las ``limite`` tareas más
+    recientes de cada proyecto de ``ids``.
+    """
+    conexion = connections[router.db_for_read(Tarea)]
+    qn = conexion.ops.quote_name
+    tabla = qn(Tarea._meta.db_table)
+    proyecto, creada = qn(Tarea._meta.get_field('proyecto').column), qn('created_at')
+    proyectos_sql, params = Proyecto.objects.filter(pk__in=ids).values('pk').query.sql_with_params()
+    if conexion.vendor == 'postgresql':
+        sql = (
+            f'SELECT t.id FROM ({proyectos_sql}) p(id) CROSS JOIN LATERAL ('
+            f'SELECT id FROM {tabla} WHERE {proyecto} = p.id ORDER BY {creada} DESC, id DESC LIMIT %s) t'
+        )
+    else:
+        sql = (
+            f'SELECT id FROM (SELECT id, ROW_NUMBER() OVER ('
+            f'PARTITION BY {proyecto} ORDER BY {creada} DESC, id DESC) AS n '
+            f'FROM {tabla} WHERE {proyecto} IN ({proyectos_sql})) WHERE n <= %s'
+        )
+    return sql, (*params, limite)
+
+
+def adjuntar_tareas(proyectos, ids, limite):
+    sql, params = _primeras_tareas(ids, limite)
+    models.prefetch_related_objects(proyectos, models.Prefetch(
+        'tareas',
+        queryset=Tarea.objects.filter(id__in=RawSQL(sql, params)).order_by(*ORDEN_TAREAS),
+        to_attr='tareas_incluidas',
+    ))
+
+
+class InclusionesMixin:
+    """
+    ?include=rollups,tasks (y ?tasks_limit=) en ``list`` y ``retrieve``,
+    con ``inclusiones_serializer_class`` en vez del serializer normal.
+    Va antes que EtagColeccionMixin porque arma su propio ETag.
+    """
+    inclusiones_serializer_class = None
+
+    def inclusiones(self):
+        if self.action not in ('list', 'retrieve'):
+            return ()
+        valor = self.request.query_params.get('include')
+        if not valor:
+            return ()
+        pedidas = tuple(dict.fromkeys(i.strip() for i in valor.split(',') if i.strip()))
+        desconocidas = [i for i in pedidas if i not in INCLUSIONES]
+        if desconocidas:
+            raise ValidationError({'include': f"Debe ser una lista de: {', '.join(INCLUSIONES)}"})
+        return pedidas
+
+    def limite_tareas(self):
+        valor = self.request.query_params.get('tasks_limit', settings.API_INCLUDE_TAREAS)
+        try:
+            limite = int(valor)
+        except (TypeError, ValueError):
+            raise ValidationError({'tasks_limit': 'Debe ser un número.'})
+        if not 1 <= limite <= settings.API_INCLUDE_TAREAS_MAX:
+            raise ValidationError({'tasks_limit': f'Debe estar entre 1 y {settings.API_INCLUDE_TAREAS_MAX}.'})
+        return limite
+
+    def get_serializer_class(self):
+        if self.inclusiones():
+            return self.inclusiones_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        contexto = super().get_serializer_context()
+        contexto['inclusiones'] = self.inclusiones()
+        return contexto
+
+    def incluir(self, proyectos, ids):
+        inclusiones = self.inclusiones()
+        if 'rollups' in inclusiones:
+            adjuntar_rollups(proyectos, ids)
+        if 'tasks' in inclusiones:
+            adjuntar_tareas(proyectos, ids, self.limite_tareas())
+        return proyectos
+
+    def get_object(self):
+        proyecto = super().get_object()
+        if self.inclusiones():
+            self.incluir([proyecto], [proyecto.pk])
+        return proyecto
+
+    def list(self, request, *args, **kwargs):
+        if not self.inclusiones():
+            return super().list(request, *args, **kwargs)
+        # Los rollups cambian con las tareas: la versión suma el último evento registrado
+        queryset = self.filter_queryset(self.get_queryset())
+        ultimo = EventoOutbox.objects.aggregate(ultimo=models.Max('id'))['ultimo']
+        etag = calcular_etag(request.user.pk, request.get_full_path(), *version_coleccion(queryset), ultimo)
+        return respuesta_condicional(request, etag, lambda: self._listar_con_inclusiones(queryset))
+
+    def _listar_con_inclusiones(self, queryset):
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            self.incluir(page, [proyecto.pk for proyecto in page])
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        proyectos = self.incluir(list(queryset), queryset.values('pk'))
+        return Response(self.get_serializer(proyectos, many=True).data)
@@ -0,0 +1,278 @@
+import hashlib
+import threading
+import weakref
+
+import pymongo
+from asgiref.sync import sync_to_async
+from motor.motor_asyncio import AsyncIOMotorClient
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, models, router, transaction
+
+from .models import DashboardIndicator, EstadoTarea, EventoOutbox, Proyecto, Tarea
+from .outbox import agotados, entregas_detenidas
+
+"""
+Repositorio de lectura de los indicadores del dashboard (MongoDB).
+
+Lee directo con pymongo (consulta nativa con proyección), sin pasar por la
+traducción SQL -> Mongo de djongo ni por el ModelSerializer, y guarda los
+resultados en la caché local del proceso con un TTL corto
+(settings.INDICADORES_CACHE_TTL). Las escrituras de DashboardIndicator
+invalidan la caché (ver signals.py); en otros procesos el TTL acota cuánto
+puede quedar desactualizado un resultado.
+
+Además mantiene los indicadores derivados (REGISTRO): el consumidor del
+outbox los actualiza con incrementos atómicos ($inc) y
+`manage.py reconciliar_indicadores` los recalcula desde PostgreSQL para
+corregir cualquier desvío (p. ej. eventos entregados dos veces), descontando
+los deltas de los eventos que el worker todavía no aplicó.
+"""
+
+PROYECCION = {'_id': 0, 'id': 1, 'nombre': 1, 'valor': 1}
+CLAVE_GENERACION = 'indicadores:generacion'
+
+_clientes = {}
+_clientes_lock = threading.Lock()
+# Motor queda atado al event loop en que se crea: un cliente por loop
+_clientes_async = weakref.WeakKeyDictionary()
+
+
+def _cliente(alias):
+    # Un MongoClient por proceso (ya maneja su propio pool de conexiones)
+    with _clientes_lock:
+        if alias not in _clientes:
+            _clientes[alias] = pymongo.MongoClient(**settings.DATABASES[alias].get('CLIENT', {}))
+        return _clientes[alias]
+
+
+def _cliente_async(alias, loop):
+    por_alias = _clientes_async.setdefault(loop, {})
+    if alias not in por_alias:
+        por_alias[alias] = AsyncIOMotorClient(io_loop=loop, **settings.DATABASES[alias].get('CLIENT', {}))
+    return por_alias[alias]
+
+
+class IndicadorRepository:
+    def __init__(self, alias='mongo', ttl=None):
+        self.alias = alias
+        self.ttl = settings.INDICADORES_CACHE_TTL if ttl is None else ttl
+        self._indices_creados = False
+
+    @property
+    def coleccion(self):
+        base = _cliente(self.alias)[settings.DATABASES[self.alias]['NAME']]
+        coleccion = base[DashboardIndicator._meta.db_table]
+        if not self._indices_creados:
+            # Idempotente: sólo la primera vez por proceso
+            coleccion.create_index('nombre')
+            coleccion.create_index('id')
+            self._indices_creados = True
+        return coleccion
+
+    def _clave(self, *partes):
+        generacion = cache.get_or_set(CLAVE_GENERACION, 0, None)
+        sufijo = hashlib.md5(repr(partes).encode()).hexdigest()
+        return f'indicadores:{generacion}:{sufijo}'
+
+    def _buscar(self, filtro, *partes):
+        clave = self._clave(*partes)
+        datos = cache.get(clave)
+        if datos is None:
+            datos = list(self.coleccion.find(filtro, PROYECCION).sort('id', pymongo.ASCENDING))
+            cache.set(clave, datos, self.ttl)
+        return datos
+
+    def listar(self, nombre=None):
+        if nombre is None:
+            return self._buscar({}, 'todos')
+        return self._buscar({'nombre': nombre}, 'nombre', nombre)
+
+    async def listar_async(self, loop):
+        """
+        Igual que listar() (misma caché), pero consultando con el driver
+        asíncrono para no bloquear el event loop mientras responde Mongo.
+        """
+        # La caché puede ser de red (Redis, memcached): sus llamadas van en un hilo
+        clave = await sync_to_async(self._clave, thread_sensitive=False)('todos')
+        datos = await sync_to_async(cache.get, thread_sensitive=False)(clave)
+        if datos is None:
+            base = _cliente_async(self.alias, loop)[settings.DATABASES[self.alias]['NAME']]
+            cursor = base[DashboardIndicator._meta.db_table].find({}, PROYECCION).sort('id', pymongo.ASCENDING)
+            datos = await cursor.to_list(length=None)
+            await sync_to_async(cache.set, thread_sensitive=False)(clave, datos, self.ttl)
+        return datos
+
+    def obtener(self, pk):
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return None
+        encontrados = self._buscar({'id': pk}, 'id', pk)
+        return encontrados[0] if encontrados else None
+
+    def incrementar(self, deltas):
+        """
+        Aplica incrementos atómicos {nombre: delta} en un solo bulk_write.
+        Los indicadores que aún no existen los crea la reconciliación.
+        """
+        operaciones = [
+            pymongo.UpdateOne({'nombre': nombre}, {'$inc': {'valor': delta}})
+            for nombre, delta in deltas.items() if delta
+        ]
+        if operaciones:
+            self.coleccion.bulk_write(operaciones, ordered=False)
+            self.invalidar()
+
+    def invalidar(self):
+        # Cambiar la generación deja obsoletas todas las claves anteriores
+        try:
+            cache.incr(CLAVE_GENERACION)
+        except ValueError:
+            cache.set(CLAVE_GENERACION, 1, None)
+
+
+repositorio_indicadores = IndicadorRepository()
+
+
+# -----------------
+# Indicadores derivados
+# -----------------
+class IndicadorDerivado:
+    """
+    ``recalcular()`` devuelve el valor exacto desde la base relacional;
+    ``delta(evento)`` cuánto cambia el valor por un evento del outbox.
+    """
+    def __init__(self, nombre, recalcular, delta):
+        self.nombre = nombre
+        self.recalcular = recalcular
+        self.delta = delta
+
+
+REGISTRO = {}
+
+
+def registrar_indicador(nombre, recalcular, delta):
+    REGISTRO[nombre] = IndicadorDerivado(nombre, recalcular, delta)
+
+
+def _delta_conteo(tipo_creado, tipo_eliminado, cuenta=lambda payload: True):
+    def delta(evento):
+        if evento.tipo == tipo_creado:
+            return int(cuenta(evento.payload))
+        if evento.tipo == tipo_eliminado:
+            return -int(cuenta(evento.payload))
+        return 0
+    return delta
+
+
+def _delta_estado(cuenta):
+    """
+    Delta para indicadores que dependen de Tarea.estado: además de altas y
+    bajas, cuenta las transiciones informadas en 'estado_anterior'.
+    """
+    conteo = _delta_conteo('tarea.creada', 'tarea.eliminada', lambda p: cuenta(p.get('estado')))
+
+    def delta(evento):
+        if evento.tipo != 'tarea.actualizada':
+            return conteo(evento)
+        anterior = evento.payload.get('estado_anterior')
+        if anterior is None:
+            return 0
+        return int(cuenta(evento.payload.get('estado'))) - int(cuenta(anterior))
+    return delta
+
+
+registrar_indicador(
+    'proyectos_totales',
+    # Los de baja diferida ya emitieron 'proyecto.eliminado'
+    lambda: Proyecto.objects.filter(eliminado_at__isnull=True).count(),
+    _delta_conteo('proyecto.creado', 'proyecto.eliminado'),
+)
+registrar_indicador(
+    'tareas_totales',
+    lambda: Tarea.objects.count(),
+    _delta_conteo('tarea.creada', 'tarea.eliminada'),
+)
+registrar_indicador(
+    'tareas_abiertas',
+    lambda: Tarea.objects.exclude(estado=EstadoTarea.DONE).count(),
+    _delta_estado(lambda estado: estado != 'done'),
+)
+registrar_indicador(
+    'tareas_completadas',
+    lambda: Tarea.objects.filter(estado=EstadoTarea.DONE).count(),
+    _delta_estado(lambda estado: estado == 'done'),
+)
+
+
+def consumidor_indicadores(eventos):
+    """
+    Consumidor del outbox: suma los deltas del lote y los aplica de una vez.
+    """
+    deltas = {
+        nombre: sum(indicador.delta(evento) for evento in eventos)
+        for nombre, indicador in REGISTRO.items()
+    }
+    repositorio_indicadores.incrementar(deltas)
+
+
+def _deltas_pendientes(nombres):
+    """
+    Suma de los deltas de los eventos que el worker todavía va a entregar
+    (los agotados ya no se aplican: el recálculo los incluye tal cual).
+    """
+    deltas = dict.fromkeys(nombres, 0)
+    pendientes = (
+        EventoOutbox.objects.filter(procesado_at__isnull=True).exclude(agotados())
+        .filter(models.Q(tipo__startswith='proyecto.') | models.Q(tipo__startswith='tarea.'))
+        .only('tipo', 'payload')
+    )
+    for evento in pendientes.iterator():
+        for nombre in nombres:
+            deltas[nombre] += REGISTRO[nombre].delta(evento)
+    return deltas
+
+
+def _recalcular(nombres):
+    """
+    {nombre: valor} que corresponde a los eventos ya entregados: el
+    recálculo menos los deltas pendientes, leídos en la misma foto de la
+    base (REPEATABLE READ en PostgreSQL) para que un cambio confirmado en
+    el medio no quede contado en uno solo de los dos lados.
+    """
+    conexion = connections[router.db_for_read(EventoOutbox)]
+    exterior = not conexion.in_atomic_block
+    with transaction.atomic(using=conexion.alias):
+        if conexion.vendor == 'postgresql' and exterior:
+            with conexion.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+        pendientes = _deltas_pendientes(nombres)
+        return {nombre: REGISTRO[nombre].recalcular() - pendientes[nombre] for nombre in nombres}
+
+
+def reconciliar_indicadores(nombres=None):
+    """
+    Recalcula los indicadores derivados desde PostgreSQL y corrige los
+    valores guardados en MongoDB. Devuelve {nombre: (anterior, nuevo)}
+    sólo para los que cambiaron.
+
+    Los workers del outbox no entregan eventos mientras tanto (ver
+    outbox.entregas_detenidas): el valor guardado cubre exactamente los
+    eventos procesados y los pendientes se suman después con su $inc.
+    """
+    nombres = list(nombres or REGISTRO)
+    corregidos = {}
+    indicadores = DashboardIndicator.objects.using(repositorio_indicadores.alias)
+    with entregas_detenidas():
+        for nombre, valor in _recalcular(nombres).items():
+            actual = indicadores.filter(nombre=nombre).first()
+            if actual is None:
+                indicadores.create(nombre=nombre, valor=valor)
+                corregidos[nombre] = (None, valor)
+            elif actual.valor != valor:
+                corregidos[nombre] = (actual.valor, valor)
+                actual.valor = valor
+                actual.save(using=repositorio_indicadores.alias, update_fields=['valor'])
+    repositorio_indicadores.invalidar()
+    return corregidos
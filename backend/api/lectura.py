@@ -0,0 +1,154 @@
+import json
+import types
+from functools import lru_cache
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.compat import LONG_SEPARATORS, SHORT_SEPARATORS
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .metricas import medir_serializacion
+from .serializers import EstadoTareaField
+
+"""
+Camino rápido de lectura para listados grandes.
+
+En vez de construir una instancia del modelo por fila y pasarla por el
+ModelSerializer campo a campo, se leen tuplas con ``values_list()`` en
+bloques (``iterator(chunk_size=...)``) y se codifican con un "plan"
+precalculado a partir de los campos del serializer. La salida es idéntica
+a la del serializer: las fechas se convierten con el mismo
+``to_representation`` y las FKs se devuelven como id.
+
+Las filas se codifican bajo demanda (``filas`` devuelve un generador) y
+``JSONRapidoRenderer`` las pasa a JSON bloque a bloque, sin armar antes la
+lista completa de diccionarios.
+"""
+
+# Campos cuyo valor en la base ya es la representación JSON
+CAMPOS_DIRECTOS = (
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.FloatField,
+    serializers.BooleanField,
+)
+# Campos que necesitan convertirse (fechas -> texto ISO 8601, código de estado -> texto)
+CAMPOS_CONVERTIDOS = (
+    EstadoTareaField,
+    serializers.DateTimeField,
+    serializers.DateField,
+)
+
+
+class PlanLectura:
+    def __init__(self, nombres, columnas, conversores):
+        self.nombres = nombres
+        self.columnas = columnas
+        self.conversores = conversores
+
+    def codificar(self, fila):
+        return {
+            nombre: valor if conversor is None or valor is None else conversor(valor)
+            for nombre, conversor, valor in zip(self.nombres, self.conversores, fila)
+        }
+
+    def filas(self, queryset, chunk_size=None):
+        tuplas = queryset.values_list(*self.columnas).iterator(chunk_size=chunk_size or settings.API_LECTURA_CHUNK_SIZE)
+        return (self.codificar(fila) for fila in tuplas)
+
+
+@lru_cache(maxsize=None)
+def plan_lectura(serializer_class, nombres=None):
+    """
+    Plan para ``serializer_class`` (opcionalmente sólo los campos ``nombres``).
+    Devuelve None si algún campo no es un campo simple del modelo; en ese
+    caso se debe usar el serializer normal.
+    """
+    modelo = serializer_class.Meta.model
+    campos = serializer_class().fields
+    columnas, conversores = [], []
+    nombres = tuple(nombres or (n for n, campo in campos.items() if not campo.write_only))
+
+    for nombre in nombres:
+        campo = campos[nombre]
+        # Sólo campos que leen una columna del modelo (admite alias, p. ej. source='estado')
+        try:
+            columna = modelo._meta.get_field(campo.source)
+        except FieldDoesNotExist:
+            return None
+        if not getattr(columna, 'concrete', False):
+            return None
+        if isinstance(campo, PrimaryKeyRelatedField):
+            columnas.append(columna.attname)
+            conversores.append(None)
+        elif isinstance(campo, CAMPOS_CONVERTIDOS):
+            columnas.append(columna.name)
+            conversores.append(campo.to_representation)
+        elif isinstance(campo, CAMPOS_DIRECTOS):
+            columnas.append(columna.name)
+            conversores.append(None)
+        else:
+            return None
+    return PlanLectura(nombres, columnas, conversores)
+
+
+class JSONRapidoRenderer(JSONRenderer):
+    """
+    JSONRenderer que, si recibe las filas de ``PlanLectura.filas``, las
+    codifica de a ``API_LECTURA_CHUNK_SIZE``. Los bytes son los mismos que
+    los de JSONRenderer; con sangría (?indent=, API navegable) o cualquier
+    otro dato usa el camino normal.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, types.GeneratorType) or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        opciones = {
+            'cls': self.encoder_class,
+            'ensure_ascii': self.ensure_ascii,
+            'allow_nan': not self.strict,
+            'separators': SHORT_SEPARATORS if self.compact else LONG_SEPARATORS,
+        }
+        partes = []
+        with medir_serializacion():
+            while True:
+                bloque = list(islice(data, settings.API_LECTURA_CHUNK_SIZE))
+                if not bloque:
+                    break
+                # Sin los corchetes: los bloques se unen como una sola lista
+                partes.append(json.dumps(bloque, **opciones)[1:-1])
+        separador = opciones['separators'][0]
+        ret = '[' + separador.join(partes) + ']'
+        ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
+
+
+class LecturaRapidaMixin:
+    """
+    Usa el plan de lectura en ``list`` cuando la respuesta no va paginada.
+    Las páginas (ya acotadas) y el resto de acciones usan el serializer.
+    """
+    renderer_classes = [
+        JSONRapidoRenderer if renderer is JSONRenderer else renderer
+        for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+    ]
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        campos = self.campos_solicitados() if hasattr(self, 'campos_solicitados') else None
+        plan = plan_lectura(self.get_serializer_class(), campos)
+        if plan is None:
+            return Response(self.get_serializer(queryset, many=True).data)
+        # Las filas se leen y codifican al renderizar (ver JSONRapidoRenderer)
+        return Response(plan.filas(queryset))
@@ -0,0 +1,119 @@
+import json
+import logging
+import platform
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.utils import timezone
+
+from api.benchmarks.datos import contexto as contexto_sembrado, sembrar
+from api.benchmarks.escenarios import ESCENARIOS, comparar_escenarios, rutas_sin_escenario
+from api.benchmarks.medicion import comparar, medir
+
+
+class Command(BaseCommand):
+    help = (
+        'Siembra datos en una base de prueba desechable (test_<NAME>), ejecuta '
+        'todas las rutas de la API y reporta p50/p95, queries y memoria pico.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=50)
+        parser.add_argument('--proyectos', type=int, default=1000)
+        parser.add_argument('--tareas', type=int, default=100000)
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--repeticiones', type=int, default=20)
+        parser.add_argument('--solo', nargs='*', default=None, help='Nombres de escenarios a ejecutar.')
+        parser.add_argument('--sin-mongo', action='store_true', help='Omite los escenarios que leen MongoDB.')
+        parser.add_argument('--salida', default=None, help='Archivo JSON donde guardar los resultados.')
+        parser.add_argument('--baseline', default=None, help='Archivo JSON de resultados anteriores para comparar.')
+        parser.add_argument('--umbral-latencia', type=float, default=0.25,
+                            help='Aumento relativo de p95 tolerado (0.25 = +25%%).')
+        parser.add_argument('--umbral-memoria', type=float, default=0.25,
+                            help='Aumento relativo de memoria pico tolerado.')
+        parser.add_argument('--keepdb', action='store_true', help='Reutiliza la base de prueba (no re-siembra si existe).')
+
+    def handle(self, *args, **options):
+        escenarios = [
+            e for e in ESCENARIOS
+            if (options['solo'] is None or e.nombre in options['solo'])
+            and not (options['sin_mongo'] and e.mongo)
+        ]
+        for ruta in rutas_sin_escenario():
+            self.stderr.write(f"Advertencia: la ruta '{ruta}' no tiene escenario de benchmark.")
+
+        # Los 4xx esperados de algunos escenarios no deben ensuciar la salida
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        setup_test_environment()
+        bases = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'], aliases={'default'})
+        try:
+            contexto = contexto_sembrado() if options['keepdb'] else None
+            if contexto is None:
+                inicio = time.perf_counter()
+                contexto = sembrar(options['usuarios'], options['proyectos'], options['tareas'], options['semilla'])
+                self.stdout.write(f"Datos sembrados en {time.perf_counter() - inicio:.1f}s ({connection.vendor}).")
+            else:
+                self.stdout.write(f"Reutilizando los datos de la base de prueba ({connection.vendor}).")
+
+            resultados = {}
+            # Con réplicas configuradas los GET cuentan sus queries aparte (ver api/replicas.py)
+            alias = ('default', *settings.DATABASE_REPLICAS)
+            for escenario in escenarios:
+                try:
+                    resultados[escenario.nombre] = medir(escenario, contexto, options['repeticiones'], alias)
+                except Exception as exc:
+                    resultados[escenario.nombre] = {'ruta': escenario.ruta, 'error': repr(exc)}
+                self._imprimir(escenario.nombre, resultados[escenario.nombre])
+        finally:
+            teardown_databases(bases, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        comparaciones = comparar_escenarios(resultados)
+        for nombre, comparacion in comparaciones.items():
+            if 'error' in comparacion:
+                self.stdout.write(f"{nombre:28} ERROR {comparacion['error']}")
+                continue
+            antes, despues = comparacion['antes'], comparacion['despues']
+            self.stdout.write(
+                f"{nombre:28} antes={antes['p50_ms']:>9.2f}ms p95={antes['p95_ms']:>9.2f}ms ({antes['queries']} queries) "
+                f"despues={despues['p50_ms']:>9.2f}ms p95={despues['p95_ms']:>9.2f}ms ({despues['queries']} queries) "
+                f"x{comparacion['mejora']}"
+            )
+
+        salida = {
+            'meta': {
+                'fecha': timezone.now().isoformat(),
+                'base': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'volumen': {k: options[k] for k in ('usuarios', 'proyectos', 'tareas', 'semilla')},
+                'repeticiones': options['repeticiones'],
+            },
+            'resultados': resultados,
+            'comparaciones': comparaciones,
+        }
+        if options['salida']:
+            with open(options['salida'], 'w') as archivo:
+                json.dump(salida, archivo, indent=2)
+
+        if options['baseline']:
+            with open(options['baseline']) as archivo:
+                baseline = json.load(archivo)['resultados']
+            regresiones = comparar(resultados, baseline, options['umbral_latencia'], options['umbral_memoria'])
+            if regresiones:
+                raise CommandError('Regresiones de rendimiento:\n  ' + '\n  '.join(regresiones))
+            self.stdout.write('Sin regresiones respecto del baseline.')
+
+    def _imprimir(self, nombre, resultado):
+        if 'error' in resultado:
+            self.stdout.write(f"{nombre:28} ERROR {resultado['error']}")
+            return
+        queries = ' '.join(f'{a}={n}' for a, n in resultado['queries'].items())
+        self.stdout.write(
+            f"{nombre:28} p50={resultado['p50_ms']:>9.2f}ms p95={resultado['p95_ms']:>9.2f}ms "
+            f"{queries:12} mem={resultado['memoria_pico_kb']:>9.1f}KB status={resultado['status']}"
+        )
@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from api.benchmarks.sse import medir_carga
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de carga del canal SSE (/api/events/): miles de conexiones '
+        'ociosas en un solo event loop y latencia de fan-out por evento.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--suscriptores', type=int, default=5000)
+        parser.add_argument('--eventos', type=int, default=200)
+        parser.add_argument('--tasa', type=float, default=50, help='Eventos por segundo (0 = sin pausa).')
+        parser.add_argument('--usuarios', type=int, default=500)
+        parser.add_argument('--proyectos', type=int, default=2000)
+        parser.add_argument('--proyectos-por-usuario', type=int, default=5)
+        parser.add_argument('--staff', type=float, default=0.02, help='Fracción de conexiones de staff (ven todo).')
+        parser.add_argument('--ocioso', type=float, default=2, help='Segundos con las conexiones ociosas antes de publicar.')
+        parser.add_argument('--latido', type=float, default=15)
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--salida', default=None, help='Archivo JSON donde guardar los resultados.')
+
+    def handle(self, *args, **options):
+        claves = ('suscriptores', 'eventos', 'tasa', 'usuarios', 'proyectos', 'proyectos_por_usuario',
+                  'staff', 'ocioso', 'latido', 'semilla')
+        resultado = medir_carga(**{k: options[k] for k in claves})
+        self.stdout.write(json.dumps(resultado, indent=2))
+        if resultado['entregas'] != resultado['entregas_esperadas']:
+            self.stderr.write(
+                f"Se entregaron {resultado['entregas']} de {resultado['entregas_esperadas']} mensajes esperados.")
+        if options['salida']:
+            with open(options['salida'], 'w') as archivo:
+                json.dump(resultado, archivo, indent=2)
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from api.correo import enviar_lote
+
+
+class Command(BaseCommand):
+    help = 'Envía los correos encolados reutilizando una conexión SMTP (worker).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.MAIL_QUEUE_BATCH_SIZE,
+                            help='Correos por lote.')
+        parser.add_argument('--intervalo', type=float, default=1.0,
+                            help='Segundos de espera cuando no hay correos pendientes.')
+        parser.add_argument('--once', action='store_true',
+                            help='Envía los pendientes y termina en vez de quedarse escuchando.')
+
+    def handle(self, *args, **options):
+        conexion = get_connection(fail_silently=False)
+        ultimo_envio = time.monotonic()
+        try:
+            while True:
+                tomados = enviar_lote(conexion, options['batch_size'])
+                if tomados:
+                    ultimo_envio = time.monotonic()
+                elif time.monotonic() - ultimo_envio > settings.MAIL_QUEUE_IDLE_CLOSE:
+                    # Sin tráfico: se libera la conexión; se reabre con el próximo correo
+                    conexion.close()
+
+                if tomados < options['batch_size']:
+                    if options['once']:
+                        return
+                    time.sleep(options['intervalo'])
+        finally:
+            conexion.close()
@@ -0,0 +1,41 @@
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importacion import FORMATOS, IMPORTADORES, detectar_formato, importar, leer_filas
+
+
+class Command(BaseCommand):
+    help = 'Importa proyectos o tareas desde un archivo CSV/NDJSON (en bloques, sin cargarlo entero).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('modelo', choices=sorted(IMPORTADORES))
+        parser.add_argument('archivo')
+        parser.add_argument('--usuario', required=True,
+                            help='Username con cuyos permisos se importa (y creador de los proyectos).')
+        parser.add_argument('--formato', choices=FORMATOS, default=None,
+                            help='Por defecto se deduce de la extensión (.ndjson/.jsonl o CSV).')
+        parser.add_argument('--errores', type=int, default=20, help='Errores a mostrar al final.')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['usuario'])
+        except User.DoesNotExist:
+            raise CommandError(f"No existe el usuario '{options['usuario']}'.")
+        formato = detectar_formato(options['archivo'], options['formato'])
+
+        def al_avanzar(resumen):
+            self.stdout.write(
+                f"{resumen['filas']} filas, {resumen['creadas']} creadas, {resumen['errores_total']} con error "
+                f"({resumen['filas_por_segundo']} filas/s)"
+            )
+
+        with open(options['archivo'], 'rb') as archivo:
+            resumen = importar(IMPORTADORES[options['modelo']](user), leer_filas(File(archivo), formato), al_avanzar)
+
+        for error in resumen['errores'][:options['errores']]:
+            self.stderr.write(f"línea {error['linea']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Importadas {resumen['creadas']} de {resumen['filas']} filas en {resumen['segundos']}s "
+            f"({resumen['filas_por_segundo']} filas/s)."
+        ))
@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.outbox import OutboxError, cargar_consumidores, procesar_lote, purgar_procesados
+
+
+class Command(BaseCommand):
+    help = 'Procesa en lotes los eventos pendientes del outbox (worker).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE,
+                            help='Eventos por lote.')
+        parser.add_argument('--intervalo', type=float, default=1.0,
+                            help='Segundos de espera cuando no hay eventos pendientes.')
+        parser.add_argument('--once', action='store_true',
+                            help='Vacía los pendientes y termina en vez de quedarse escuchando.')
+        parser.add_argument('--purgar-dias', type=int, default=None,
+                            help='Borra eventos procesados hace más de N días y termina.')
+
+    def handle(self, *args, **options):
+        if options['purgar_dias'] is not None:
+            borrados = purgar_procesados(options['purgar_dias'])
+            self.stdout.write(f"{borrados} eventos procesados eliminados.")
+            return
+
+        consumidores = cargar_consumidores()
+        intervalo = options['intervalo']
+        espera = intervalo
+
+        while True:
+            try:
+                procesados = procesar_lote(consumidores, options['batch_size'])
+                espera = intervalo
+            except OutboxError as exc:
+                # Backoff exponencial mientras un consumidor siga fallando
+                self.stderr.write(f"Lote fallido, se reintentará: {exc}")
+                if options['once']:
+                    return
+                espera = min(espera * 2, 60)
+                time.sleep(espera)
+                continue
+
+            if procesados < options['batch_size']:
+                if options['once']:
+                    return
+                time.sleep(espera)
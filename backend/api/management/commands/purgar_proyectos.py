@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.eliminacion import proyectos_pendientes, purgar_proyecto
+
+
+class Command(BaseCommand):
+    help = 'Purga en lotes los proyectos con baja diferida y sus tareas (worker).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.API_ELIMINACION_LOTE,
+                            help='Tareas borradas por transacción.')
+        parser.add_argument('--intervalo', type=float, default=5.0,
+                            help='Segundos de espera cuando no hay proyectos pendientes.')
+        parser.add_argument('--once', action='store_true',
+                            help='Purga los pendientes y termina en vez de quedarse escuchando.')
+
+    def handle(self, *args, **options):
+        while True:
+            pendiente = proyectos_pendientes().values_list('pk', flat=True).first()
+            if pendiente is None:
+                if options['once']:
+                    return
+                time.sleep(options['intervalo'])
+                continue
+            # skip_locked: otro worker puede estar purgando el mismo proyecto
+            tareas = purgar_proyecto(pendiente, options['batch_size'], saltar_bloqueadas=True)
+            if tareas is not None:
+                self.stdout.write(f"Proyecto {pendiente} purgado ({tareas} tareas).")
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.indicadores import REGISTRO, reconciliar_indicadores
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los indicadores derivados del dashboard y corrige desvíos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('nombres', nargs='*',
+                            help=f"Indicadores a recalcular (por defecto todos: {', '.join(REGISTRO)}).")
+        parser.add_argument('--cada', type=float, default=None,
+                            help='Repite la reconciliación cada N segundos en vez de ejecutarla una vez.')
+
+    def handle(self, *args, **options):
+        desconocidos = set(options['nombres']) - set(REGISTRO)
+        if desconocidos:
+            raise CommandError(f"Indicadores desconocidos: {', '.join(sorted(desconocidos))}")
+
+        while True:
+            corregidos = reconciliar_indicadores(options['nombres'] or None)
+            for nombre, (anterior, nuevo) in corregidos.items():
+                self.stdout.write(f"{nombre}: {anterior} -> {nuevo}")
+            if options['cada'] is None:
+                return
+            time.sleep(options['cada'])
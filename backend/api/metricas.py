@@ -0,0 +1,278 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from pymongo import monitoring
+
+"""
+Instrumentación por petición.
+
+- Un ``execute_wrapper`` instalado en cada conexión SQL (ver apps.py) y un
+  listener de comandos de pymongo cuentan queries y tiempo por alias.
+- ``medir_serializacion`` acumula el tiempo de serialización (descontando el
+  tiempo de base de datos que ocurra dentro, p. ej. querysets perezosos).
+- ``MetricasMiddleware`` publica todo en ``Server-Timing``, en una línea de
+  log JSON (logger ``api.metricas``) y en histogramas del proceso que se
+  exponen en formato Prometheus en /api/metrics/, junto con la decisión de
+  ruteo de lecturas (réplica o primaria, ver replicas.py).
+
+Los histogramas viven en memoria de cada proceso: con varios workers de
+gunicorn cada uno reporta lo suyo.
+"""
+
+logger = logging.getLogger(__name__)
+
+ALIAS_MONGO = 'mongo'
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_QUERIES = (1, 2, 5, 10, 20, 50, 100, 200)
+
+_actual = ContextVar('metricas_peticion', default=None)
+
+
+class MedicionPeticion:
+    def __init__(self):
+        self.queries = defaultdict(int)
+        self.db_ms = defaultdict(float)
+        self.serializacion_ms = 0.0
+        self._profundidad = 0
+
+    def registrar_query(self, alias, ms):
+        self.queries[alias] += 1
+        self.db_ms[alias] += ms
+
+    @property
+    def db_total_ms(self):
+        return sum(self.db_ms.values())
+
+    @property
+    def queries_total(self):
+        return sum(self.queries.values())
+
+
+def _registrar(alias, ms):
+    medicion = _actual.get()
+    if medicion is not None:
+        medicion.registrar_query(alias, ms)
+
+
+def wrapper_sql(execute, sql, params, many, context):
+    if _actual.get() is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        _registrar(context['connection'].alias, (time.perf_counter() - inicio) * 1000)
+
+
+def instalar_wrapper(sender, connection, **kwargs):
+    # djongo también termina en pymongo: lo cuenta el ListenerMongo
+    if connection.vendor != 'djongo' and wrapper_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(wrapper_sql)
+
+
+class ListenerMongo(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        _registrar(ALIAS_MONGO, event.duration_micros / 1000)
+
+    def failed(self, event):
+        _registrar(ALIAS_MONGO, event.duration_micros / 1000)
+
+
+@contextmanager
+def medir_serializacion():
+    medicion = _actual.get()
+    if medicion is None or medicion._profundidad:
+        yield
+        return
+    medicion._profundidad += 1
+    db_antes = medicion.db_total_ms
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        transcurrido = (time.perf_counter() - inicio) * 1000
+        medicion.serializacion_ms += transcurrido - (medicion.db_total_ms - db_antes)
+        medicion._profundidad -= 1
+
+
+class SerializacionMedidaMixin:
+    """
+    Mide ``serializer.data`` (ver Meta.list_serializer_class para many=True).
+    """
+    @property
+    def data(self):
+        with medir_serializacion():
+            return super().data
+
+
+# -----------------
+# Histogramas y contadores del proceso (formato de texto de Prometheus)
+# -----------------
+def _etiquetas(nombres, valores, extra=''):
+    pares = [f'{n}="{v}"' for n, v in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+class Contador:
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.series = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def incrementar(self, valores, cantidad=1):
+        with self._lock:
+            self.series[valores] += cantidad
+
+    def lineas(self):
+        with self._lock:
+            for valores, total in sorted(self.series.items()):
+                yield f'{self.nombre}{_etiquetas(self.etiquetas, valores)} {total:g}'
+
+
+class Histograma(Contador):
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas, buckets):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = buckets
+        self.series = {}
+
+    def observar(self, valores, valor):
+        with self._lock:
+            conteos, _, _ = serie = self.series.setdefault(valores, [[0] * len(self.buckets), 0.0, 0])
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    conteos[i] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def lineas(self):
+        with self._lock:
+            for valores, (conteos, suma, total) in sorted(self.series.items()):
+                limites = [f'{limite:g}' for limite in self.buckets] + ['+Inf']
+                for limite, conteo in zip(limites, conteos + [total]):
+                    etiquetas = _etiquetas(self.etiquetas, valores, 'le="%s"' % limite)
+                    yield f'{self.nombre}_bucket{etiquetas} {conteo}'
+                etiquetas = _etiquetas(self.etiquetas, valores)
+                yield f'{self.nombre}_sum{etiquetas} {suma:g}'
+                yield f'{self.nombre}_count{etiquetas} {total}'
+
+
+PETICIONES = Contador('api_peticiones_total', 'Peticiones atendidas.', ('ruta', 'metodo', 'status'))
+EXCESO_QUERIES = Contador(
+    'api_peticiones_exceso_queries_total', 'Peticiones sobre settings.METRICAS_UMBRAL_QUERIES.', ('ruta',))
+DURACION = Histograma('api_peticion_duracion_segundos', 'Tiempo total de la vista.', ('ruta', 'metodo'), BUCKETS_SEGUNDOS)
+DB_DURACION = Histograma('api_db_duracion_segundos', 'Tiempo en base de datos por alias.', ('ruta', 'alias'), BUCKETS_SEGUNDOS)
+DB_QUERIES = Histograma('api_db_queries', 'Queries por petición y alias.', ('ruta', 'alias'), BUCKETS_QUERIES)
+SERIALIZACION = Histograma(
+    'api_serializacion_duracion_segundos', 'Tiempo de serialización.', ('ruta',), BUCKETS_SEGUNDOS)
+RUTEO = Contador(
+    'api_ruteo_lecturas_total', 'Peticiones por destino de sus lecturas (replica, primaria o adherencia).',
+    ('ruta', 'decision', 'alias'))
+
+METRICAS = (PETICIONES, EXCESO_QUERIES, DURACION, DB_DURACION, DB_QUERIES, SERIALIZACION, RUTEO)
+
+
+def exportar():
+    lineas = []
+    for metrica in METRICAS:
+        lineas.append(f'# HELP {metrica.nombre} {metrica.ayuda}')
+        lineas.append(f'# TYPE {metrica.nombre} {metrica.tipo}')
+        lineas.extend(metrica.lineas())
+    return '\n'.join(lineas) + '\n'
+
+
+# -----------------
+# Middleware
+# -----------------
+class MetricasMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = asyncio.iscoroutinefunction(get_response)
+        if self.es_async:
+            # Igual que MiddlewareMixin: Django lo trata como corutina
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        medicion = MedicionPeticion()
+        token = _actual.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _actual.reset(token)
+        return self._publicar(request, response, medicion, time.perf_counter() - inicio)
+
+    async def __acall__(self, request):
+        medicion = MedicionPeticion()
+        token = _actual.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _actual.reset(token)
+        return self._publicar(request, response, medicion, time.perf_counter() - inicio)
+
+    def _publicar(self, request, response, medicion, segundos):
+        match = request.resolver_match
+        ruta = match.view_name if match else 'sin_ruta'
+        alias = sorted(set(medicion.queries) | {'default'})
+
+        tiempos = [f'db-{a};dur={medicion.db_ms[a]:.1f};desc="{medicion.queries[a]} queries"' for a in alias]
+        tiempos.append(f'serializacion;dur={medicion.serializacion_ms:.1f}')
+        tiempos.append(f'total;dur={segundos * 1000:.1f}')
+        ruteo = getattr(request, 'ruteo_db', None)
+        if ruteo is not None:
+            resumen = ruteo.resumen()
+            tiempos.append(f'ruteo;desc="{resumen["decision"]}:{resumen["alias"]}"')
+            RUTEO.incrementar((ruta, resumen['decision'], resumen['alias']))
+        response['Server-Timing'] = ', '.join(tiempos)
+
+        PETICIONES.incrementar((ruta, request.method, str(response.status_code)))
+        DURACION.observar((ruta, request.method), segundos)
+        SERIALIZACION.observar((ruta,), medicion.serializacion_ms / 1000)
+        for a in alias:
+            DB_DURACION.observar((ruta, a), medicion.db_ms[a] / 1000)
+            DB_QUERIES.observar((ruta, a), medicion.queries[a])
+
+        registro = {
+            'ruta': ruta,
+            'metodo': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(segundos * 1000, 1),
+            'serializacion_ms': round(medicion.serializacion_ms, 1),
+            'queries': dict(medicion.queries),
+            'db_ms': {a: round(ms, 1) for a, ms in medicion.db_ms.items()},
+        }
+        if ruteo is not None:
+            registro['ruteo'] = resumen
+        if medicion.queries_total > settings.METRICAS_UMBRAL_QUERIES:
+            # Probable N+1: se marca para que salte a la vista
+            EXCESO_QUERIES.incrementar((ruta,))
+            registro['exceso_queries'] = True
+            logger.warning(json.dumps(registro))
+        else:
+            logger.info(json.dumps(registro))
+        return response
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-17 10:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_proyecto_tarea'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(fields=['creador', 'created_at'], name='proyecto_creador_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['asignado_a', 'created_at'], name='tarea_asignado_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['proyecto', 'created_at'], name='tarea_proyecto_created_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-17 10:11
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_evento_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorreoFallido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asunto', models.CharField(max_length=255)),
+                ('mensaje', models.TextField()),
+                ('remitente', models.CharField(max_length=255)),
+                ('destinatarios', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField()),
+                ('fallido_at', models.DateTimeField(auto_now_add=True)),
+                ('intentos', models.PositiveSmallIntegerField()),
+                ('ultimo_error', models.TextField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CorreoPendiente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asunto', models.CharField(max_length=255)),
+                ('mensaje', models.TextField()),
+                ('remitente', models.CharField(max_length=255)),
+                ('destinatarios', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('siguiente_intento_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('ultimo_error', models.TextField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='correopendiente',
+            index=models.Index(fields=['siguiente_intento_at', 'id'], name='correo_siguiente_intento_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.25 on 2026-10-17 10:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def copiar_created_at(apps, schema_editor):
+    # Las filas existentes toman su fecha de creación como última modificación
+    for nombre in ('Proyecto', 'Tarea'):
+        modelo = apps.get_model('api', nombre)
+        modelo.objects.using(schema_editor.connection.alias).update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_cola_correos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proyecto',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='tarea',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copiar_created_at, migrations.RunPython.noop),
+    ]
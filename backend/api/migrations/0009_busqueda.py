@@ -0,0 +1,76 @@
+from django.db import migrations
+
+from ._historico import crear_fts_sqlite
+
+"""
+Índices de búsqueda de texto completo (ver api/busqueda.py).
+
+- PostgreSQL: columna ``busqueda`` tsvector generada (STORED) con índice
+  GIN. PostgreSQL la recalcula en cada escritura, también en bulk_create /
+  COPY, y el ranking lee el vector guardado en vez de recalcularlo.
+  No está en los modelos: Django nunca la escribe.
+- SQLite (desarrollo y tests): tablas FTS5 de contenido externo, con
+  triggers que las mantienen al día (_historico.crear_fts_sqlite).
+"""
+
+CONFIG = 'spanish'
+# Campos y peso (A pesa más que B en ts_rank)
+CAMPOS = {
+    'Proyecto': (('name', 'A'), ('description', 'B')),
+    'Tarea': (('title', 'A'),),
+}
+
+
+def _nombre_indice(modelo):
+    return f'{modelo._meta.model_name}_busqueda_idx'
+
+
+def _crear_postgres(apps, schema_editor):
+    for nombre, campos in CAMPOS.items():
+        modelo = apps.get_model('api', nombre)
+        tabla = modelo._meta.db_table
+        vector = ' || '.join(
+            f"setweight(to_tsvector('{CONFIG}', coalesce({campo}, '')), '{peso}')" for campo, peso in campos
+        )
+        schema_editor.execute(
+            f'ALTER TABLE {tabla} ADD COLUMN busqueda tsvector GENERATED ALWAYS AS ({vector}) STORED'
+        )
+        schema_editor.execute(f'CREATE INDEX {_nombre_indice(modelo)} ON {tabla} USING gin (busqueda)')
+
+
+def _crear_sqlite(apps, schema_editor):
+    for nombre, campos in CAMPOS.items():
+        tabla = apps.get_model('api', nombre)._meta.db_table
+        crear_fts_sqlite(schema_editor, tabla, [campo for campo, _ in campos])
+
+
+def crear_indices(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _crear_postgres(apps, schema_editor)
+    elif vendor == 'sqlite':
+        _crear_sqlite(apps, schema_editor)
+
+
+def borrar_indices(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for nombre in CAMPOS:
+        modelo = apps.get_model('api', nombre)
+        tabla = modelo._meta.db_table
+        if vendor == 'postgresql':
+            schema_editor.execute(f'ALTER TABLE {tabla} DROP COLUMN IF EXISTS busqueda')
+        elif vendor == 'sqlite':
+            for sufijo in ('ai', 'ad', 'au'):
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS {tabla}_fts_{sufijo}')
+            schema_editor.execute(f'DROP TABLE IF EXISTS {tabla}_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_token_revocado'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, borrar_indices),
+    ]
@@ -0,0 +1,91 @@
+from django.db import migrations, models
+
+from ._historico import crear_fts_sqlite
+
+"""
+Une Tarea.status (texto libre) y Tarea.estado (texto con choices) en un
+único código entero chico. Manda 'status' si trae un valor reconocible
+(como hacía normalizeStatus en el frontend); si no, 'estado'; si tampoco,
+'todo'. La conversión es un solo UPDATE.
+"""
+
+# Textos reconocidos -> código (EstadoTarea: 0 todo, 1 in_progress, 2 done)
+SINONIMOS = {
+    0: ('todo', 'to_do', 'to do', 'to-do', 'pendiente'),
+    1: ('in_progress', 'in progress', 'in-progress', 'doing', 'en_progreso', 'en progreso'),
+    2: ('done', 'completed', 'completada'),
+}
+
+
+def _caso(columna):
+    normalizada = f"lower(trim({columna}))"
+    ramas = ' '.join(
+        f"WHEN {normalizada} IN ({', '.join(repr(t) for t in textos)}) THEN {codigo}"
+        for codigo, textos in SINONIMOS.items()
+    )
+    return f'CASE {ramas} END'
+
+
+def fusionar_estados(apps, schema_editor):
+    tabla = apps.get_model('api', 'Tarea')._meta.db_table
+    schema_editor.execute(
+        f"UPDATE {tabla} SET estado_codigo = COALESCE({_caso('status')}, {_caso('estado')}, 0)"
+    )
+
+
+def separar_estados(apps, schema_editor):
+    tabla = apps.get_model('api', 'Tarea')._meta.db_table
+    schema_editor.execute(
+        f"UPDATE {tabla} SET estado = CASE estado_codigo WHEN 1 THEN 'in_progress' WHEN 2 THEN 'done' ELSE 'todo' END, "
+        f"status = NULL"
+    )
+
+
+def restaurar_fts(apps, schema_editor):
+    # En SQLite quitar columnas rehace la tabla y se pierden los triggers de FTS5
+    if schema_editor.connection.vendor == 'sqlite':
+        crear_fts_sqlite(schema_editor, apps.get_model('api', 'Tarea')._meta.db_table, ['title'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_busqueda'),
+    ]
+
+    operations = [
+        # Al revertir, esta operación corre al final
+        migrations.RunPython(migrations.RunPython.noop, restaurar_fts),
+        migrations.AddField(
+            model_name='tarea',
+            name='estado_codigo',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'To do'), (1, 'In progress'), (2, 'Done')], default=0),
+        ),
+        migrations.RunPython(fusionar_estados, separar_estados),
+        migrations.RemoveIndex(
+            model_name='tarea',
+            name='tarea_estado_created_idx',
+        ),
+        migrations.RemoveField(
+            model_name='tarea',
+            name='status',
+        ),
+        migrations.RemoveField(
+            model_name='tarea',
+            name='estado',
+        ),
+        migrations.RenameField(
+            model_name='tarea',
+            old_name='estado_codigo',
+            new_name='estado',
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['estado', 'created_at'], name='tarea_estado_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(condition=models.Q(('estado', 2), _negated=True), fields=['asignado_a', 'created_at'], name='tarea_abiertas_idx'),
+        ),
+        migrations.RunPython(restaurar_fts, migrations.RunPython.noop),
+    ]
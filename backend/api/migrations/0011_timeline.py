@@ -0,0 +1,38 @@
+from django.db import migrations
+
+from ._historico import sql_indice_timeline
+
+"""
+Índices de la línea de tiempo (ver api/timeline.py): GiST sobre el
+daterange de cada fila en PostgreSQL y B-tree sobre (fin, inicio) en
+SQLite. No están en los modelos porque son distintos en cada motor.
+
+El SQL congelado está en _historico.sql_indice_timeline en vez de
+importar api.timeline: si el índice cambia, hace falta una migración nueva.
+"""
+
+TABLAS = {'Proyecto': 'proyecto_timeline_idx', 'Tarea': 'tarea_timeline_idx'}
+
+
+def crear_indices(apps, schema_editor):
+    for nombre, indice in TABLAS.items():
+        sql = sql_indice_timeline(schema_editor.connection.vendor, apps.get_model('api', nombre)._meta.db_table, indice)
+        if sql:
+            schema_editor.execute(sql)
+
+
+def borrar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        for indice in TABLAS.values():
+            schema_editor.execute(f'DROP INDEX IF EXISTS {indice}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_estado_codigo'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, borrar_indices),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.25 on 2026-10-17 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_timeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdherenciaPrimaria',
+            fields=[
+                ('user_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('hasta', models.DateTimeField()),
+            ],
+        ),
+    ]
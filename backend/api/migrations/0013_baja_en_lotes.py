@@ -0,0 +1,87 @@
+from django.db import migrations, models
+
+from ._historico import crear_fts_sqlite, sql_indice_timeline
+
+"""
+Bajas en lotes (ver api/eliminacion.py): la marca de baja diferida de
+Proyecto y, en PostgreSQL, ON DELETE CASCADE en las FKs de Tarea.proyecto,
+Tarea.asignado_a y Proyecto.creador.
+"""
+
+
+# FKs que llevan ON DELETE CASCADE en la base: (modelo, campo)
+CASCADAS = (('Tarea', 'proyecto'), ('Tarea', 'asignado_a'), ('Proyecto', 'creador'))
+
+
+def restaurar_sqlite(apps, schema_editor):
+    # En SQLite agregar o quitar columnas rehace la tabla: se pierden los
+    # triggers de FTS5 y el índice de la línea de tiempo (ver 0009 y 0011)
+    if schema_editor.connection.vendor == 'sqlite':
+        tabla = apps.get_model('api', 'Proyecto')._meta.db_table
+        crear_fts_sqlite(schema_editor, tabla, ['name', 'description'])
+        schema_editor.execute('DROP INDEX IF EXISTS proyecto_timeline_idx')
+        schema_editor.execute(sql_indice_timeline('sqlite', tabla, 'proyecto_timeline_idx'))
+
+
+def _restricciones_fk(schema_editor, tabla, columna):
+    with schema_editor.connection.cursor() as cursor:
+        restricciones = schema_editor.connection.introspection.get_constraints(cursor, tabla)
+    return [
+        nombre for nombre, datos in restricciones.items()
+        if datos['foreign_key'] and datos['columns'] == [columna]
+    ]
+
+
+def cambiar_cascadas(apps, schema_editor, en_cascada):
+    """
+    Recrea en PostgreSQL las FKs de CASCADAS con o sin ON DELETE CASCADE
+    (diferibles, como las crea Django). Si una migración posterior altera
+    uno de esos campos, Django recrea la FK sin la cascada: esa migración
+    tiene que volver a agregarla.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    qn = schema_editor.quote_name
+    for nombre_modelo, nombre_campo in CASCADAS:
+        modelo = apps.get_model('api', nombre_modelo)
+        campo = modelo._meta.get_field(nombre_campo)
+        tabla, columna = modelo._meta.db_table, campo.column
+        destino = campo.remote_field.model._meta
+        for restriccion in _restricciones_fk(schema_editor, tabla, columna):
+            schema_editor.execute(
+                f'ALTER TABLE {qn(tabla)} DROP CONSTRAINT {qn(restriccion)}, '
+                f'ADD CONSTRAINT {qn(restriccion)} FOREIGN KEY ({qn(columna)}) '
+                f'REFERENCES {qn(destino.db_table)} ({qn(campo.target_field.column)})'
+                f"{' ON DELETE CASCADE' if en_cascada else ''} DEFERRABLE INITIALLY DEFERRED"
+            )
+
+
+def con_cascada(apps, schema_editor):
+    cambiar_cascadas(apps, schema_editor, True)
+
+
+def sin_cascada(apps, schema_editor):
+    cambiar_cascadas(apps, schema_editor, False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_adherencia_primaria'),
+    ]
+
+    operations = [
+        # Al revertir, esta operación corre al final
+        migrations.RunPython(migrations.RunPython.noop, restaurar_sqlite),
+        migrations.AddField(
+            model_name='proyecto',
+            name='eliminado_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(condition=models.Q(('eliminado_at__isnull', False)), fields=['eliminado_at'], name='proyecto_eliminado_idx'),
+        ),
+        migrations.RunPython(restaurar_sqlite, migrations.RunPython.noop),
+        migrations.RunPython(con_cascada, sin_cascada),
+    ]
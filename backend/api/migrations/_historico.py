@@ -0,0 +1,45 @@
+"""
+SQL congelado que comparten varias migraciones.
+
+Las migraciones no importan código de la aplicación (api.busqueda,
+api.timeline), que puede cambiar después; importan de acá. Nada de esto se
+modifica: si el SQL cambia, se agrega una función nueva y una migración
+que la use. El loader de migraciones ignora este módulo (empieza con '_').
+"""
+
+
+def crear_fts_sqlite(schema_editor, tabla, campos):
+    # Copia de busqueda.crear_fts_sqlite tal como la crea 0009
+    columnas = ', '.join(campos)
+    nuevos = ', '.join(f'new.{c}' for c in campos)
+    viejos = ', '.join(f'old.{c}' for c in campos)
+    fts = f'{tabla}_fts'
+    for sufijo in ('ai', 'ad', 'au'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {fts}_{sufijo}')
+    for sql in (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columnas}, content='{tabla}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabla} BEGIN "
+        f"INSERT INTO {fts}(rowid, {columnas}) VALUES (new.id, {nuevos}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabla} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columnas}) VALUES ('delete', old.id, {viejos}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {tabla} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columnas}) VALUES ('delete', old.id, {viejos}); "
+        f"INSERT INTO {fts}(rowid, {columnas}) VALUES (new.id, {nuevos}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ):
+        schema_editor.execute(sql)
+
+
+def sql_indice_timeline(vendor, tabla, nombre):
+    # Copia de timeline.sql_indice tal como la crea 0011
+    if vendor == 'postgresql':
+        rango = (
+            'CASE WHEN fecha_inicio IS NOT NULL OR fecha_fin IS NOT NULL '
+            "THEN daterange(LEAST(fecha_inicio, fecha_fin), GREATEST(fecha_inicio, fecha_fin), '[]') END"
+        )
+        return f'CREATE INDEX {nombre} ON {tabla} USING gist (({rango}))'
+    if vendor == 'sqlite':
+        extremos = 'COALESCE(fecha_inicio, fecha_fin), COALESCE(fecha_fin, fecha_inicio)'
+        return f'CREATE INDEX {nombre} ON {tabla} (MAX({extremos}), MIN({extremos}))'
+    return None
@@ -1,5 +1,7 @@
+from django.core import exceptions
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 # Modelo para los indicadores del dashboard (ej.: almacenado en MongoDB)
 class DashboardIndicator(models.Model):
@@ -10,6 +12,67 @@ class DashboardIndicator(models.Model):
         return f"{self.nombre}: {self.valor}"
 
 
+# Estado de una Tarea: un código entero chico (ver EstadoField)
+class EstadoTarea(models.IntegerChoices):
+    TODO = 0, 'To do'
+    IN_PROGRESS = 1, 'In progress'
+    DONE = 2, 'Done'
+
+    @classmethod
+    def codigo(cls, valor):
+        """
+        Código a partir del código o del texto ('todo', 'In Progress', 'done'...).
+        Lanza ValueError si no se reconoce.
+        """
+        if isinstance(valor, int):
+            return cls(valor).value
+        texto = str(valor).strip().lower().replace(' ', '_').replace('-', '_')
+        if texto.isdigit():
+            return cls(int(texto)).value
+        try:
+            return SINONIMOS_ESTADO[texto]
+        except KeyError:
+            raise ValueError(f'Estado desconocido: {valor!r}')
+
+    @classmethod
+    def clave(cls, valor):
+        # Texto que expone la API: 'todo', 'in_progress', 'done'
+        return cls(cls.codigo(valor)).name.lower()
+
+
+CLAVES_ESTADO = {e.value: e.name.lower() for e in EstadoTarea}
+SINONIMOS_ESTADO = {
+    'todo': EstadoTarea.TODO, 'to_do': EstadoTarea.TODO, 'pendiente': EstadoTarea.TODO,
+    'in_progress': EstadoTarea.IN_PROGRESS, 'doing': EstadoTarea.IN_PROGRESS, 'en_progreso': EstadoTarea.IN_PROGRESS,
+    'done': EstadoTarea.DONE, 'completed': EstadoTarea.DONE, 'completada': EstadoTarea.DONE,
+}
+
+
+class EstadoField(models.PositiveSmallIntegerField):
+    """
+    Guarda el código de EstadoTarea pero acepta también el texto al asignar
+    y al filtrar (``filter(estado='done')``), por compatibilidad.
+    """
+    def to_python(self, value):
+        if isinstance(value, str):
+            try:
+                return EstadoTarea.codigo(value)
+            except ValueError as exc:
+                raise exceptions.ValidationError(str(exc), code='invalid')
+        return super().to_python(value)
+
+    def get_prep_value(self, value):
+        if isinstance(value, str):
+            value = self.to_python(value)
+        return super().get_prep_value(value)
+
+    def deconstruct(self):
+        # En la base es un PositiveSmallIntegerField: las migraciones no
+        # dependen de esta clase (ni importan api.models)
+        nombre, _, args, kwargs = super().deconstruct()
+        return nombre, 'django.db.models.PositiveSmallIntegerField', args, kwargs
+
+
 # Modelo Proyecto (PostgreSQL)
 class Proyecto(models.Model):
     name = models.CharField(max_length=200)
@@ -24,6 +87,17 @@ class Proyecto(models.Model):
         blank=True,
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Baja diferida: pendiente de purga por `manage.py purgar_proyectos` (ver api/eliminacion.py)
+    eliminado_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['creador', 'created_at'], name='proyecto_creador_created_idx'),
+            models.Index(fields=['fecha_inicio'], name='proyecto_fecha_inicio_idx'),
+            models.Index(fields=['fecha_fin'], name='proyecto_fecha_fin_idx'),
+            models.Index(fields=['eliminado_at'], name='proyecto_eliminado_idx', condition=models.Q(eliminado_at__isnull=False)),
+        ]
 
     def __str__(self):
         return self.name
@@ -32,7 +106,6 @@ class Proyecto(models.Model):
 # Modelo Tarea (PostgreSQL)
 class Tarea(models.Model):
     title = models.CharField(max_length=200)
-    status = models.CharField(max_length=50, default="todo", null=True, blank=True)
     fecha_inicio = models.DateField(null=True, blank=True)
     fecha_fin = models.DateField(null=True, blank=True)
     proyecto = models.ForeignKey(
@@ -49,12 +122,110 @@ class Tarea(models.Model):
         null=True,
         blank=True,
     )
-    estado = models.CharField(
-        max_length=20,
-        choices=(("todo", "To do"), ("in_progress", "In progress"), ("done", "Done")),
-        default="todo",
-    )
+    # Reemplaza a los antiguos 'status' (texto libre) y 'estado' (texto con choices)
+    estado = EstadoField(choices=EstadoTarea.choices, default=EstadoTarea.TODO)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Se recuerdan los valores leídos para informar transiciones (ver outbox.payload_tarea)
+        instancia = super().from_db(db, field_names, values)
+        instancia._estado_original = instancia.__dict__.get('estado')
+        instancia._proyecto_original = instancia.__dict__.get('proyecto_id')
+        instancia._asignado_original = instancia.__dict__.get('asignado_a_id')
+        return instancia
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['asignado_a', 'created_at'], name='tarea_asignado_created_idx'),
+            models.Index(fields=['proyecto', 'created_at'], name='tarea_proyecto_created_idx'),
+            models.Index(fields=['estado', 'created_at'], name='tarea_estado_created_idx'),
+            # Parcial: sólo las tareas abiertas (las que más se consultan)
+            models.Index(
+                fields=['asignado_a', 'created_at'],
+                name='tarea_abiertas_idx',
+                condition=~models.Q(estado=EstadoTarea.DONE),
+            ),
+            models.Index(fields=['fecha_inicio'], name='tarea_fecha_inicio_idx'),
+            models.Index(fields=['fecha_fin'], name='tarea_fecha_fin_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+# Outbox transaccional (PostgreSQL): eventos de cambios pendientes de procesar
+class EventoOutbox(models.Model):
+    tipo = models.CharField(max_length=50)
+    objeto_id = models.BigIntegerField()
+    payload = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    procesado_at = models.DateTimeField(null=True, blank=True)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    ultimo_error = models.TextField(null=True, blank=True)
+    # Lease del worker que tomó el evento (ver outbox._reclamar)
+    reclamado_hasta = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # El worker sólo recorre los pendientes, en orden de llegada
+            models.Index(fields=['id'], name='outbox_pendientes_idx', condition=models.Q(procesado_at__isnull=True)),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} #{self.objeto_id}"
+
+
+# Cola de correos salientes (PostgreSQL), enviados por `manage.py enviar_correos`
+class CorreoPendiente(models.Model):
+    asunto = models.CharField(max_length=255)
+    mensaje = models.TextField()
+    remitente = models.CharField(max_length=255)
+    destinatarios = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    siguiente_intento_at = models.DateTimeField(default=timezone.now)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    ultimo_error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['siguiente_intento_at', 'id'], name='correo_siguiente_intento_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.asunto} -> {', '.join(self.destinatarios)}"
+
+
+# Correos que agotaron sus reintentos (dead-letter)
+class CorreoFallido(models.Model):
+    asunto = models.CharField(max_length=255)
+    mensaje = models.TextField()
+    remitente = models.CharField(max_length=255)
+    destinatarios = models.JSONField(default=list)
+    created_at = models.DateTimeField()
+    fallido_at = models.DateTimeField(auto_now_add=True)
+    intentos = models.PositiveSmallIntegerField()
+    ultimo_error = models.TextField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.asunto} -> {', '.join(self.destinatarios)}"
+
+
+# Tokens firmados revocados antes de expirar (ver api/tokens.py)
+class TokenRevocado(models.Model):
+    jti = models.CharField(max_length=32, unique=True)
+    expira_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
+
+
+# Hasta cuándo las lecturas de un usuario van a la primaria después de que
+# escribió (ver api/replicas.py). Vive en la primaria: la comparten todos los workers.
+class AdherenciaPrimaria(models.Model):
+    user_id = models.IntegerField(primary_key=True)
+    hasta = models.DateTimeField()
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"{self.user_id} -> {self.hasta}"
@@ -0,0 +1,267 @@
+import json
+import logging
+import urllib.request
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, models, router, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .eventos import publicar as publicar_eventos
+from .models import EstadoTarea, EventoOutbox
+
+"""
+Outbox transaccional.
+
+Los signals sólo agregan una fila compacta a EventoOutbox dentro de la misma
+transacción que el cambio. El worker (`manage.py procesar_outbox`) lee los
+eventos pendientes en lotes y se los entrega a los consumidores configurados
+en settings.OUTBOX_CONSUMERS. Entrega "al menos una vez": un evento sólo
+se marca procesado si todos los consumidores terminan sin error con él.
+
+Como la cola de correos (correo.py), el lote se reclama con un lease
+(``reclamado_hasta``) en una transacción corta y se entrega fuera de ella:
+un consumidor lento (p. ej. el webhook) no retiene locks de filas.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock de PostgreSQL: los workers lo toman compartido en cada lote
+# (de reclamar a registrar) y entregas_detenidas() exclusivo (ver
+# indicadores.reconciliar_indicadores)
+BLOQUEO_ENTREGAS = 0x6F7574626F78
+
+
+class OutboxError(Exception):
+    pass
+
+
+# -----------------
+# Registro de eventos (lado del request)
+# -----------------
+def payload_proyecto(proyecto):
+    return {'creador': proyecto.creador_id}
+
+
+def _clave_o_none(estado):
+    return None if estado is None else EstadoTarea.clave(estado)
+
+
+def payload_tarea(tarea):
+    return {
+        'proyecto': tarea.proyecto_id,
+        'asignado_a': tarea.asignado_a_id,
+        # Como texto ('todo', 'in_progress', 'done'), igual que en la API
+        'estado': EstadoTarea.clave(tarea.estado),
+        'estado_anterior': _clave_o_none(getattr(tarea, '_estado_original', None)),
+        # Quién la veía antes del cambio (ver cambios.py)
+        'proyecto_anterior': getattr(tarea, '_proyecto_original', None),
+        'asignado_anterior': getattr(tarea, '_asignado_original', None),
+    }
+
+
+def _publicar_al_confirmar(objetos):
+    # Al canal SSE (ver eventos.py) sólo llega lo que se confirmó
+    if objetos:
+        transaction.on_commit(lambda: publicar_eventos(objetos))
+
+
+def registrar_evento(tipo, objeto_id, payload=None):
+    evento = EventoOutbox.objects.create(tipo=tipo, objeto_id=objeto_id, payload=payload or {})
+    _publicar_al_confirmar([evento])
+    return evento
+
+
+def registrar_eventos(eventos):
+    """
+    Registra muchos eventos con un solo INSERT. ``eventos`` es un iterable
+    de tuplas (tipo, objeto_id, payload).
+    """
+    creados = EventoOutbox.objects.bulk_create(
+        [EventoOutbox(tipo=tipo, objeto_id=objeto_id, payload=payload or {}) for tipo, objeto_id, payload in eventos],
+        batch_size=settings.OUTBOX_BATCH_SIZE,
+    )
+    _publicar_al_confirmar(creados)
+    return creados
+
+
+def eventos_insertados(filas):
+    """
+    Para eventos insertados con SQL propio (``INSERT ... RETURNING id,
+    tipo, objeto_id, payload``): los publica al confirmar, igual que
+    registrar_eventos.
+    """
+    eventos = [
+        EventoOutbox(id=id, tipo=tipo, objeto_id=objeto_id, payload=json.loads(payload) if isinstance(payload, str) else payload)
+        for id, tipo, objeto_id, payload in filas
+    ]
+    _publicar_al_confirmar(eventos)
+    return eventos
+
+
+# -----------------
+# Procesamiento (lado del worker)
+# -----------------
+def cargar_consumidores():
+    return [import_string(ruta) for ruta in settings.OUTBOX_CONSUMERS]
+
+
+def _conexion_outbox():
+    return connections[router.db_for_write(EventoOutbox)]
+
+
+@contextmanager
+def _bloqueo_entregas(compartido):
+    # Advisory lock de sesión: dura más que las transacciones del bloque
+    conexion = _conexion_outbox()
+    if conexion.vendor != 'postgresql':
+        yield
+        return
+    sufijo = '_shared' if compartido else ''
+    with conexion.cursor() as cursor:
+        cursor.execute(f'SELECT pg_advisory_lock{sufijo}(%s)', [BLOQUEO_ENTREGAS])
+    try:
+        yield
+    finally:
+        with conexion.cursor() as cursor:
+            cursor.execute(f'SELECT pg_advisory_unlock{sufijo}(%s)', [BLOQUEO_ENTREGAS])
+
+
+def entregas_detenidas():
+    """
+    Ningún worker entrega eventos mientras dura el bloque: los pendientes
+    siguen pendientes y lo ya aplicado no cambia. Sólo en PostgreSQL; en
+    otros motores no se coordina con los workers.
+    """
+    return _bloqueo_entregas(compartido=False)
+
+
+def _entregar(consumidores, eventos):
+    """
+    Pasa ``eventos`` por los consumidores en orden, cada uno en su savepoint.
+    Devuelve None si todos terminaron o (índice del que falló, excepción):
+    los anteriores ya terminaron y no hace falta repetirlos.
+    """
+    for indice, consumidor in enumerate(consumidores):
+        try:
+            with transaction.atomic():
+                consumidor(eventos)
+        except Exception as exc:
+            return indice, exc
+    return None
+
+
+def _reclamar(tamano):
+    ahora = timezone.now()
+    with transaction.atomic():
+        # skip_locked permite correr varios workers sin repartir el mismo lote
+        eventos = list(
+            EventoOutbox.objects.select_for_update(skip_locked=True)
+            .filter(procesado_at__isnull=True, intentos__lt=settings.OUTBOX_MAX_INTENTOS)
+            .filter(models.Q(reclamado_hasta__isnull=True) | models.Q(reclamado_hasta__lte=ahora))
+            .order_by('id')[:tamano]
+        )
+        lease = ahora + timedelta(seconds=settings.OUTBOX_LEASE)
+        EventoOutbox.objects.filter(id__in=[evento.id for evento in eventos]).update(reclamado_hasta=lease)
+    return eventos
+
+
+def procesar_lote(consumidores, tamano=None):
+    """
+    Entrega un lote de eventos pendientes a los consumidores.
+    Devuelve la cantidad de eventos tomados (0 si no había pendientes).
+
+    Si un consumidor falla con el lote, ese consumidor y los siguientes se
+    reintentan evento por evento: sólo los eventos que vuelven a fallar
+    quedan pendientes con ``intentos`` + 1 y ``ultimo_error``; el resto se
+    marca procesado. En ese caso se lanza OutboxError al final.
+    """
+    tamano = tamano or settings.OUTBOX_BATCH_SIZE
+    fallidos = {}
+    # Espera a que termine una reconciliación en curso (entregas_detenidas)
+    with _bloqueo_entregas(compartido=True):
+        eventos = _reclamar(tamano)
+        if not eventos:
+            return 0
+        fallo = _entregar(consumidores, eventos)
+        if fallo is not None:
+            indice, exc = fallo
+            logger.error("Error procesando %d eventos del outbox; se reintentan de a uno", len(eventos), exc_info=exc)
+            for evento in eventos:
+                fallo_evento = _entregar(consumidores[indice:], [evento])
+                if fallo_evento is not None:
+                    fallidos[evento.id] = fallo_evento[1]
+                    logger.error("Error procesando el evento %s del outbox", evento.id, exc_info=fallo_evento[1])
+
+        with transaction.atomic():
+            EventoOutbox.objects.filter(id__in=[e.id for e in eventos if e.id not in fallidos]).update(
+                procesado_at=timezone.now(),
+                reclamado_hasta=None,
+            )
+            for evento_id, exc in fallidos.items():
+                EventoOutbox.objects.filter(id=evento_id).update(
+                    intentos=models.F('intentos') + 1,
+                    ultimo_error=str(exc)[:1000],
+                    reclamado_hasta=None,
+                )
+
+    if fallidos:
+        raise OutboxError(f"{len(fallidos)} de {len(eventos)} eventos fallaron: {next(iter(fallidos.values()))}")
+    return len(eventos)
+
+
+def agotados():
+    """
+    Eventos que agotaron sus intentos: el worker ya no los toma.
+    """
+    return models.Q(procesado_at__isnull=True, intentos__gte=settings.OUTBOX_MAX_INTENTOS)
+
+
+def purgar_procesados(dias):
+    """
+    Borra los eventos entregados hace más de ``dias``. Sólo se borra un
+    prefijo de la secuencia (hasta el primer evento que hay que conservar,
+    y nunca el último) para que el feed de cambios pueda reconocer un
+    cursor vencido (ver cambios.horizonte). Los eventos que agotaron sus
+    intentos se conservan para revisarlos.
+    """
+    limite = timezone.now() - timedelta(days=dias)
+    conservar = EventoOutbox.objects.filter(
+        models.Q(procesado_at__isnull=True, intentos__lt=settings.OUTBOX_MAX_INTENTOS)
+        | models.Q(procesado_at__gte=limite)
+    )
+    topes = [
+        conservar.aggregate(tope=models.Min('id'))['tope'],
+        EventoOutbox.objects.exclude(agotados()).aggregate(tope=models.Max('id'))['tope'],
+    ]
+    topes = [tope for tope in topes if tope is not None]
+    if not topes:
+        return 0
+    borrados, _ = EventoOutbox.objects.filter(id__lt=min(topes), procesado_at__lt=limite).delete()
+    return borrados
+
+
+# -----------------
+# Consumidores incluidos
+# -----------------
+def consumidor_log(eventos):
+    for evento in eventos:
+        logger.info("%s %s %s", evento.tipo, evento.objeto_id, evento.payload)
+
+
+def consumidor_webhook(eventos):
+    """
+    Envía el lote como JSON a settings.OUTBOX_WEBHOOK_URL (si está definido).
+    """
+    url = settings.OUTBOX_WEBHOOK_URL
+    if not url:
+        return
+    cuerpo = json.dumps([
+        {'id': e.id, 'tipo': e.tipo, 'objeto_id': e.objeto_id, 'payload': e.payload, 'created_at': e.created_at.isoformat()}
+        for e in eventos
+    ]).encode()
+    peticion = urllib.request.Request(url, data=cuerpo, headers={'Content-Type': 'application/json'}, method='POST')
+    with urllib.request.urlopen(peticion, timeout=settings.OUTBOX_WEBHOOK_TIMEOUT) as respuesta:
+        respuesta.read()
@@ -0,0 +1,30 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+# -----------------
+# Paginación por cursor (keyset), opcional
+# -----------------
+class KeysetPagination(CursorPagination):
+    """
+    Paginación por cursor: cada página filtra por la posición del último
+    registro en vez de usar OFFSET, así la página N cuesta lo mismo que la 1.
+
+    Es opcional: sólo se activa si el cliente envía ?cursor= o ?page_size=.
+    Sin esos parámetros la respuesta sigue siendo la lista completa.
+    El orden se toma del atributo ``cursor_ordering`` del ViewSet; un
+    ?ordering= sólo aplica a las respuestas sin paginar.
+    """
+    page_size = settings.API_PAGE_SIZE
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(getattr(view, 'cursor_ordering', self.ordering))
@@ -0,0 +1,220 @@
+import asyncio
+import random
+from contextvars import ContextVar
+from datetime import timedelta
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.permissions import SAFE_METHODS
+
+from .models import AdherenciaPrimaria
+
+"""
+Lecturas en réplicas (settings.DATABASE_REPLICAS, ver DB_REPLICAS).
+
+Sólo se mandan a una réplica las lecturas de las vistas que lo piden
+(LecturaReplicaMixin en los ViewSets, @lectura_en_replica en las vistas
+función) y sólo en métodos seguros. Todo lo demás va a 'default'.
+
+- ReplicasMiddleware abre el estado de ruteo de cada petición (un
+  ContextVar, igual que metricas.py) y al terminar lo deja en
+  ``request.ruteo_db`` para las métricas.
+- RouterReplicas lee ese estado: la réplica elegida al azar para toda la
+  petición, o None (la primaria). La primera escritura (cualquier llamada
+  a db_for_write) manda el resto de la petición a la primaria.
+- Adherencia: quien escribió lee de la primaria durante
+  REPLICAS_ADHERENCIA_SEGUNDOS para ver lo que acaba de escribir aunque la
+  réplica vaya atrasada. Se recuerda en una cookie firmada y, por usuario,
+  en la tabla AdherenciaPrimaria de la primaria (clientes sin cookies, p.
+  ej. con token). Las dos valen en cualquier worker; la tabla cuesta una
+  lectura por clave primaria en la primaria por cada lectura autenticada
+  que iría a una réplica.
+"""
+
+COOKIE = 'db_primaria'
+SAL = 'api.replicas'
+
+_ruteo = ContextVar('ruteo_db', default=None)
+
+
+class Ruteo:
+    def __init__(self):
+        self.replica = None
+        self.decision = 'primaria'
+        self.escribio = False
+
+    def resumen(self):
+        return {'decision': self.decision, 'alias': self.replica or 'default', 'escritura': self.escribio}
+
+
+def _adherencias():
+    # Siempre en la primaria: en una réplica atrasada la marca tampoco estaría
+    return AdherenciaPrimaria.objects.using(DEFAULT_DB_ALIAS)
+
+
+def _recordar_escritura(user_id, segundos):
+    hasta = timezone.now() + timedelta(seconds=segundos)
+    if _adherencias().filter(user_id=user_id).update(hasta=hasta):
+        return
+    try:
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            _adherencias().create(user_id=user_id, hasta=hasta)
+    except IntegrityError:
+        # Otra petición del mismo usuario la creó en el medio
+        _adherencias().filter(user_id=user_id).update(hasta=hasta)
+
+
+def _cookie_vigente(request):
+    try:
+        request.get_signed_cookie(COOKIE, salt=SAL, max_age=settings.REPLICAS_ADHERENCIA_SEGUNDOS)
+    except (KeyError, signing.BadSignature):
+        return False
+    return True
+
+
+def activar(request):
+    """
+    Manda a una réplica las lecturas que siguen en esta petición (antes de
+    autenticar: la sesión y el usuario también se leen de ahí), salvo que
+    la petición escriba o el cliente haya escrito hace poco.
+    """
+    ruteo = _ruteo.get()
+    if ruteo is None or ruteo.escribio or not settings.DATABASE_REPLICAS or request.method not in SAFE_METHODS:
+        return
+    if _cookie_vigente(request):
+        ruteo.decision = 'adherencia'
+        return
+    ruteo.replica = random.choice(settings.DATABASE_REPLICAS)
+    ruteo.decision = 'replica'
+
+
+def confirmar(user):
+    """
+    Ya autenticado: si el usuario escribió hace poco desde otro cliente,
+    el resto de la petición vuelve a la primaria.
+    """
+    ruteo = _ruteo.get()
+    if (ruteo is not None and ruteo.replica and user.is_authenticated
+            and _adherencias().filter(user_id=user.pk, hasta__gt=timezone.now()).exists()):
+        ruteo.replica = None
+        ruteo.decision = 'adherencia'
+
+
+class LecturaReplicaMixin:
+    def initial(self, request, *args, **kwargs):
+        activar(request)
+        super().initial(request, *args, **kwargs)
+        confirmar(request.user)
+
+
+class _ConfirmarAdherencia:
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        confirmar(request.user)
+
+
+def lectura_en_replica(vista):
+    """
+    Para vistas función: va por fuera de @api_view, así la autenticación
+    también lee de la réplica. Como LecturaReplicaMixin, ya autenticado
+    confirma la adherencia del usuario (la vista de @api_view se rearma
+    con ese initial()).
+    """
+    clase = type(vista.cls.__name__, (_ConfirmarAdherencia, vista.cls), {})
+    confirmada = clase.as_view()
+
+    @wraps(vista)
+    def envuelta(request, *args, **kwargs):
+        activar(request)
+        return confirmada(request, *args, **kwargs)
+    envuelta.cls = clase
+    return envuelta
+
+
+class RouterReplicas:
+    def db_for_read(self, model, **hints):
+        ruteo = _ruteo.get()
+        if ruteo is None or ruteo.escribio:
+            return None
+        return ruteo.replica
+
+    def db_for_write(self, model, **hints):
+        ruteo = _ruteo.get()
+        if ruteo is not None:
+            ruteo.escribio = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        relacionales = {'default', *settings.DATABASE_REPLICAS}
+        if obj1._state.db in relacionales and obj2._state.db in relacionales:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas reciben el esquema de la primaria
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+# -----------------
+# Middleware
+# -----------------
+class ReplicasMiddleware:
+    """
+    Va justo después de MetricasMiddleware: sus escrituras de salida (p. ej.
+    la sesión) también cuentan para la adherencia.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = asyncio.iscoroutinefunction(get_response)
+        if self.es_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        ruteo = Ruteo()
+        token = _ruteo.set(ruteo)
+        try:
+            response = self.get_response(request)
+        finally:
+            _ruteo.reset(token)
+        user_id = self._terminar(request, response, ruteo)
+        if user_id is not None:
+            _recordar_escritura(user_id, settings.REPLICAS_ADHERENCIA_SEGUNDOS)
+        return response
+
+    async def __acall__(self, request):
+        ruteo = Ruteo()
+        token = _ruteo.set(ruteo)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _ruteo.reset(token)
+        user_id = self._terminar(request, response, ruteo)
+        if user_id is not None:
+            await sync_to_async(_recordar_escritura)(user_id, settings.REPLICAS_ADHERENCIA_SEGUNDOS)
+        return response
+
+    def _terminar(self, request, response, ruteo):
+        """
+        Deja el ruteo en la petición y, si hubo escrituras, la cookie de
+        adherencia. Devuelve el id del usuario a recordar en la primaria.
+        """
+        request.ruteo_db = ruteo
+        if not (ruteo.escribio and settings.DATABASE_REPLICAS):
+            return None
+        segundos = settings.REPLICAS_ADHERENCIA_SEGUNDOS
+        response.set_signed_cookie(COOKIE, '1', salt=SAL, max_age=segundos, httponly=True, samesite='Lax')
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.pk
+        return None
@@ -1,11 +1,41 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import DashboardIndicator, Proyecto, Tarea
+from .models import CLAVES_ESTADO, DashboardIndicator, EstadoTarea, Proyecto, Tarea
+from .metricas import SerializacionMedidaMixin
+
+# -----------------
+# Campo relacionado que resuelve PKs desde un diccionario precargado
+# -----------------
+class PrimaryKeyPrecargadoField(serializers.PrimaryKeyRelatedField):
+    """
+    Igual que PrimaryKeyRelatedField, pero si el contexto trae
+    ``precargados[<nombre del campo>]`` (un dict pk -> instancia) lo usa
+    en vez de hacer un SELECT por cada item validado.
+    """
+    def to_internal_value(self, data):
+        precargados = self.context.get('precargados', {}).get(self.field_name)
+        if precargados is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return precargados[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+# -----------------
+# Lista con tiempo de serialización medido (ver metricas.py)
+# -----------------
+class ListSerializerMedido(SerializacionMedidaMixin, serializers.ListSerializer):
+    pass
+
 
 # -----------------
 # Serializer para el modelo User
 # -----------------
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SerializacionMedidaMixin, serializers.ModelSerializer):
     # Hacemos que la contraseña sea de "solo escritura" (write_only)
     # para que nunca se muestre en una respuesta de la API.
     password = serializers.CharField(
@@ -38,6 +68,7 @@ class UserSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
+        list_serializer_class = ListSerializerMedido
         # Definimos los campos que la API va a usar
         fields = ['id', 'username', 'email', 'password', 'is_superuser']
 
@@ -45,22 +76,104 @@ class UserSerializer(serializers.ModelSerializer):
 # -----------------
 # Serializer para los Indicadores
 # -----------------
-class DashboardIndicatorSerializer(serializers.ModelSerializer):
+class DashboardIndicatorSerializer(SerializacionMedidaMixin, serializers.ModelSerializer):
     class Meta:
         model = DashboardIndicator
+        list_serializer_class = ListSerializerMedido
         fields = ['id', 'nombre', 'valor']
 
 
 # -----------------
 # Serializers de Proyectos y Tareas
 # -----------------
-class ProyectoSerializer(serializers.ModelSerializer):
+class CamposDinamicosMixin:
+    """
+    Si el contexto trae ``campos`` (ver filtros.CamposParcialesMixin),
+    el serializer sólo incluye esos campos.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        campos = self.context.get('campos')
+        if campos is not None:
+            for nombre in set(self.fields) - set(campos):
+                self.fields.pop(nombre)
+
+
+class ProyectoSerializer(SerializacionMedidaMixin, CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Proyecto
+        list_serializer_class = ListSerializerMedido
         fields = ['id', 'name', 'description', 'fecha_inicio', 'fecha_fin', 'creador', 'created_at']
 
 
-class TareaSerializer(serializers.ModelSerializer):
+class EstadoTareaField(serializers.ChoiceField):
+    """
+    Expone el código de estado como texto ('todo', 'in_progress', 'done') y
+    acepta también las variantes que usaban los clientes ('In progress'...).
+    """
+    def __init__(self, **kwargs):
+        super().__init__([EstadoTarea.clave(e) for e in EstadoTarea], **kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            return EstadoTarea.codigo(data)
+        except ValueError:
+            self.fail('invalid_choice', input=data)
+
+    def to_representation(self, value):
+        try:
+            return CLAVES_ESTADO[value]
+        except KeyError:
+            return EstadoTarea.clave(value)
+
+
+class TareaSerializer(SerializacionMedidaMixin, CamposDinamicosMixin, serializers.ModelSerializer):
+    estado = EstadoTareaField(required=False)
+    # Compatibilidad: 'status' es un alias de 'estado' (lectura y escritura)
+    status = EstadoTareaField(source='estado', required=False)
+    # Los proyectos de baja diferida no aceptan tareas nuevas
+    proyecto = serializers.PrimaryKeyRelatedField(
+        queryset=Proyecto.objects.filter(eliminado_at__isnull=True), allow_null=True, required=False,
+    )
+
     class Meta:
         model = Tarea
-        fields = ['id', 'title', 'status', 'fecha_inicio', 'fecha_fin', 'proyecto', 'asignado_a', 'estado', 'created_at']
\ No newline at end of file
+        list_serializer_class = ListSerializerMedido
+        fields = ['id', 'title', 'status', 'fecha_inicio', 'fecha_fin', 'proyecto', 'asignado_a', 'estado', 'created_at']
+
+
+class ProyectoConInclusionesSerializer(ProyectoSerializer):
+    """
+    ProyectoSerializer más ``rollups`` y ``tareas`` cuando se piden con
+    ?include= (ver inclusiones.py, que los adjunta a cada proyecto).
+    """
+    rollups = serializers.SerializerMethodField()
+    tareas = TareaSerializer(source='tareas_incluidas', many=True, read_only=True)
+
+    class Meta(ProyectoSerializer.Meta):
+        fields = ProyectoSerializer.Meta.fields + ['rollups', 'tareas']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        inclusiones = self.context.get('inclusiones', ())
+        if 'rollups' not in inclusiones:
+            self.fields.pop('rollups', None)
+        if 'tasks' not in inclusiones:
+            self.fields.pop('tareas', None)
+
+    def get_rollups(self, proyecto):
+        rollups = proyecto.rollups
+        return {
+            'total': rollups['total'],
+            'por_estado': {clave: rollups[clave] for clave in CLAVES_ESTADO.values()},
+            'vencidas': rollups['vencidas'],
+            'proxima_fecha_fin': rollups['proxima_fecha_fin'] and rollups['proxima_fecha_fin'].isoformat(),
+        }
+
+
+class TareaBulkSerializer(TareaSerializer):
+    """
+    Serializer de Tarea para las operaciones masivas (/tasks/bulk/).
+    """
+    proyecto = PrimaryKeyPrecargadoField(queryset=Proyecto.objects.filter(eliminado_at__isnull=True), allow_null=True, required=False)
+    asignado_a = PrimaryKeyPrecargadoField(queryset=User.objects.all(), allow_null=True, required=False)
@@ -1,20 +1,38 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Proyecto, Tarea
+from .models import DashboardIndicator, Proyecto, Tarea
+from .outbox import registrar_evento, payload_proyecto, payload_tarea
+from .indicadores import repositorio_indicadores
 
 """
-Signals simples como placeholders. Evitan errores de importación
-y se pueden ampliar según la lógica de la app.
+Los signals no hacen trabajo dentro del request: sólo agregan un evento
+compacto al outbox (en la misma transacción que el cambio). El trabajo
+real lo hace el worker `manage.py procesar_outbox`.
 """
 
 @receiver(post_save, sender=Proyecto)
 def proyecto_post_save(sender, instance, created, **kwargs):
-    # Placeholder: ejecutar lógica al crear/actualizar un Proyecto
-    if created:
-        print(f"Proyecto creado: {instance.pk} - {instance.name}")
+    tipo = 'proyecto.creado' if created else 'proyecto.actualizado'
+    registrar_evento(tipo, instance.pk, payload_proyecto(instance))
+
+@receiver(post_delete, sender=Proyecto)
+def proyecto_post_delete(sender, instance, **kwargs):
+    registrar_evento('proyecto.eliminado', instance.pk, payload_proyecto(instance))
 
 @receiver(post_save, sender=Tarea)
 def tarea_post_save(sender, instance, created, **kwargs):
-    # Placeholder: ejecutar lógica al crear/actualizar una Tarea
-    if created:
-        print(f"Tarea creada: {instance.pk} - {instance.title}")
\ No newline at end of file
+    tipo = 'tarea.creada' if created else 'tarea.actualizada'
+    registrar_evento(tipo, instance.pk, payload_tarea(instance))
+    instance._estado_original = instance.estado
+    instance._proyecto_original = instance.proyecto_id
+    instance._asignado_original = instance.asignado_a_id
+
+@receiver(post_delete, sender=Tarea)
+def tarea_post_delete(sender, instance, **kwargs):
+    registrar_evento('tarea.eliminada', instance.pk, payload_tarea(instance))
+
+@receiver(post_save, sender=DashboardIndicator)
+@receiver(post_delete, sender=DashboardIndicator)
+def indicador_modificado(sender, **kwargs):
+    # Invalida la caché de lectura de indicadores de este proceso
+    repositorio_indicadores.invalidar()
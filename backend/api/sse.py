@@ -0,0 +1,110 @@
+import asyncio
+import io
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import AuthenticationFailed
+
+from .cambios import Audiencia
+from .eventos import broker
+from .views_async import _en_hilo, _usuario_autenticado
+
+"""
+Canal de cambios en vivo: GET /api/events/ (text/event-stream).
+
+Django 3.2 no puede servir una respuesta en streaming asíncrona, así que
+es una app ASGI propia que app/asgi.py atiende antes que Django (por eso
+no pasa por los middlewares ni por /api/metrics/). Una conexión ociosa
+sólo ocupa dos tareas del event loop y su cola.
+
+Cada mensaje lleva ``id: <seq>`` (el mismo cursor de /api/changes/) y un
+JSON {'seq', 'tipo', 'id', 'payload'}; es un aviso, los datos se piden a
+/api/changes/. Si la cola del suscriptor se llena se cierra el stream: el
+navegador reconecta solo y se pone al día con /changes/.
+"""
+
+RUTA = '/api/events/'
+CABECERAS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    # Que los proxies no junten los mensajes
+    (b'x-accel-buffering', b'no'),
+]
+
+
+def formatear(evento):
+    lineas = f"id: {evento['seq']}\n" if evento['seq'] is not None else ''
+    return f"{lineas}data: {json.dumps(evento, separators=(',', ':'))}\n\n"
+
+
+def _autenticar(scope):
+    # Lo mismo que hacen SessionMiddleware y AuthenticationMiddleware en Django
+    request = ASGIRequest(scope, io.BytesIO())
+    SessionMiddleware(lambda r: None).process_request(request)
+    request.user = SimpleLazyObject(lambda: get_user(request))
+    return _usuario_autenticado(request)
+
+
+async def _responder(send, codigo, detalle):
+    await send({'type': 'http.response.start', 'status': codigo, 'headers': [(b'content-type', b'application/json')]})
+    await send({'type': 'http.response.body', 'body': json.dumps({'detail': detalle}).encode()})
+
+
+async def _desconexion(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def transmitir(send, receive, audiencia, origen=None, latido=None):
+    """
+    Mantiene el stream abierto hasta que el cliente se desconecta. Cada
+    ``latido`` segundos sin eventos manda un comentario para que los
+    proxies no corten la conexión.
+    """
+    origen = origen or broker()
+    latido = latido or settings.EVENTOS_LATIDO_SEGUNDOS
+    suscripcion = origen.suscribir(audiencia)
+    desconexion = asyncio.ensure_future(_desconexion(receive))
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': CABECERAS})
+        await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+        while True:
+            lectura = asyncio.ensure_future(suscripcion.cola.get())
+            listos, _ = await asyncio.wait({lectura, desconexion}, timeout=latido, return_when=asyncio.FIRST_COMPLETED)
+            if desconexion in listos:
+                lectura.cancel()
+                return
+            if lectura not in listos:
+                lectura.cancel()
+                await send({'type': 'http.response.body', 'body': b': latido\n\n', 'more_body': True})
+                continue
+            eventos = [lectura.result()]
+            while not suscripcion.cola.empty():
+                eventos.append(suscripcion.cola.get_nowait())
+            cuerpo = ''.join(formatear(evento) for evento in eventos).encode()
+            await send({'type': 'http.response.body', 'body': cuerpo, 'more_body': not suscripcion.desbordada})
+            if suscripcion.desbordada:
+                return
+    finally:
+        origen.cancelar(suscripcion)
+        desconexion.cancel()
+
+
+async def app_eventos(scope, receive, send):
+    if scope['method'] != 'GET':
+        await _responder(send, 405, 'Método no permitido.')
+        return
+    try:
+        user = await _en_hilo(_autenticar)(scope)
+    except AuthenticationFailed as exc:
+        await _responder(send, 401, exc.detail)
+        return
+    if user is None:
+        await _responder(send, 403, 'Las credenciales de autenticación no se proveyeron.')
+        return
+    audiencia = await _en_hilo(Audiencia.para)(user)
+    await transmitir(send, receive, audiencia)
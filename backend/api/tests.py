@@ -1,3 +1,434 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import time
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection
+from django.db.models.query import QuerySet
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from . import exportacion
+from .correo import encolar_correo, enviar_lote
+from .models import CorreoPendiente, EventoOutbox, Proyecto, Tarea
+from .outbox import OutboxError, consumidor_log, procesar_lote, registrar_eventos
+from .serializers import TareaSerializer
+from .tokens import emitir_tokens
+
+
+class BaseAPITest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', 'ana@example.com', 'clave')
+        self.proyecto = Proyecto.objects.create(name='Proyecto', creador=self.user)
+        self.client.force_authenticate(self.user)
+
+
+# -----------------
+# Visibilidad
+# -----------------
+class VisibilidadTests(BaseAPITest):
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'EXPLAIN de PostgreSQL')
+    def test_plan_sin_seq_scan_ni_distinct(self):
+        from .views import tareas_visibles
+
+        otro = User.objects.create_user('beto', 'beto@example.com', 'clave')
+        ajeno = Proyecto.objects.create(name='Ajeno', creador=otro)
+        Tarea.objects.bulk_create(
+            [Tarea(title=f't{i}', proyecto=self.proyecto if i % 2 else ajeno, asignado_a=self.user if i % 5 == 0 else otro) for i in range(200)]
+        )
+        sql, params = tareas_visibles(self.user).order_by('-created_at', '-id')[:20].query.sql_with_params()
+        self.assertNotIn('DISTINCT', sql)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            # Con pocas filas el planificador prefiere leer la tabla entera:
+            # sin seq scan, falla si alguna rama no tiene un índice que usar
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql, params)
+            plan = '\n'.join(fila[0] for fila in cursor.fetchall())
+        self.assertNotIn('Seq Scan', plan, plan)
+
+
+# -----------------
+# Respuestas condicionales (ETag)
+# -----------------
+class EtagTests(BaseAPITest):
+    URL = '/api/tasks/?page_size=10'
+
+    def test_sondeo_sin_cambios_responde_304_sin_serializar(self):
+        from .views import TareaViewSet
+
+        tarea = Tarea.objects.create(title='t', proyecto=self.proyecto)
+        etag = self.client.get(self.URL)['ETag']
+        with mock.patch.object(TareaViewSet, 'get_serializer') as serializar:
+            # Sólo la consulta de la versión (count + max(updated_at))
+            with self.assertNumQueries(1):
+                respuesta = self.client.get(self.URL, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(respuesta.status_code, 304)
+            serializar.assert_not_called()
+
+        tarea.title = 'cambiada'
+        tarea.save()
+        respuesta = self.client.get(self.URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+
+
+# -----------------
+# Operaciones masivas (/api/tasks/bulk/)
+# -----------------
+class BulkTareasTests(BaseAPITest):
+    def test_crear_devuelve_ids_y_registra_eventos(self):
+        def crear(cantidad):
+            Tarea.objects.all().delete()
+            EventoOutbox.objects.all().delete()
+            items = [{'title': f'tarea {i}', 'proyecto': self.proyecto.pk} for i in range(cantidad)]
+            with CaptureQueriesContext(connection) as consultas:
+                respuesta = self.client.post('/api/tasks/bulk/', items, format='json')
+            self.assertEqual(respuesta.status_code, 201)
+            ids = [resultado['data']['id'] for resultado in respuesta.json()]
+            self.assertNotIn(None, ids)
+            self.assertEqual(sorted(ids), sorted(Tarea.objects.values_list('id', flat=True)))
+            self.assertEqual(list(Tarea.objects.filter(pk__in=ids).order_by('pk').values_list('title', flat=True)),
+                             [item['title'] for item in items])
+            eventos = EventoOutbox.objects.filter(tipo='tarea.creada')
+            self.assertEqual(sorted(eventos.values_list('objeto_id', flat=True)), sorted(ids))
+            return len(consultas)
+
+        # Un INSERT por bloque, no uno por tarea (también en SQLite)
+        self.assertEqual(crear(2), crear(20))
+
+    def test_eliminar_registra_un_evento_por_tarea_sin_collector(self):
+        def eliminar(cantidad):
+            ids = [Tarea.objects.create(title=f't{i}', proyecto=self.proyecto).pk for i in range(cantidad)]
+            EventoOutbox.objects.all().delete()
+            with CaptureQueriesContext(connection) as consultas:
+                respuesta = self.client.delete('/api/tasks/bulk/', ids + [0], format='json')
+            self.assertEqual([r['status'] for r in respuesta.json()], [204] * cantidad + [404])
+            self.assertFalse(Tarea.objects.exists())
+            eventos = EventoOutbox.objects.filter(tipo='tarea.eliminada')
+            self.assertEqual(sorted(eventos.values_list('objeto_id', flat=True)), ids)
+            return len(consultas)
+
+        self.assertEqual(eliminar(2), eliminar(20))
+
+
+    def test_proyecto_de_baja_diferida_no_es_visible_ni_acepta_tareas(self):
+        from .eliminacion import marcar_eliminado
+
+        staff = User.objects.create_user('eva', 'eva@example.com', 'clave', is_staff=True)
+        otro = User.objects.create_user('beto', 'beto@example.com', 'clave')
+        Tarea.objects.create(title='vieja', proyecto=self.proyecto)
+        Tarea.objects.create(title='asignada', proyecto=self.proyecto, asignado_a=otro)
+        Tarea.objects.create(title='suelta', asignado_a=otro)
+        marcar_eliminado(self.proyecto)
+        self.assertEqual(self.client.get('/api/tasks/').json(), [])
+        for usuario in (otro, staff):
+            self.client.force_authenticate(usuario)
+            self.assertEqual([t['title'] for t in self.client.get('/api/tasks/').json()], ['suelta'])
+        self.client.force_authenticate(self.user)
+        respuesta = self.client.post('/api/tasks/bulk/', [{'title': 'nueva', 'proyecto': self.proyecto.pk}], format='json')
+        self.assertEqual(Tarea.objects.filter(title='nueva').count(), 0, respuesta.content)
+        respuesta = self.client.post('/api/tasks/', {'title': 'nueva', 'proyecto': self.proyecto.pk}, format='json')
+        self.assertEqual(respuesta.status_code, 400)
+
+
+# -----------------
+# Inclusiones (?include=rollups,tasks)
+# -----------------
+class InclusionesTests(BaseAPITest):
+    URL = '/api/projects/?include=rollups,tasks&page_size=1000'
+
+    def crear_hasta(self, total):
+        faltan = total - Proyecto.objects.count()
+        Proyecto.objects.bulk_create(Proyecto(name=f'p{i}', creador=self.user) for i in range(faltan))
+        # Sin ids de bulk_create en SQLite: se releen los recién creados
+        proyectos = Proyecto.objects.order_by('-id')[:faltan]
+        Tarea.objects.bulk_create(
+            Tarea(title=f't{i}', proyecto=proyecto, estado=i % 3) for proyecto in proyectos for i in range(3)
+        )
+
+    def test_mismas_consultas_con_10_y_1000_proyectos(self):
+        self.crear_hasta(10)
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(self.URL)
+        self.assertEqual(len(respuesta.json()['results']), 10)
+
+        self.crear_hasta(1000)
+        with self.assertNumQueries(len(consultas)):
+            respuesta = self.client.get(self.URL)
+        proyectos = respuesta.json()['results']
+        self.assertEqual(len(proyectos), 1000)
+        self.assertTrue(all(p['rollups']['total'] == 3 and len(p['tareas']) == 3 for p in proyectos[:-1]))
+
+
+# -----------------
+# Lectura rápida (list sin paginar)
+# -----------------
+class LecturaRapidaTests(BaseAPITest):
+    @override_settings(API_LECTURA_CHUNK_SIZE=3)
+    def test_mismos_bytes_que_el_serializer(self):
+        Tarea.objects.bulk_create(
+            Tarea(title=f'tarea ñ {i}\u2028"x"', proyecto=self.proyecto, estado='done' if i % 2 else 'todo')
+            for i in range(10)
+        )
+        esperado = JSONRenderer().render(TareaSerializer(Tarea.objects.order_by('id'), many=True).data)
+        # Las filas van del cursor al renderer sin materializar el queryset
+        with mock.patch.object(QuerySet, '_fetch_all', side_effect=AssertionError('queryset materializado')):
+            respuesta = self.client.get('/api/tasks/?ordering=id')
+            self.assertEqual(respuesta.content, esperado)
+        self.assertEqual(self.client.get('/api/tasks/?ordering=id', HTTP_ACCEPT='application/json; indent=2').json(),
+                         json.loads(esperado))
+
+
+# -----------------
+# Exportación en streaming (/api/<coleccion>/export/)
+# -----------------
+def _rss():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+@override_settings(API_LECTURA_CHUNK_SIZE=100)
+class ExportacionTests(BaseAPITest):
+    @unittest.skipUnless(os.path.exists('/proc/self/statm'), 'RSS de /proc')
+    def test_memoria_acotada_al_exportar(self):
+        for inicio in range(0, 50000, 1000):
+            Tarea.objects.bulk_create(Tarea(title=f'tarea {i:05} ' * 16, proyecto=self.proyecto)
+                                      for i in range(inicio, inicio + 1000))
+        ajeno = User.objects.create_user('beto', 'beto@example.com', 'clave')
+        Tarea.objects.create(title='ajena', proyecto=Proyecto.objects.create(name='Ajeno', creador=ajeno))
+        # Nunca se arma el resultado completo del queryset (_fetch_all): sólo iterator()
+        with mock.patch.object(QuerySet, '_fetch_all', side_effect=AssertionError('queryset materializado')):
+            respuesta = self.client.get('/api/tasks/export/?formato=ndjson')
+            self.assertTrue(respuesta.streaming)
+            inicial = pico = _rss()
+            filas = total = 0
+            for bloque in respuesta.streaming_content:
+                filas += bloque.count(b'\n')
+                total += len(bloque)
+                self.assertNotIn(b'ajena', bloque)
+                pico = max(pico, _rss())
+        # Sólo las tareas visibles
+        self.assertEqual(filas, 50000)
+        # El RSS no sigue al tamaño del archivo (materializarlo ocupa más que el archivo)
+        self.assertLess(pico - inicial, total / 2, (pico - inicial, total))
+
+
+class ExportacionASGITests(APITransactionTestCase):
+    def test_exportar_no_bloquea_el_event_loop(self):
+        from app.asgi import application
+
+        user = User.objects.create_user('ana', 'ana@example.com', 'clave')
+        proyecto = Proyecto.objects.create(name='Proyecto', creador=user)
+        Tarea.objects.bulk_create(Tarea(title=f'tarea {i}', proyecto=proyecto) for i in range(50))
+        token = emitir_tokens(user)['access']
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': '/api/tasks/export/', 'query_string': b'formato=ndjson',
+            'headers': [(b'authorization', f'Bearer {token}'.encode()), (b'host', b'testserver')],
+        }
+        bloques_ndjson = exportacion._bloques_ndjson
+
+        def lento(plan, filas):
+            for bloque in bloques_ndjson(plan, filas):
+                time.sleep(0.05)
+                yield bloque
+
+        async def exportar():
+            mensajes, huecos = [], []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(mensaje):
+                mensajes.append(mensaje)
+
+            async def latir():
+                anterior = time.monotonic()
+                while True:
+                    await asyncio.sleep(0.005)
+                    huecos.append(time.monotonic() - anterior)
+                    anterior = time.monotonic()
+
+            latido = asyncio.ensure_future(latir())
+            await application(scope, receive, send)
+            latido.cancel()
+            return mensajes, huecos
+
+        # Sin réplicas: el hilo productor lee de la base del test
+        with override_settings(API_LECTURA_CHUNK_SIZE=10, DATABASE_REPLICAS=[]), mock.patch.object(exportacion, '_bloques_ndjson', lento):
+            mensajes, huecos = async_to_sync(exportar)()
+        self.assertEqual(mensajes[0]['status'], 200)
+        cuerpo = b''.join(mensaje.get('body', b'') for mensaje in mensajes[1:])
+        self.assertEqual(cuerpo.count(b'\n'), 50)
+        # El event loop siguió atendiendo mientras el hilo producía (5 x 50 ms)
+        self.assertLess(max(huecos), 0.04, max(huecos))
+
+
+# -----------------
+# Importación (/api/<coleccion>/import/)
+# -----------------
+class ImportacionTests(BaseAPITest):
+    def test_importar_registra_un_evento_por_fila(self):
+        def importar(cantidad):
+            Tarea.objects.all().delete()
+            EventoOutbox.objects.all().delete()
+            filas = ''.join(f'{{"title": "t{i}", "proyecto": {self.proyecto.pk}}}\n' for i in range(cantidad))
+            archivo = SimpleUploadedFile('tareas.ndjson', filas.encode())
+            with CaptureQueriesContext(connection) as consultas:
+                respuesta = self.client.post('/api/tasks/import/', {'archivo': archivo}, format='multipart')
+            self.assertEqual(respuesta.status_code, 201, respuesta.content)
+            eventos = EventoOutbox.objects.filter(tipo='tarea.creada')
+            self.assertEqual(sorted(eventos.values_list('objeto_id', flat=True)),
+                             sorted(Tarea.objects.values_list('id', flat=True)))
+            self.assertEqual(eventos.count(), cantidad)
+            return len(consultas)
+
+        # Un bloque: las mismas consultas con 5 que con 50 filas
+        self.assertEqual(importar(5), importar(50))
+
+
+# -----------------
+# Outbox
+# -----------------
+class OutboxTests(BaseAPITest):
+    def test_un_evento_fallido_no_arrastra_al_lote(self):
+        EventoOutbox.objects.all().delete()
+        registrar_eventos(('prueba', i, {}) for i in range(10))
+        malo = EventoOutbox.objects.get(objeto_id=3)
+        vistos = []
+
+        def consumidor(eventos):
+            if any(evento.objeto_id == 3 for evento in eventos):
+                raise RuntimeError('evento inválido')
+            vistos.extend(evento.objeto_id for evento in eventos)
+
+        with self.assertRaises(OutboxError):
+            procesar_lote([consumidor], 10)
+        malo.refresh_from_db()
+        self.assertEqual((malo.intentos, malo.procesado_at), (1, None))
+        self.assertIn('evento inválido', malo.ultimo_error)
+        self.assertEqual(EventoOutbox.objects.filter(intentos__gt=0).count(), 1)
+        self.assertEqual(EventoOutbox.objects.filter(procesado_at__isnull=False).count(), 9)
+        self.assertEqual(sorted(vistos), [i for i in range(10) if i != 3])
+
+    def test_entrega_fuera_de_la_transaccion_del_lote(self):
+        EventoOutbox.objects.all().delete()
+        registrar_eventos(('prueba', i, {}) for i in range(3))
+        # El TestCase ya corre dentro de un atomic: se compara contra esa profundidad
+        profundidad = len(connection.savepoint_ids)
+        observado = []
+
+        def consumidor(eventos):
+            # Sólo el atomic propio del consumidor; el lote ya está reclamado,
+            # así que otro worker no lo repite
+            observado.append((len(connection.savepoint_ids) - profundidad, procesar_lote([consumidor_log], 10)))
+
+        self.assertEqual(procesar_lote([consumidor], 10), 3)
+        self.assertEqual(observado, [(1, 0)])
+        self.assertFalse(EventoOutbox.objects.filter(procesado_at__isnull=True).exists())
+        self.assertFalse(EventoOutbox.objects.filter(reclamado_hasta__isnull=False).exists())
+
+
+# -----------------
+# Indicadores derivados
+# -----------------
+class ReconciliacionTests(BaseAPITest):
+    def test_descuenta_los_eventos_pendientes(self):
+        from .indicadores import _recalcular
+
+        procesar_lote([lambda eventos: None], 100)
+        Tarea.objects.create(title='vieja', proyecto=self.proyecto)
+        procesar_lote([lambda eventos: None], 100)
+        # Pendientes: el worker todavía va a sumar sus $inc
+        Tarea.objects.create(title='nueva', proyecto=self.proyecto)
+        Tarea.objects.create(title='otra', proyecto=self.proyecto, estado='done')
+        self.assertEqual(_recalcular(['tareas_totales', 'tareas_completadas']), {'tareas_totales': 1, 'tareas_completadas': 0})
+        procesar_lote([lambda eventos: None], 100)
+        self.assertEqual(_recalcular(['tareas_totales', 'tareas_completadas']), {'tareas_totales': 3, 'tareas_completadas': 1})
+
+
+# -----------------
+# Réplicas de lectura
+# -----------------
+@override_settings(DATABASE_REPLICAS=['default'])
+class AdherenciaReplicasTests(BaseAPITest):
+    def decision(self, respuesta):
+        return respuesta['Server-Timing'].split('ruteo;desc="')[1].split(':')[0]
+
+    def test_adherencia_sin_cookie_vale_en_cualquier_worker(self):
+        from .models import AdherenciaPrimaria
+
+        self.assertEqual(self.decision(self.client.get('/api/tasks/')), 'replica')
+        respuesta = self.client.post('/api/tasks/', {'title': 'nueva', 'proyecto': self.proyecto.pk}, format='json')
+        self.assertEqual(respuesta.status_code, 201)
+        # Un cliente con token no guarda la cookie: la marca queda en la base, no en la memoria del proceso
+        self.client.cookies.clear()
+        self.assertTrue(AdherenciaPrimaria.objects.filter(user_id=self.user.pk).exists())
+        self.assertEqual(self.decision(self.client.get('/api/tasks/')), 'adherencia')
+        AdherenciaPrimaria.objects.all().delete()
+        self.assertEqual(self.decision(self.client.get('/api/tasks/')), 'replica')
+
+    def test_adherencia_en_me(self):
+        # /api/me/ es una vista función (@lectura_en_replica), la más consultada
+        self.assertEqual(self.decision(self.client.get('/api/me/')), 'replica')
+        self.client.post('/api/tasks/', {'title': 'nueva', 'proyecto': self.proyecto.pk}, format='json')
+        self.client.cookies.clear()
+        self.assertEqual(self.decision(self.client.get('/api/me/')), 'adherencia')
+
+
+# -----------------
+# Cola de correos
+# -----------------
+class SMTPColgado(EmailBackend):
+    """Backend en memoria que tarda ``demora`` segundos por envío."""
+
+    def __init__(self, demora=5, al_enviar=None, **kwargs):
+        super().__init__(**kwargs)
+        self.demora, self.al_enviar = demora, al_enviar
+
+    def send_messages(self, mensajes):
+        if self.al_enviar:
+            self.al_enviar()
+        time.sleep(self.demora)
+        return super().send_messages(mensajes)
+
+
+class CorreoTests(BaseAPITest):
+    def test_smtp_colgado_no_retiene_la_cola(self):
+        for i in range(3):
+            encolar_correo('asunto', 'cuerpo', [f'u{i}@example.com'])
+        observado = []
+        # El TestCase ya corre dentro de un atomic: se compara contra esa profundidad
+        profundidad = len(connection.savepoint_ids)
+
+        def al_enviar():
+            # Mientras el SMTP está colgado: sin transacción abierta y con el
+            # lote reclamado, así que otro worker no espera ni lo duplica
+            inicio = time.monotonic()
+            observado.append((len(connection.savepoint_ids) > profundidad, enviar_lote(EmailBackend(), 10), time.monotonic() - inicio))
+
+        self.assertEqual(enviar_lote(SMTPColgado(0.2, al_enviar), 10), 3)
+        self.assertEqual(len(observado), 3)
+        for en_transaccion, tomados, demora in observado:
+            self.assertFalse(en_transaccion)
+            self.assertEqual(tomados, 0)
+            self.assertLess(demora, 0.1)
+        self.assertFalse(CorreoPendiente.objects.exists())
+
+    @override_settings(EMAIL_BACKEND='api.tests.SMTPColgado')
+    def test_reseteo_responde_aunque_el_smtp_este_colgado(self):
+        self.client.force_authenticate(None)
+        inicio = time.monotonic()
+        respuesta = self.client.post('/api/password-reset/', {'email': 'ana@example.com'}, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        # El envío (5 s por correo) queda para el worker
+        self.assertLess(time.monotonic() - inicio, 1)
+        self.assertEqual(CorreoPendiente.objects.count(), 1)
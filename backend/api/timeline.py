@@ -0,0 +1,89 @@
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce, Greatest, Least
+
+"""
+Línea de tiempo: proyectos y tareas cuyo intervalo de fechas se solapa con
+una ventana [desde, hasta] (ambos días inclusive).
+
+El intervalo de una fila va de la menor a la mayor de fecha_inicio y
+fecha_fin (no se valida que estén en orden); si sólo tiene una es ese día,
+y sin ninguna no aparece en la línea de tiempo.
+
+- PostgreSQL: índice GiST sobre la expresión daterange(...) (ver la
+  migración 0011), consultado con el operador && (solapamiento). Las filas
+  sin fechas dan NULL y no un rango infinito: no se solapan con nada y
+  ANALYZE las cuenta como nulas al estimar cuántas filas toca la ventana.
+- SQLite: índice B-tree sobre (fin, inicio) calculados; la consulta
+  recorre fin >= desde y filtra inicio <= hasta.
+- Otros motores: las mismas comparaciones, sin índice.
+"""
+
+TABLAS = {'Proyecto': 'proyecto_timeline_idx', 'Tarea': 'tarea_timeline_idx'}
+# Tiene que coincidir con la expresión del índice para que PostgreSQL lo use
+RANGO_POSTGRES = (
+    "CASE WHEN {t}fecha_inicio IS NOT NULL OR {t}fecha_fin IS NOT NULL "
+    "THEN daterange(LEAST({t}fecha_inicio, {t}fecha_fin), GREATEST({t}fecha_inicio, {t}fecha_fin), '[]') END"
+)
+
+
+def sql_indice(vendor, tabla, nombre):
+    """
+    CREATE INDEX del índice de la línea de tiempo para ``tabla`` (None si
+    el motor no tiene uno). Las migraciones usan la copia congelada de
+    migrations/_historico.py: si esto cambia, hace falta una migración nueva.
+    """
+    if vendor == 'postgresql':
+        return f"CREATE INDEX {nombre} ON {tabla} USING gist (({RANGO_POSTGRES.format(t='')}))"
+    if vendor == 'sqlite':
+        # Las mismas expresiones que generan inicio() / fin() con el ORM
+        extremos = 'COALESCE(fecha_inicio, fecha_fin), COALESCE(fecha_fin, fecha_inicio)'
+        return f'CREATE INDEX {nombre} ON {tabla} (MAX({extremos}), MIN({extremos}))'
+    return None
+
+
+def inicio():
+    return Least(Coalesce('fecha_inicio', 'fecha_fin'), Coalesce('fecha_fin', 'fecha_inicio'))
+
+
+def fin():
+    return Greatest(Coalesce('fecha_inicio', 'fecha_fin'), Coalesce('fecha_fin', 'fecha_inicio'))
+
+
+def _postgres(queryset, desde, hasta):
+    from django.contrib.postgres.fields import DateRangeField
+    from psycopg2.extras import DateRange
+
+    rango = RawSQL(RANGO_POSTGRES.format(t=f'{queryset.model._meta.db_table}.'), [], output_field=DateRangeField())
+    return queryset.alias(rango_linea=rango).filter(rango_linea__overlap=DateRange(desde, hasta, '[]'))
+
+
+def solapan(queryset, desde, hasta):
+    """
+    Filtra ``queryset`` (Proyecto o Tarea) a las filas que se solapan con
+    [desde, hasta] y lo anota con ``inicio_linea`` / ``fin_linea``.
+    """
+    anotado = queryset.annotate(inicio_linea=inicio(), fin_linea=fin())
+    if connections[queryset.db].vendor == 'postgresql':
+        return _postgres(anotado, desde, hasta)
+    return anotado.filter(fin_linea__gte=desde, inicio_linea__lte=hasta)
+
+
+def carriles(proyectos, tareas):
+    """
+    Agrupa las tareas por proyecto: [(proyecto_id, [tareas])], con un
+    carril por cada proyecto de la ventana (aunque no tenga tareas en
+    ella), luego los de proyectos que sólo aportan tareas, en el orden en
+    que aparecen, y al final el de las tareas sin proyecto (id None).
+    """
+    por_proyecto = {proyecto.pk: [] for proyecto in proyectos}
+    sin_proyecto = []
+    for tarea in tareas:
+        if tarea.proyecto_id is None:
+            sin_proyecto.append(tarea)
+        else:
+            por_proyecto.setdefault(tarea.proyecto_id, []).append(tarea)
+    resultado = list(por_proyecto.items())
+    if sin_proyecto:
+        resultado.append((None, sin_proyecto))
+    return resultado
@@ -0,0 +1,141 @@
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.utils import timezone
+from rest_framework import authentication, exceptions
+
+from .models import TokenRevocado
+
+"""
+Autenticación sin estado con tokens firmados (django.core.signing).
+
+- Access token: vida corta (TOKEN_ACCESS_TTL). Lleva id, username, email y
+  flags del usuario, así que verificarlo no consulta la base de datos.
+- Refresh token: vida larga (TOKEN_REFRESH_TTL). Se canjea en
+  /api/token/refresh/ por un par nuevo (rotación: el anterior se revoca).
+- Revocación: tabla TokenRevocado, cacheada en cada proceso y recargada
+  cada TOKEN_REVOCACION_REFRESCO segundos (una consulta por intervalo, no
+  por request).
+
+Convive con la sesión: sólo se usa si el request trae
+``Authorization: Bearer <token>``.
+"""
+
+SAL_ACCESO = 'api.tokens.acceso'
+SAL_REFRESCO = 'api.tokens.refresco'
+
+
+# -----------------
+# Emisión y lectura
+# -----------------
+def emitir_tokens(user):
+    acceso = {
+        'uid': user.pk,
+        'usr': user.username,
+        'eml': user.email,
+        'stf': user.is_staff,
+        'su': user.is_superuser,
+        'jti': uuid.uuid4().hex,
+    }
+    refresco = {'uid': user.pk, 'jti': uuid.uuid4().hex}
+    return {
+        'access': signing.dumps(acceso, salt=SAL_ACCESO, compress=True),
+        'refresh': signing.dumps(refresco, salt=SAL_REFRESCO, compress=True),
+    }
+
+
+def leer_token(token, salt, max_age):
+    try:
+        claims = signing.loads(token, salt=salt, max_age=max_age)
+    except signing.SignatureExpired:
+        raise exceptions.AuthenticationFailed('Token expirado.')
+    except signing.BadSignature:
+        raise exceptions.AuthenticationFailed('Token inválido.')
+    if esta_revocado(claims.get('jti')):
+        raise exceptions.AuthenticationFailed('Token revocado.')
+    return claims
+
+
+def usuario_desde_claims(claims):
+    # Instancia en memoria con los datos del token (no se consulta auth_user)
+    user = User(
+        id=claims['uid'],
+        username=claims['usr'],
+        email=claims['eml'],
+        is_staff=claims['stf'],
+        is_superuser=claims['su'],
+        is_active=True,
+    )
+    user._state.adding = False
+    user._state.db = 'default'
+    return user
+
+
+def refrescar_tokens(refresh):
+    claims = leer_token(refresh, SAL_REFRESCO, settings.TOKEN_REFRESH_TTL)
+    user = User.objects.filter(pk=claims['uid'], is_active=True).first()
+    if user is None:
+        raise exceptions.AuthenticationFailed('Usuario inactivo o inexistente.')
+    revocar(claims['jti'], settings.TOKEN_REFRESH_TTL)
+    return emitir_tokens(user)
+
+
+# -----------------
+# Revocación (lista pequeña, cacheada por proceso)
+# -----------------
+_revocados = set()
+_revocados_cargados_en = None
+_revocados_lock = threading.Lock()
+
+
+def esta_revocado(jti):
+    global _revocados, _revocados_cargados_en
+    ahora = time.monotonic()
+    if _revocados_cargados_en is None or ahora - _revocados_cargados_en > settings.TOKEN_REVOCACION_REFRESCO:
+        with _revocados_lock:
+            _revocados = set(
+                TokenRevocado.objects.filter(expira_at__gt=timezone.now()).values_list('jti', flat=True)
+            )
+            _revocados_cargados_en = ahora
+    return jti in _revocados
+
+
+def revocar(jti, ttl):
+    TokenRevocado.objects.get_or_create(jti=jti, defaults={'expira_at': timezone.now() + timedelta(seconds=ttl)})
+    with _revocados_lock:
+        _revocados.add(jti)
+
+
+# -----------------
+# Autenticación DRF
+# -----------------
+class TokenFirmadoAuthentication(authentication.BaseAuthentication):
+    """
+    ``Authorization: Bearer <access token>``. ``request.auth`` queda con los
+    claims del token.
+    """
+    keyword = b'bearer'
+
+    def _cabecera(self, request):
+        return authentication.get_authorization_header(request).split()
+
+    def authenticate(self, request):
+        partes = self._cabecera(request)
+        if not partes or partes[0].lower() != self.keyword:
+            return None
+        if len(partes) != 2:
+            raise exceptions.AuthenticationFailed('Cabecera Authorization inválida.')
+        claims = leer_token(partes[1].decode(), SAL_ACCESO, settings.TOKEN_ACCESS_TTL)
+        return usuario_desde_claims(claims), claims
+
+    def authenticate_header(self, request):
+        # Sólo los clientes con token reciben 401; los de sesión siguen con 403
+        partes = self._cabecera(request)
+        if partes and partes[0].lower() == self.keyword:
+            return 'Bearer realm="api"'
+        return None
@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
-from .views import get_current_user, login_view, logout_view, password_reset_request_view, password_reset_confirm_view
+from .views_async import dashboard_view
+from .views import get_current_user, changes_view, metrics_view, search_view, timeline_view, dashboard_summary_view, login_view, logout_view, token_refresh_view, token_revoke_view, password_reset_request_view, password_reset_confirm_view
 
 # Creamos un router de DRF
 router = DefaultRouter()
@@ -19,9 +20,29 @@ urlpatterns = [
     # 2. Ruta de Perfil ( /me/ )
     path('me/', get_current_user, name='get_current_user'),
 
+    # 2b. Resumen agregado del Dashboard ( /dashboard/summary/ )
+    path('dashboard/summary/', dashboard_summary_view, name='dashboard_summary'),
+
+    # 2c. Dashboard completo, vista asíncrona ( /dashboard/ )
+    path('dashboard/', dashboard_view, name='dashboard'),
+
+    # 2d. Búsqueda de texto completo ( /search/?q= )
+    path('search/', search_view, name='search'),
+
+    # 2e. Feed de cambios para clientes con caché local ( /changes/?since= )
+    path('changes/', changes_view, name='changes'),
+
+    # 2f. Proyectos y tareas que se solapan con una ventana de fechas ( /timeline/?from=&to= )
+    path('timeline/', timeline_view, name='timeline'),
+
+    # 2g. Métricas por petición en formato Prometheus ( /metrics/ )
+    path('metrics/', metrics_view, name='metrics'),
+
     # 3. Rutas de Autenticación Personalizadas
     path('login/', login_view, name='login'),
     path('logout/', logout_view, name='logout'),
+    path('token/refresh/', token_refresh_view, name='token_refresh'),
+    path('token/revoke/', token_revoke_view, name='token_revoke'),
     path('password-reset/', password_reset_request_view, name='password_reset_request'),
     path('password-reset-confirm/', password_reset_confirm_view, name='password_reset_confirm'),
 ]
\ No newline at end of file
@@ -1,6 +1,8 @@
 from rest_framework import viewsets, permissions, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth import authenticate, login, logout, get_user_model
 from django.contrib.auth.forms import PasswordResetForm, SetPasswordForm
@@ -8,28 +10,96 @@ from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.conf import settings
-from django.core.mail import send_mail
-from django.db import models
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+from django.db import models, transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import timedelta
 
 from django.contrib.auth.models import User
-from .models import DashboardIndicator, Proyecto, Tarea
+from .models import DashboardIndicator, EstadoTarea, Proyecto, Tarea
+from .pagination import KeysetPagination
+from .bulk import crear_tareas, actualizar_tareas, eliminar_tareas
+from .eliminacion import eliminar_proyecto, eliminar_usuario
+from .correo import encolar_correo
+from .indicadores import repositorio_indicadores
+from .lectura import LecturaRapidaMixin
+from .busqueda import buscar, terminos
+from .cambios import CursorVencido, cambios_desde
+from .timeline import carriles, solapan
+from .exportacion import ExportacionMixin
+from .importacion import ImportacionMixin, ImportadorProyectos, ImportadorTareas
+from .inclusiones import InclusionesMixin
+from .replicas import LecturaReplicaMixin, lectura_en_replica
+from .etags import EtagColeccionMixin, calcular_etag, respuesta_condicional
+from .filtros import CamposParcialesMixin, FiltrosBackend
+from .metricas import exportar as exportar_metricas
+from .tokens import emitir_tokens, leer_token, refrescar_tokens, revocar, SAL_REFRESCO
 from .serializers import (
     UserSerializer,
     DashboardIndicatorSerializer,
     ProyectoSerializer,
+    ProyectoConInclusionesSerializer,
     TareaSerializer,
 )
 
+# -----------------
+# Reglas de visibilidad (compartidas por ViewSets y endpoints agregados)
+# -----------------
+def proyectos_visibles(user):
+    """
+    Proyectos que el usuario puede ver: todos si es staff, si no los que creó.
+    Los de baja diferida (ver eliminacion.py) ya no se ven.
+    """
+    proyectos = Proyecto.objects.filter(eliminado_at__isnull=True)
+    if user.is_staff:
+        return proyectos
+    return proyectos.filter(creador=user)
+
+
+def _sin_proyectos_eliminados(tareas):
+    # NOT IN sobre los proyectos de baja diferida (pocos, índice parcial
+    # proyecto_eliminado_idx); las tareas sin proyecto siguen visibles
+    return tareas.exclude(proyecto__in=Proyecto.objects.filter(eliminado_at__isnull=False).values('id'))
+
+
+def tareas_visibles(user):
+    """
+    Tareas que el usuario puede ver: todas si es staff, si no las de sus
+    proyectos o las que tiene asignadas. Las de proyectos de baja diferida
+    no las ve nadie, aunque estén asignadas.
+
+    En vez de un OR sobre el JOIN con Proyecto + DISTINCT, se filtra por
+    la UNION de dos búsquedas que usan los índices (asignado_a, created_at)
+    y (proyecto, created_at). El resultado sigue siendo un QuerySet normal.
+    """
+    if user.is_staff:
+        return _sin_proyectos_eliminados(Tarea.objects.all())
+    asignadas = _sin_proyectos_eliminados(Tarea.objects.filter(asignado_a=user)).values('id')
+    de_sus_proyectos = Tarea.objects.filter(
+        proyecto__in=Proyecto.objects.filter(creador=user, eliminado_at__isnull=True).values('id')
+    ).values('id')
+    return Tarea.objects.filter(id__in=asignadas.union(de_sus_proyectos))
+
 # -----------------
 # ViewSet para los Usuarios (Registro)
 # -----------------
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(LecturaReplicaMixin, viewsets.ModelViewSet):
     """
     API endpoint que permite ver y crear Usuarios.
     Sólo accesible para superusuarios.
     """
     queryset = User.objects.all().order_by('-date_joined')
     serializer_class = UserSerializer
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-date_joined', 'id')
+
+    def perform_destroy(self, instance):
+        # Tareas y proyectos en lotes (ver eliminacion.py), no con el Collector
+        eliminar_usuario(instance)
 
 
 # -----------------
@@ -38,19 +108,240 @@ class UserViewSet(viewsets.ModelViewSet):
 class DashboardIndicatorViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API endpoint que permite LEER (GET) los indicadores del dashboard.
+    Lee con pymongo + caché (ver indicadores.py); admite ?nombre=.
     """
     queryset = DashboardIndicator.objects.using('mongo').all()
     serializer_class = DashboardIndicatorSerializer
 
+    def list(self, request, *args, **kwargs):
+        return Response(repositorio_indicadores.listar(request.query_params.get('nombre')))
+
+    def retrieve(self, request, *args, **kwargs):
+        indicador = repositorio_indicadores.obtener(kwargs.get('pk'))
+        if indicador is None:
+            raise NotFound()
+        return Response(indicador)
+
+
+# -----------------
+# Resumen agregado del Dashboard
+# -----------------
+ACTIVIDAD_DIAS = 7
+TAREAS_SIN_PROYECTO_LIMITE = 20
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_summary_view(request):
+    """
+    Resumen del dashboard calculado en la base de datos (GROUP BY).
+    El tamaño de la respuesta no depende de la cantidad de tareas.
+    """
+    return Response(resumen_dashboard(request.user))
+
+
+def resumen_dashboard(user):
+    proyectos = proyectos_visibles(user)
+    tareas = tareas_visibles(user)
+
+    por_estado = {}
+    for fila in tareas.values('estado').annotate(total=models.Count('id')).order_by():
+        por_estado[EstadoTarea.clave(fila['estado'])] = fila['total']
+    total_tareas = sum(por_estado.values())
+    tareas_completadas = por_estado.get('done', 0)
+
+    # Actividad de los últimos días, agrupada por fecha de creación
+    hoy = timezone.localdate()
+    desde = hoy - timedelta(days=ACTIVIDAD_DIAS - 1)
+    actividad = {
+        desde + timedelta(days=i): {'proyectos': 0, 'tareas': 0}
+        for i in range(ACTIVIDAD_DIAS)
+    }
+    for clave, queryset in (('proyectos', proyectos), ('tareas', tareas)):
+        filas = (
+            queryset.filter(created_at__date__gte=desde)
+            .annotate(fecha=TruncDate('created_at'))
+            .values('fecha')
+            .annotate(total=models.Count('id'))
+            .order_by()
+        )
+        for fila in filas:
+            if fila['fecha'] in actividad:
+                actividad[fila['fecha']][clave] = fila['total']
+
+    sin_proyecto = tareas.filter(proyecto__isnull=True)
+    sin_proyecto_items = [
+        {'id': t['id'], 'title': t['title'], 'estado': EstadoTarea.clave(t['estado'])}
+        for t in sin_proyecto.order_by('-created_at').values('id', 'title', 'estado')[:TAREAS_SIN_PROYECTO_LIMITE]
+    ]
+
+    return {
+        'total_proyectos': proyectos.count(),
+        'total_tareas': total_tareas,
+        'tareas_completadas': tareas_completadas,
+        'tareas_pendientes': total_tareas - tareas_completadas,
+        'tareas_por_estado': [
+            {'estado': estado, 'total': total}
+            for estado, total in sorted(por_estado.items(), key=lambda item: -item[1])
+        ],
+        'actividad': [
+            {'fecha': fecha.isoformat(), **valores}
+            for fecha, valores in actividad.items()
+        ],
+        'tareas_sin_proyecto': {
+            'total': sin_proyecto.count(),
+            'items': sin_proyecto_items,
+        },
+    }
+
 
 # -----------------
 # Endpoint para obtener el usuario actual
 # -----------------
+@lectura_en_replica
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_current_user(request):
-    serializer = UserSerializer(request.user)
-    return Response(serializer.data)
+    user = request.user
+    etag = calcular_etag(user.pk, user.username, user.email, user.is_superuser)
+    return respuesta_condicional(request, etag, lambda: Response(UserSerializer(user).data))
+
+
+# -----------------
+# Búsqueda de texto completo ( /search/?q= )
+# -----------------
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_view(request):
+    """
+    Proyectos y tareas visibles que contienen todos los términos de ?q=
+    (como prefijos), ordenados por relevancia. ?tipo=proyectos|tareas
+    limita a una colección y ?limit= la cantidad por colección.
+    """
+    q = request.query_params.get('q', '')
+    if not terminos(q):
+        return Response({'error': 'Falta el texto a buscar (?q=).'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limite = min(int(request.query_params.get('limit', settings.BUSQUEDA_LIMITE)), settings.BUSQUEDA_LIMITE_MAX)
+    except ValueError:
+        return Response({'error': 'limit debe ser un número.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    colecciones = {
+        'proyectos': (proyectos_visibles, ProyectoSerializer),
+        'tareas': (tareas_visibles, TareaSerializer),
+    }
+    tipo = request.query_params.get('tipo')
+    if tipo is not None and tipo not in colecciones:
+        return Response({'error': f"tipo debe ser uno de: {', '.join(colecciones)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    resultado = {}
+    for nombre, (visibles, serializer_class) in colecciones.items():
+        if tipo in (None, nombre):
+            encontrados = list(buscar(visibles(request.user), q, max(limite, 1)))
+            datos = serializer_class(encontrados, many=True).data
+            resultado[nombre] = [dict(d, rango=round(o.rango, 6)) for o, d in zip(encontrados, datos)]
+    return Response(resultado)
+
+
+# -----------------
+# Feed de cambios ( /changes/?since= )
+# -----------------
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def changes_view(request):
+    """
+    Proyectos y tareas visibles creados, modificados o borrados después
+    de ?since= (ver api/cambios.py). Sin ?since= devuelve sólo el cursor
+    actual. 410 si el cursor es anterior a lo que guarda el outbox: el
+    cliente recarga las colecciones y sigue desde un cursor nuevo.
+    """
+    since = request.query_params.get('since')
+    try:
+        desde = None if since in (None, '') else int(since)
+    except ValueError:
+        return Response({'error': 'since debe ser un cursor numérico.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        return Response(cambios_desde(
+            request.user, desde,
+            visibles={'proyecto': proyectos_visibles, 'tarea': tareas_visibles},
+            serializers={'proyecto': ProyectoSerializer, 'tarea': TareaSerializer},
+        ))
+    except CursorVencido:
+        return Response({'error': 'Cursor vencido: recargar las colecciones.'}, status=status.HTTP_410_GONE)
+
+
+# -----------------
+# Línea de tiempo ( /timeline/?from=&to= )
+# -----------------
+def _fecha_param(request, nombre):
+    valor = request.query_params.get(nombre)
+    try:
+        return parse_date(valor) if valor else None
+    except ValueError:
+        return None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def timeline_view(request):
+    """
+    Proyectos y tareas visibles cuyas fechas se solapan con la ventana
+    ?from=&to= (días inclusive, ver api/timeline.py), en carriles por
+    proyecto. Como mucho TIMELINE_LIMITE filas por colección, por fecha de
+    inicio; ``truncado`` indica que quedaron filas afuera.
+    """
+    desde, hasta = _fecha_param(request, 'from'), _fecha_param(request, 'to')
+    if desde is None or hasta is None:
+        return Response({'error': 'from y to deben ser fechas AAAA-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
+    if desde > hasta:
+        return Response({'error': 'from no puede ser posterior a to.'}, status=status.HTTP_400_BAD_REQUEST)
+    if (hasta - desde).days >= settings.TIMELINE_MAX_DIAS:
+        return Response(
+            {'error': f'La ventana no puede superar {settings.TIMELINE_MAX_DIAS} días.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    limite = settings.TIMELINE_LIMITE
+    orden = ('inicio_linea', 'id')
+    proyectos = list(solapan(proyectos_visibles(request.user), desde, hasta).order_by(*orden)[:limite + 1])
+    tareas = list(solapan(tareas_visibles(request.user), desde, hasta).order_by(*orden)[:limite + 1])
+    truncado = len(proyectos) > limite or len(tareas) > limite
+    proyectos, tareas = proyectos[:limite], tareas[:limite]
+
+    # Proyectos fuera de la ventana con tareas dentro: el encabezado sólo si el usuario los ve
+    en_ventana = {proyecto.pk for proyecto in proyectos}
+    faltantes = {t.proyecto_id for t in tareas if t.proyecto_id is not None and t.proyecto_id not in en_ventana}
+    encabezados = proyectos_visibles(request.user).in_bulk(faltantes) if faltantes else {}
+
+    datos_proyectos = {d['id']: d for d in ProyectoSerializer([*proyectos, *encabezados.values()], many=True).data}
+    datos_tareas = {d['id']: d for d in TareaSerializer(tareas, many=True).data}
+    resultado = [
+        {
+            'proyecto_id': proyecto_id,
+            'proyecto': datos_proyectos.get(proyecto_id),
+            'tareas': [datos_tareas[tarea.pk] for tarea in lista],
+        }
+        for proyecto_id, lista in carriles(proyectos, tareas)
+    ]
+    return Response({'from': desde, 'to': hasta, 'truncado': truncado, 'carriles': resultado})
+
+
+# -----------------
+# Métricas del proceso en formato Prometheus ( /metrics/ )
+# -----------------
+@require_GET
+def metrics_view(request):
+    """
+    Vista Django simple (sin DRF) para que Prometheus la lea con
+    ``Authorization: Bearer <METRICAS_TOKEN>``; el staff con sesión también.
+    """
+    token = settings.METRICAS_TOKEN
+    autorizado = request.user.is_staff or (
+        token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    )
+    if not autorizado:
+        return HttpResponseForbidden()
+    return HttpResponse(exportar_metricas(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 # -----------------
@@ -67,6 +358,9 @@ def login_view(request):
 
     user = authenticate(request, username=username, password=password)
     if user is not None:
+        if request.data.get('modo') == 'token':
+            # Modo sin sesión: access + refresh token firmados
+            return Response({**UserSerializer(user).data, **emitir_tokens(user)}, status=status.HTTP_200_OK)
         login(request, user)
         serializer = UserSerializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -77,10 +371,44 @@ def login_view(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def logout_view(request):
+    if isinstance(request.auth, dict):
+        revocar(request.auth['jti'], settings.TOKEN_ACCESS_TTL)
     logout(request)
     return Response({"detail": "Logout exitoso."}, status=status.HTTP_204_NO_CONTENT)
 
 
+# -----------------
+# Tokens firmados (refresh / revocación)
+# -----------------
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def token_refresh_view(request):
+    refresh = request.data.get('refresh')
+    if not refresh:
+        return Response({'error': 'refresh es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        tokens = refrescar_tokens(refresh)
+    except AuthenticationFailed as exc:
+        return Response({'error': exc.detail}, status=status.HTTP_401_UNAUTHORIZED)
+    return Response(tokens, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def token_revoke_view(request):
+    refresh = request.data.get('refresh')
+    if not refresh:
+        return Response({'error': 'refresh es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        claims = leer_token(refresh, SAL_REFRESCO, settings.TOKEN_REFRESH_TTL)
+    except AuthenticationFailed as exc:
+        return Response({'error': exc.detail}, status=status.HTTP_401_UNAUTHORIZED)
+    revocar(claims['jti'], settings.TOKEN_REFRESH_TTL)
+    if isinstance(request.auth, dict):
+        revocar(request.auth['jti'], settings.TOKEN_ACCESS_TTL)
+    return Response({'detail': 'Token revocado.'}, status=status.HTTP_200_OK)
+
+
 # -----------------
 # Reseteo de contraseña
 # -----------------
@@ -104,11 +432,11 @@ def password_reset_request_view(request):
         token = default_token_generator.make_token(user)
         reset_link = f"{settings.FRONTEND_URL}/password-reset-confirm/{uidb64}/{token}"
 
-        send_mail(
-            subject="Reseteo de contraseña - Gestor de Proyectos",
-            message=f"Haz clic en este link para resetear tu contraseña: {reset_link}",
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email]
+        # Se encola: el worker `enviar_correos` lo envía fuera del request
+        encolar_correo(
+            asunto="Reseteo de contraseña - Gestor de Proyectos",
+            mensaje=f"Haz clic en este link para resetear tu contraseña: {reset_link}",
+            destinatarios=[email],
         )
         return Response({'detail': 'Email de reseteo enviado (si el usuario existe).'}, status=status.HTTP_200_OK)
     else:
@@ -142,36 +470,127 @@ def password_reset_confirm_view(request):
 # -----------------
 # ViewSets para Proyectos y Tareas
 # -----------------
-class ProyectoViewSet(viewsets.ModelViewSet):
+class EscrituraAtomicaMixin:
+    """
+    Ejecuta las escrituras dentro de una transacción, para que el cambio
+    y su evento del outbox (ver signals.py) se confirmen juntos.
+    """
+    @transaction.atomic
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+    @transaction.atomic
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
+
+
+class ProyectoViewSet(LecturaReplicaMixin, InclusionesMixin, EtagColeccionMixin, CamposParcialesMixin, LecturaRapidaMixin,
+                      ExportacionMixin, ImportacionMixin, EscrituraAtomicaMixin, viewsets.ModelViewSet):
     """
     CRUD para Proyectos.
+    Filtros: ?creador=, ?fecha_inicio_desde/hasta=, ?fecha_fin_desde/hasta=,
+    ?ordering= y ?fields= (campos parciales).
+    ?include=rollups,tasks (y ?tasks_limit=) embebe resúmenes y tareas.
+    /projects/export/?formato=csv|ndjson exporta todo en streaming y
+    /projects/import/ importa un archivo CSV/NDJSON.
+    DELETE borra las tareas en lotes (202 si la baja queda diferida).
     """
     queryset = Proyecto.objects.all()
     serializer_class = ProyectoSerializer
+    inclusiones_serializer_class = ProyectoConInclusionesSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-created_at', '-id')
+    nombre_exportacion = 'proyectos'
+    importador_class = ImportadorProyectos
+    filter_backends = [FiltrosBackend, OrderingFilter]
+    filtros = {
+        'creador': 'creador',
+        'fecha_inicio_desde': 'fecha_inicio__gte',
+        'fecha_inicio_hasta': 'fecha_inicio__lte',
+        'fecha_fin_desde': 'fecha_fin__gte',
+        'fecha_fin_hasta': 'fecha_fin__lte',
+    }
+    ordering_fields = ['id', 'name', 'fecha_inicio', 'fecha_fin', 'created_at']
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_staff:
-            return Proyecto.objects.all()
-        return Proyecto.objects.filter(creador=user)
+        return proyectos_visibles(self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(creador=self.request.user)
 
+    def destroy(self, request, *args, **kwargs):
+        """
+        Sin la transacción de EscrituraAtomicaMixin: las tareas se borran en
+        lotes, cada uno en la suya (ver eliminacion.py). 202 si el proyecto
+        es grande y lo termina de borrar `manage.py purgar_proyectos`.
+        """
+        proyecto = self.get_object()
+        if eliminar_proyecto(proyecto):
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response({'id': proyecto.pk, 'estado': 'eliminando'}, status=status.HTTP_202_ACCEPTED)
+
 
-class TareaViewSet(viewsets.ModelViewSet):
+class TareaViewSet(LecturaReplicaMixin, EtagColeccionMixin, CamposParcialesMixin, LecturaRapidaMixin, ExportacionMixin,
+                   ImportacionMixin, EscrituraAtomicaMixin, viewsets.ModelViewSet):
     """
     CRUD para Tareas.
+    Filtros: ?proyecto=, ?estado=, ?asignado_a= (admiten 'null' las FKs),
+    ?fecha_inicio_desde/hasta=, ?fecha_fin_desde/hasta=, ?ordering= y ?fields=.
+    /tasks/export/?formato=csv|ndjson exporta todo en streaming y
+    /tasks/import/ importa un archivo CSV/NDJSON.
     """
     queryset = Tarea.objects.all()
     serializer_class = TareaSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-created_at', '-id')
+    nombre_exportacion = 'tareas'
+    importador_class = ImportadorTareas
+    filter_backends = [FiltrosBackend, OrderingFilter]
+    filtros = {
+        'proyecto': 'proyecto',
+        'estado': 'estado',
+        'asignado_a': 'asignado_a',
+        'fecha_inicio_desde': 'fecha_inicio__gte',
+        'fecha_inicio_hasta': 'fecha_inicio__lte',
+        'fecha_fin_desde': 'fecha_fin__gte',
+        'fecha_fin_hasta': 'fecha_fin__lte',
+    }
+    ordering_fields = ['id', 'title', 'estado', 'fecha_inicio', 'fecha_fin', 'created_at']
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_staff:
-            return Tarea.objects.all()
-        return Tarea.objects.filter(
-            models.Q(proyecto__creador=user) | models.Q(asignado_a=user)
-        ).distinct()
\ No newline at end of file
+        return tareas_visibles(self.request.user)
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Crea (POST), actualiza (PATCH, cada item con 'id') o elimina (DELETE,
+        lista de ids) muchas tareas en una sola transacción.
+        Devuelve un resultado por item; 207 si alguno falló.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            return Response({'error': 'Se espera una lista de tareas.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.API_BULK_MAX_ITEMS:
+            return Response(
+                {'error': f'Máximo {settings.API_BULK_MAX_ITEMS} tareas por lote.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if request.method == 'POST':
+            resultados = crear_tareas(request.user, items)
+            codigo_ok = status.HTTP_201_CREATED
+        elif request.method == 'PATCH':
+            resultados = actualizar_tareas(request.user, items, self.get_queryset())
+            codigo_ok = status.HTTP_200_OK
+        else:
+            resultados = eliminar_tareas(request.user, items, self.get_queryset())
+            codigo_ok = status.HTTP_200_OK
+
+        todos_ok = all(r['status'] < 400 for r in resultados)
+        return Response(resultados, status=codigo_ok if todos_ok else status.HTTP_207_MULTI_STATUS)
@@ -0,0 +1,63 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+
+from .indicadores import repositorio_indicadores
+from .tokens import TokenFirmadoAuthentication
+from .views import resumen_dashboard
+
+"""
+Vistas asíncronas (se sirven por app/asgi.py).
+
+DRF no soporta vistas async, así que aquí se usan vistas de Django y la
+autenticación se resuelve a mano (token firmado o sesión).
+"""
+
+
+def _en_hilo(funcion):
+    """
+    Ejecuta ``funcion`` (código síncrono con ORM) en el pool de hilos, sin
+    bloquear el event loop, y libera la conexión si ya expiró.
+    """
+    def envoltura(*args, **kwargs):
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(envoltura, thread_sensitive=False)
+
+
+def _usuario_autenticado(request):
+    resultado = TokenFirmadoAuthentication().authenticate(request)
+    if resultado is not None:
+        return resultado[0]
+    return request.user if request.user.is_authenticated else None
+
+
+# -----------------
+# Dashboard completo (PostgreSQL + MongoDB en paralelo)
+# -----------------
+async def dashboard_view(request):
+    """
+    Resumen de proyectos/tareas e indicadores en una sola respuesta.
+    Los agregados de PostgreSQL corren en un hilo mientras los indicadores
+    se leen de MongoDB con el driver asíncrono.
+    """
+    # (require_GET de Django 3.2 no soporta vistas async)
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        user = await _en_hilo(_usuario_autenticado)(request)
+    except AuthenticationFailed as exc:
+        return JsonResponse({'detail': exc.detail}, status=401)
+    if user is None:
+        return JsonResponse({'detail': 'Las credenciales de autenticación no se proveyeron.'}, status=403)
+
+    resumen, indicadores = await asyncio.gather(
+        _en_hilo(resumen_dashboard)(user),
+        repositorio_indicadores.listar_async(asyncio.get_running_loop()),
+    )
+    return JsonResponse({'resumen': resumen, 'indicadores': indicadores})
@@ -9,8 +9,47 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
-application = get_asgi_application()
+
+class ManejadorASGI(ASGIHandler):
+    """
+    ASGIHandler que además envía las respuestas con ``contenido_async``
+    (exportaciones, ver api/exportacion.py) con ``async for``, sin bloquear
+    el event loop mientras se espera cada bloque.
+    """
+    async def send_response(self, response, send):
+        contenido = getattr(response, 'contenido_async', None)
+        if contenido is None:
+            return await super().send_response(response, send)
+
+        async def enviar(mensaje):
+            # Antes del mensaje final (sin more_body) van los bloques
+            if mensaje['type'] == 'http.response.body' and not mensaje.get('more_body'):
+                async for bloque in contenido:
+                    await send({'type': 'http.response.body', 'body': bloque, 'more_body': True})
+            await send(mensaje)
+
+        try:
+            await super().send_response(response, enviar)
+        finally:
+            # Si el cliente se fue a mitad, libera el hilo productor
+            await contenido.aclose()
+
+
+# Lo mismo que get_asgi_application(), con el handler propio
+django.setup(set_prefix=False)
+django_application = ManejadorASGI()
+
+# Después de configurar Django: importa modelos
+from api.sse import RUTA as RUTA_EVENTOS, app_eventos  # noqa: E402
+
+
+async def application(scope, receive, send):
+    # El canal SSE (/api/events/) es una app ASGI propia; el resto lo atiende Django
+    if scope['type'] == 'http' and scope['path'] == RUTA_EVENTOS:
+        return await app_eventos(scope, receive, send)
+    return await django_application(scope, receive, send)
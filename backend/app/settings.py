@@ -47,6 +47,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero: mide la petición completa (ver api/metricas.py)
+    'api.metricas.MetricasMiddleware',
+    # Réplicas de lectura: estado de ruteo por petición y adherencia tras escribir
+    'api.replicas.ReplicasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -88,7 +92,9 @@ DATABASES = {
         'USER': os.environ.get('DB_USER', 'postgres'),
         'HOST': os.environ.get('DB_HOST', 'db_postgres'), # <-- El nombre del servicio en Docker
         'PORT': 5432,
-        'PASSWORD': os.environ.get('DB_PASS', 'supersecretpass')
+        'PASSWORD': os.environ.get('DB_PASS', 'supersecretpass'),
+        # Conexiones persistentes entre requests (0 = cerrar al terminar cada request)
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
     },
     
     # Base de datos secundaria (Documental)
@@ -104,6 +110,117 @@ DATABASES = {
 }
 
 
+# Réplicas de lectura (ver api/replicas.py): DB_REPLICAS=host1,host2 con la misma
+# base y credenciales que 'default'. En los tests apuntan a la base de 'default'.
+DATABASES.update({
+    f'replica{i}': {**DATABASES['default'], 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'}}
+    for i, host in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(',')), 1)
+})
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica')]
+DATABASE_ROUTERS = ['api.replicas.RouterReplicas']
+# Quien escribe lee de la primaria durante estos segundos (más que el atraso esperado de las réplicas)
+REPLICAS_ADHERENCIA_SEGUNDOS = int(os.environ.get('REPLICAS_ADHERENCIA_SEGUNDOS', 5))
+
+
+# Django REST Framework: tokens firmados primero para no tocar la sesión
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'api.tokens.TokenFirmadoAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+}
+
+# Tokens firmados (ver api/tokens.py), en segundos
+TOKEN_ACCESS_TTL = int(os.environ.get('TOKEN_ACCESS_TTL', 5 * 60))
+TOKEN_REFRESH_TTL = int(os.environ.get('TOKEN_REFRESH_TTL', 7 * 24 * 60 * 60))
+TOKEN_REVOCACION_REFRESCO = 30
+
+# Paginación por cursor de la API (opcional, ver api/pagination.py)
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 100))
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 1000))
+
+# Filas leídas por bloque en el camino rápido de lectura (ver api/lectura.py)
+API_LECTURA_CHUNK_SIZE = int(os.environ.get('API_LECTURA_CHUNK_SIZE', 2000))
+
+# Operaciones masivas de tareas (/api/tasks/bulk/)
+API_BULK_MAX_ITEMS = int(os.environ.get('API_BULK_MAX_ITEMS', 5000))
+API_BULK_BATCH_SIZE = int(os.environ.get('API_BULK_BATCH_SIZE', 500))
+
+# Bajas de proyectos y usuarios (ver api/eliminacion.py): tareas por lote y tareas
+# a partir de las cuales un proyecto se marca y lo purga `manage.py purgar_proyectos` (0: nunca)
+API_ELIMINACION_LOTE = int(os.environ.get('API_ELIMINACION_LOTE', 5000))
+API_ELIMINACION_ASINCRONA = int(os.environ.get('API_ELIMINACION_ASINCRONA', 50000))
+
+# Búsqueda de texto completo (/api/search/, ver api/busqueda.py)
+BUSQUEDA_LIMITE = int(os.environ.get('BUSQUEDA_LIMITE', 20))
+BUSQUEDA_LIMITE_MAX = int(os.environ.get('BUSQUEDA_LIMITE_MAX', 100))
+
+# Tareas embebidas por proyecto con ?include=tasks (?tasks_limit=)
+API_INCLUDE_TAREAS = int(os.environ.get('API_INCLUDE_TAREAS', 5))
+API_INCLUDE_TAREAS_MAX = int(os.environ.get('API_INCLUDE_TAREAS_MAX', 50))
+
+# Línea de tiempo (/api/timeline/, ver api/timeline.py): días de la ventana y filas por colección
+TIMELINE_MAX_DIAS = int(os.environ.get('TIMELINE_MAX_DIAS', 366))
+TIMELINE_LIMITE = int(os.environ.get('TIMELINE_LIMITE', 1000))
+
+# Feed de cambios (/api/changes/, ver api/cambios.py)
+CAMBIOS_LIMITE = int(os.environ.get('CAMBIOS_LIMITE', 500))
+# Antigüedad mínima de un evento para entregarlo (cubre las transacciones en curso)
+CAMBIOS_MARGEN_SEGUNDOS = float(os.environ.get('CAMBIOS_MARGEN_SEGUNDOS', 2))
+
+# Canal de cambios en vivo (/api/events/, ver api/eventos.py y api/sse.py).
+# Con varios workers usar 'api.eventos.BrokerPostgres' (NOTIFY/LISTEN).
+EVENTOS_BROKER = os.environ.get('EVENTOS_BROKER', 'api.eventos.BrokerMemoria')
+EVENTOS_COLA = int(os.environ.get('EVENTOS_COLA', 1000))
+EVENTOS_LATIDO_SEGUNDOS = float(os.environ.get('EVENTOS_LATIDO_SEGUNDOS', 15))
+
+# Importación CSV/NDJSON (/api/<coleccion>/import/, `manage.py importar`)
+API_IMPORT_CHUNK_SIZE = int(os.environ.get('API_IMPORT_CHUNK_SIZE', 2000))
+API_IMPORT_MAX_ERRORES = int(os.environ.get('API_IMPORT_MAX_ERRORES', 1000))
+
+# Outbox de eventos (ver api/outbox.py y `manage.py procesar_outbox`)
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 500))
+OUTBOX_MAX_INTENTOS = int(os.environ.get('OUTBOX_MAX_INTENTOS', 10))
+OUTBOX_CONSUMERS = [
+    'api.outbox.consumidor_log',
+    'api.outbox.consumidor_webhook',
+    'api.indicadores.consumidor_indicadores',
+]
+OUTBOX_WEBHOOK_URL = os.environ.get('OUTBOX_WEBHOOK_URL', '')
+OUTBOX_WEBHOOK_TIMEOUT = 5
+# Segundos que un lote reclamado queda oculto a los otros workers; tiene que
+# cubrir la entrega del lote (hasta OUTBOX_WEBHOOK_TIMEOUT por intento)
+OUTBOX_LEASE = int(os.environ.get('OUTBOX_LEASE', 600))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api': {'handlers': ['console'], 'level': os.environ.get('API_LOG_LEVEL', 'INFO')},
+        # Una línea JSON por petición (INFO) y las que exceden el umbral de queries (WARNING)
+        'api.metricas': {'handlers': ['console'], 'level': os.environ.get('METRICAS_LOG_LEVEL', 'WARNING'), 'propagate': False},
+    },
+}
+
+# Métricas por petición (api/metricas.py, /api/metrics/)
+METRICAS_UMBRAL_QUERIES = int(os.environ.get('METRICAS_UMBRAL_QUERIES', 30))
+# Token para que Prometheus lea /api/metrics/ sin sesión (Authorization: Bearer <token>)
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN', '')
+
+
+# Caché local del proceso (indicadores del dashboard, ver api/indicadores.py)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+INDICADORES_CACHE_TTL = int(os.environ.get('INDICADORES_CACHE_TTL', 30))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -152,6 +269,17 @@ EMAIL_HOST = os.environ.get('EMAIL_HOST', 'mailhog') # <-- El nombre del servici
 EMAIL_PORT = os.environ.get('EMAIL_PORT', 1025) # <-- El puerto SMTP de Mailhog
 EMAIL_USE_TLS = False
 DEFAULT_FROM_EMAIL = 'no-reply@miempresaTI.com'
+# Evita que un servidor SMTP colgado bloquee al worker indefinidamente
+EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', 10))
+
+# Cola de correos (ver api/correo.py y `manage.py enviar_correos`)
+MAIL_QUEUE_BATCH_SIZE = int(os.environ.get('MAIL_QUEUE_BATCH_SIZE', 50))
+MAIL_QUEUE_MAX_INTENTOS = int(os.environ.get('MAIL_QUEUE_MAX_INTENTOS', 5))
+MAIL_QUEUE_BACKOFF = 30  # segundos antes del primer reintento (luego se duplica)
+MAIL_QUEUE_IDLE_CLOSE = 60  # segundos sin correos antes de cerrar la conexión SMTP
+# Segundos que un lote reclamado queda oculto a los otros workers; tiene que
+# cubrir el envío del lote completo (hasta EMAIL_TIMEOUT por correo)
+MAIL_QUEUE_LEASE = int(os.environ.get('MAIL_QUEUE_LEASE', 600))
 
 # URLS para construir los links de reseteo de contraseña
 # Le decimos a Django cuál es la URL de nuestro frontend
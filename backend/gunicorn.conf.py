@@ -0,0 +1,12 @@
+# Configuración de gunicorn para el modo de producción (ASGI con workers de uvicorn).
+# Uso: gunicorn -c gunicorn.conf.py app.asgi:application
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'uvicorn.workers.UvicornWorker'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+accesslog = '-'
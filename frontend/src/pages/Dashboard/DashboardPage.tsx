@@ -2,8 +2,8 @@ import React, { useEffect, useState, useCallback } from 'react';
 import { useAuth } from '../../hooks/useAuth';
 import { Link } from 'react-router-dom';
 import '../../assets/styles/dashboard/DashboardPage.css';
-import { getProyectosApi, getTareasApi } from '../../services/apiService';
-import type { Proyecto, Tarea } from '../../services/apiService';
+import { getDashboardSummaryApi } from '../../services/apiService';
+import type { DashboardSummary } from '../../services/apiService';
 
 // --- Importaciones para Gráficos e Iconos ---
 import { Doughnut, Line } from 'react-chartjs-2';
@@ -135,19 +135,16 @@ const LineChart: React.FC<LineChartProps> = ({ chartData }) => {
 // --- Componente Principal del Dashboard ---
 const DashboardPage: React.FC = () => {
   const { user, logout, isLoading: authLoading } = useAuth();
-  const [proyectos, setProyectos] = useState<Proyecto[]>([]);
-  const [tareas, setTareas] = useState<Tarea[]>([]);
+  const [summary, setSummary] = useState<DashboardSummary | null>(null);
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
 
-  // Lógica de carga de datos
+  // Lógica de carga de datos (los agregados se calculan en el servidor)
   const loadData = useCallback(async () => {
     try {
       setLoading(true);
       setError(null);
-      const [proj, tas] = await Promise.all([getProyectosApi(), getTareasApi()]);
-      setProyectos(Array.isArray(proj) ? proj : []);
-      setTareas(Array.isArray(tas) ? tas : []);
+      setSummary(await getDashboardSummaryApi());
     } catch (err: any) {
       console.error(err);
       setError(err?.message ?? 'Error cargando datos');
@@ -160,74 +157,41 @@ const DashboardPage: React.FC = () => {
     loadData();
   }, [loadData]);
 
-  // --- Lógica de Cálculo ---
-  
-  const tareasPorProyecto = (proyectoId: number | null | undefined) =>
-    tareas.filter((t) => (t.proyecto ?? null) === (proyectoId ?? null));
-
   // --- 1. KPIs ---
-  const totalProyectos = proyectos.length;
-  const totalTareas = tareas.length;
-
-  const normalizeStatus = (t: Tarea) => {
-    // Prioriza 'status' (del form) sobre 'estado' (default del modelo)
-    let raw = (t.status ?? t.estado ?? 'Sin estado').trim().toLowerCase();
-    if (raw === "") raw = "Sin estado";
-    return raw;
-  }
-  
-  const tareasCompletadas = tareas.filter(t => normalizeStatus(t) === 'done').length;
-  const tareasPendientes = totalTareas - tareasCompletadas;
+  const totalProyectos = summary?.total_proyectos ?? 0;
+  const totalTareas = summary?.total_tareas ?? 0;
+  const tareasCompletadas = summary?.tareas_completadas ?? 0;
+  const tareasPendientes = summary?.tareas_pendientes ?? 0;
 
   // --- 2. Gráfico Donut ---
-  const statusCounts: Record<string, number> = tareas.reduce((acc, t) => {
-    const raw = normalizeStatus(t); // Usa la función normalizada
-    acc[raw] = (acc[raw] || 0) + 1;
-    return acc;
-  }, {} as Record<string, number>);
-
-  const statusEntries = Object.entries(statusCounts).sort((a, b) => b[1] - a[1]);
+  const statusEntries: [string, number][] = (summary?.tareas_por_estado ?? [])
+    .map(({ estado, total }) => [estado, total] as [string, number]);
   const donutColors = ['#3498db', '#2ecc71', '#f1c40f', '#e67e22', '#e74c3c', '#9b59b6'];
 
   // --- 3. Gráfico de Líneas (Actividad Reciente) ---
-  
-  // Helper para agrupar datos por fecha
-  const groupDataByDate = (items: { created_at: string }[]) => {
-    return items.reduce((acc, item) => {
-      const date = item.created_at.split('T')[0]; // Obtiene solo 'YYYY-MM-DD'
-      acc[date] = (acc[date] || 0) + 1;
-      return acc;
-    }, {} as Record<string, number>);
-  };
-
-  const projectActivity = groupDataByDate(proyectos);
-  const taskActivity = groupDataByDate(tareas);
-
-  // Genera etiquetas para los últimos 7 días
-  const last7DaysLabels = [...Array(7)].map((_, i) => {
-    const d = new Date();
-    d.setDate(d.getDate() - i);
-    return d.toISOString().split('T')[0];
-  }).reverse(); // Ordena de más antiguo a más nuevo
+  const actividad = summary?.actividad ?? [];
 
   const lineChartData = {
-    labels: last7DaysLabels.map(d => new Date(d).toLocaleDateString('es-CL', { day: '2-digit', month: 'short' })),
+    labels: actividad.map(a => new Date(a.fecha).toLocaleDateString('es-CL', { day: '2-digit', month: 'short' })),
     datasets: [
       {
         label: 'Proyectos Creados',
-        data: last7DaysLabels.map(date => projectActivity[date] || 0),
+        data: actividad.map(a => a.proyectos),
         borderColor: 'rgb(52, 152, 219)',
         backgroundColor: 'rgba(52, 152, 219, 0.5)',
       },
       {
         label: 'Tareas Creadas',
-        data: last7DaysLabels.map(date => taskActivity[date] || 0),
+        data: actividad.map(a => a.tareas),
         borderColor: 'rgb(26, 188, 156)',
         backgroundColor: 'rgba(26, 188, 156, 0.5)',
       },
     ],
   };
 
+  // --- 4. Tareas sin Proyecto ---
+  const tareasSinProyecto = summary?.tareas_sin_proyecto.items ?? [];
+
   // --- Renderizado del Contenido ---
   const renderContent = () => {
     if (loading) {
@@ -324,12 +288,12 @@ const DashboardPage: React.FC = () => {
         </div>
         
         {/* --- Tareas sin Proyecto --- */}
-        {tareasPorProyecto(null).length > 0 && (
+        {tareasSinProyecto.length > 0 && (
           <section className="orphan-tasks">
             <h3>Tareas sin proyecto</h3>
             <ul>
-              {tareasPorProyecto(null).map((t) => (
-                <li key={t.id}>{t.title} {`(${prettyLabel(normalizeStatus(t))})`}</li>
+              {tareasSinProyecto.map((t) => (
+                <li key={t.id}>{t.title} {`(${prettyLabel(t.estado)})`}</li>
               ))}
             </ul>
           </section>
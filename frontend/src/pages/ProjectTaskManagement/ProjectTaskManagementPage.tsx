@@ -1,9 +1,9 @@
 import React, { useEffect, useState, useCallback } from "react";
 // Importamos los tipos y funciones de nuestro apiService
 import {
-  getProyectosApi,
-  getTareasApi,
   getUsuariosApi,
+  sincronizarApi,
+  suscribirCambiosApi,
 } from "../../services/apiService";
 import type { Proyecto, Tarea, User } from "../../services/apiService";
 import ModalProjectForm from "./ModalProjectForm";
@@ -23,13 +23,13 @@ export default function ProjectTaskManagementPage() {
   const loadAll = useCallback(async () => {
     try {
       setLoading(true);
-      const [p, t, u] = await Promise.all([
-        getProyectosApi(),
-        getTareasApi(),
+      // Después de la primera carga sólo viajan los cambios (ver sincronizarApi)
+      const [{ proyectos, tareas }, u] = await Promise.all([
+        sincronizarApi(),
         getUsuariosApi(),
       ]);
-      setProjects(p);
-      setTasks(t);
+      setProjects(proyectos);
+      setTasks(tareas);
       setUsers(u);
     } catch (err) {
       console.error(err);
@@ -43,6 +43,21 @@ export default function ProjectTaskManagementPage() {
     loadAll();
   }, [loadAll]); // Dependemos de loadAll
 
+  // Cambios de otros usuarios: llegan por SSE y se aplican sin "Cargando..."
+  useEffect(
+    () =>
+      suscribirCambiosApi(async () => {
+        try {
+          const { proyectos, tareas } = await sincronizarApi();
+          setProjects(proyectos);
+          setTasks(tareas);
+        } catch (err) {
+          console.error(err);
+        }
+      }),
+    [],
+  );
+
 
   function onProjectSaved() {
     setShowProjectModal(false);
@@ -11,6 +11,49 @@ export const apiService = axios.create({
   xsrfHeaderName: 'X-CSRFToken',
 });
 
+/* ===========================
+   Modo token (opcional, sin sesión)
+   =========================== */
+
+export interface TokenPair {
+  access: string;
+  refresh: string;
+}
+
+// Tokens en memoria; si es null se usa la sesión/CSRF de siempre
+let tokens: TokenPair | null = null;
+
+apiService.interceptors.request.use((config) => {
+  if (tokens) {
+    config.headers.set('Authorization', `Bearer ${tokens.access}`);
+  }
+  return config;
+});
+
+// Refresco en curso: los 401 en paralelo lo esperan en vez de pedir otro
+// (el refresh revoca el token anterior, un segundo pedido cerraría la sesión)
+let refrescoEnCurso: Promise<void> | null = null;
+
+const refrescarUnaVez = (): Promise<void> => {
+  if (!refrescoEnCurso) {
+    refrescoEnCurso = refreshTokenApi().finally(() => {
+      refrescoEnCurso = null;
+    });
+  }
+  return refrescoEnCurso;
+};
+
+// Si el access token expiró, se refresca una vez y se reintenta la petición
+apiService.interceptors.response.use(undefined, async (error) => {
+  const original: any = error.config;
+  if (tokens && error.response?.status === 401 && original && !original._reintento && !original.url?.includes('/token/')) {
+    original._reintento = true;
+    await refrescarUnaVez();
+    return apiService(original);
+  }
+  return Promise.reject(error);
+});
+
 /* ===========================
    Tipos (TypeScript)
    =========================== */
@@ -57,6 +100,29 @@ export interface Tarea {
 }
 export type TareaFormData = Omit<Tarea, 'id' | 'created_at'>;
 
+/* Filtros del servidor (ver filtros de ProyectoViewSet / TareaViewSet) */
+export interface FiltrosComunes {
+  fecha_inicio_desde?: string;
+  fecha_inicio_hasta?: string;
+  fecha_fin_desde?: string;
+  fecha_fin_hasta?: string;
+  ordering?: string;
+  fields?: string[];
+}
+export interface ProyectoFiltros extends FiltrosComunes {
+  creador?: number;
+}
+export type InclusionProyecto = 'rollups' | 'tasks';
+export interface ProyectoInclusionFiltros extends ProyectoFiltros {
+  include: InclusionProyecto[];
+  tasks_limit?: number;
+}
+export interface TareaFiltros extends FiltrosComunes {
+  proyecto?: number | 'null';
+  estado?: string;
+  asignado_a?: number | 'null';
+}
+
 export interface PasswordResetData {
   email: string;
 }
@@ -72,10 +138,144 @@ export interface DashboardIndicator {
   valor: number;
 }
 
+export interface DashboardSummary {
+  total_proyectos: number;
+  total_tareas: number;
+  tareas_completadas: number;
+  tareas_pendientes: number;
+  tareas_por_estado: { estado: string; total: number }[];
+  actividad: { fecha: string; proyectos: number; tareas: number }[];
+  tareas_sin_proyecto: {
+    total: number;
+    items: { id: number; title: string; estado: string }[];
+  };
+}
+
+export interface BulkResult<T> {
+  index: number;
+  status: number;
+  data?: T;
+  errors?: Record<string, unknown>;
+}
+
+export interface ResultadoBusqueda {
+  proyectos?: (Proyecto & { rango: number })[];
+  tareas?: (Tarea & { rango: number })[];
+}
+
+/* Proyecto con ?include=rollups,tasks (sólo vienen los pedidos) */
+export interface ProyectoRollups {
+  total: number;
+  por_estado: { todo: number; in_progress: number; done: number };
+  vencidas: number;
+  proxima_fecha_fin: string | null;
+}
+export interface ProyectoConInclusiones extends Proyecto {
+  rollups?: ProyectoRollups;
+  tareas?: Tarea[];
+}
+
+/* Línea de tiempo: un carril por proyecto (proyecto null si no es visible; proyecto_id null: sin proyecto) */
+export interface CarrilTimeline {
+  proyecto_id: number | null;
+  proyecto: Proyecto | null;
+  tareas: Tarea[];
+}
+export interface Timeline {
+  from: string;
+  to: string;
+  truncado: boolean;
+  carriles: CarrilTimeline[];
+}
+
+export interface Cambio {
+  seq: number;
+  tipo: 'proyecto' | 'tarea';
+  id: number;
+  accion: 'upsert' | 'delete';
+  data?: Proyecto | Tarea;
+}
+
+export interface PaginaCambios {
+  cursor: number;
+  mas: boolean;
+  cambios: Cambio[];
+}
+
+export interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
 /* ===========================
    Funciones de API (exportadas)
    =========================== */
 
+/* --- Peticiones condicionales (ETag / If-None-Match) --- */
+
+// Última respuesta conocida por URL, con su validador
+const etagCache = new Map<string, { etag: string; data: unknown }>();
+
+/* GET que reenvía el ETag guardado; si el servidor responde 304 devuelve los datos en caché */
+const getConValidadorApi = async <T>(url: string): Promise<T> => {
+  const previo = etagCache.get(url);
+  const response = await apiService.get<T>(url, {
+    headers: previo ? { 'If-None-Match': previo.etag } : undefined,
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+  });
+  if (response.status === 304 && previo) {
+    return previo.data as T;
+  }
+  const etag = response.headers['etag'];
+  if (etag) {
+    etagCache.set(url, { etag, data: response.data });
+  }
+  return response.data;
+};
+
+/* Arma la URL con los filtros como query string (la URL es la clave de la caché) */
+const conFiltros = (path: string, filtros: FiltrosComunes = {}): string => {
+  const params = new URLSearchParams();
+  Object.entries(filtros).forEach(([clave, valor]) => {
+    if (valor === undefined || valor === null) return;
+    params.set(clave, Array.isArray(valor) ? valor.join(',') : String(valor));
+  });
+  const query = params.toString();
+  return query ? `${path}?${query}` : path;
+};
+
+export const limpiarCacheApi = (): void => {
+  etagCache.clear();
+  replica = null;
+};
+
+/* --- Paginación por cursor (opcional) --- */
+
+const extraerCursor = (url: string | null): string | null =>
+  url ? new URL(url, window.location.origin).searchParams.get('cursor') : null;
+
+export const getPaginaApi = async <T>(
+  path: string,
+  pageSize = 100,
+  cursor: string | null = null,
+): Promise<CursorPage<T>> => {
+  const params: Record<string, string | number> = { page_size: pageSize };
+  if (cursor) params.cursor = cursor;
+  const { data } = await apiService.get<CursorPage<T>>(path, { params });
+  return data;
+};
+
+/* Recorre todas las páginas de una colección, entregando una página a la vez */
+export async function* iterarPaginasApi<T>(path: string, pageSize = 100): AsyncGenerator<T[]> {
+  let cursor: string | null = null;
+  do {
+    const page: CursorPage<T> = await getPaginaApi<T>(path, pageSize, cursor);
+    yield page.results;
+    cursor = extraerCursor(page.next);
+  } while (cursor);
+}
+
 /* --- Autenticación --- */
 
 export const loginApi = async (credentials: LoginCredentials): Promise<void> => {
@@ -83,14 +283,35 @@ export const loginApi = async (credentials: LoginCredentials): Promise<void> =>
 };
 
 export const logoutApi = async (): Promise<void> => {
-  await apiService.post('/logout/');
+  if (tokens) {
+    await apiService.post('/token/revoke/', { refresh: tokens.refresh });
+    tokens = null;
+  } else {
+    await apiService.post('/logout/');
+  }
+  limpiarCacheApi();
 };
 
-export const getCurrentUserApi = async (): Promise<User> => {
-  const { data } = await apiService.get<User>('/me/');
+/* Login sin sesión: guarda access/refresh token en memoria */
+export const loginTokenApi = async (credentials: LoginCredentials): Promise<User> => {
+  const { data } = await apiService.post<User & TokenPair>('/login/', { ...credentials, modo: 'token' });
+  tokens = { access: data.access, refresh: data.refresh };
   return data;
 };
 
+export const refreshTokenApi = async (): Promise<void> => {
+  if (!tokens) return;
+  try {
+    const { data } = await apiService.post<TokenPair>('/token/refresh/', { refresh: tokens.refresh });
+    tokens = data;
+  } catch (err) {
+    tokens = null;
+    throw err;
+  }
+};
+
+export const getCurrentUserApi = async (): Promise<User> => getConValidadorApi<User>('/me/');
+
 /* --- Reseteo de contraseña --- */
 
 export const resetPasswordApi = async (emailData: PasswordResetData): Promise<void> => {
@@ -113,6 +334,8 @@ export const getUsuariosApi = async (): Promise<User[]> => {
   return data;
 };
 
+export const streamUsuariosApi = (pageSize = 100) => iterarPaginasApi<User>('/users/', pageSize);
+
 export const getUsuarioByIdApi = async (id: number): Promise<User> => {
   const { data } = await apiService.get<User>(`/users/${id}/`);
   return data;
@@ -134,6 +357,18 @@ export const getDashboardDataApi = async (): Promise<DashboardIndicator[]> => {
   return data;
 };
 
+/* Resumen agregado calculado en el servidor (tamaño constante) */
+export const getDashboardSummaryApi = async (): Promise<DashboardSummary> => {
+  const { data } = await apiService.get<DashboardSummary>('/dashboard/summary/');
+  return data;
+};
+
+/* Resumen + indicadores de MongoDB en una sola petición (vista asíncrona) */
+export const getDashboardCompletoApi = async (): Promise<{ resumen: DashboardSummary; indicadores: DashboardIndicator[] }> => {
+  const { data } = await apiService.get<{ resumen: DashboardSummary; indicadores: DashboardIndicator[] }>('/dashboard/');
+  return data;
+};
+
 /* Alias / alternativa usando fetch si se prefiere (mantener compatibilidad) */
 export const getMongoData = async (): Promise<DashboardIndicator[]> => {
   const { data } = await apiService.get<DashboardIndicator[]>('/dashboard-stats/');
@@ -142,10 +377,16 @@ export const getMongoData = async (): Promise<DashboardIndicator[]> => {
 
 /* --- CRUD Proyectos --- */
 
-export const getProyectosApi = async (): Promise<Proyecto[]> => {
-  const { data } = await apiService.get<Proyecto[]>('/projects/');
-  return data;
-};
+export const getProyectosApi = async (filtros: ProyectoFiltros = {}): Promise<Proyecto[]> =>
+  getConValidadorApi<Proyecto[]>(conFiltros('/projects/', filtros));
+
+// Proyectos con sus totales y/o sus últimas tareas en una sola petición
+export const getProyectosConInclusionesApi = async (
+  filtros: ProyectoInclusionFiltros,
+): Promise<ProyectoConInclusiones[]> =>
+  getConValidadorApi<ProyectoConInclusiones[]>(conFiltros('/projects/', filtros));
+
+export const streamProyectosApi = (pageSize = 100) => iterarPaginasApi<Proyecto>('/projects/', pageSize);
 
 export const createProyectoApi = async (proyectoData: Partial<ProyectoFormData>): Promise<Proyecto> => {
   const { data } = await apiService.post<Proyecto>('/projects/', proyectoData);
@@ -163,10 +404,10 @@ export const deleteProyectoApi = async (id: number): Promise<void> => {
 
 /* --- CRUD Tareas --- */
 
-export const getTareasApi = async (): Promise<Tarea[]> => {
-  const { data } = await apiService.get<Tarea[]>('/tasks/');
-  return data;
-};
+export const getTareasApi = async (filtros: TareaFiltros = {}): Promise<Tarea[]> =>
+  getConValidadorApi<Tarea[]>(conFiltros('/tasks/', filtros));
+
+export const streamTareasApi = (pageSize = 100) => iterarPaginasApi<Tarea>('/tasks/', pageSize);
 
 export const createTareaApi = async (tareaData: Partial<TareaFormData>): Promise<Tarea> => {
   const { data } = await apiService.post<Tarea>('/tasks/', tareaData);
@@ -182,26 +423,196 @@ export const deleteTareaApi = async (id: number): Promise<void> => {
   await apiService.delete(`/tasks/${id}/`);
 };
 
+/* --- Operaciones masivas de Tareas (una transacción por lote) --- */
+
+export const createTareasBulkApi = async (tareas: Partial<TareaFormData>[]): Promise<BulkResult<Tarea>[]> => {
+  const { data } = await apiService.post<BulkResult<Tarea>[]>('/tasks/bulk/', tareas);
+  return data;
+};
+
+export const updateTareasBulkApi = async (
+  tareas: (Partial<TareaFormData> & { id: number })[],
+): Promise<BulkResult<Tarea>[]> => {
+  const { data } = await apiService.patch<BulkResult<Tarea>[]>('/tasks/bulk/', tareas);
+  return data;
+};
+
+export const deleteTareasBulkApi = async (ids: number[]): Promise<BulkResult<never>[]> => {
+  const { data } = await apiService.delete<BulkResult<never>[]>('/tasks/bulk/', { data: ids });
+  return data;
+};
+
+/* Búsqueda de texto completo (términos como prefijos, por relevancia) */
+export const buscarApi = async (
+  q: string,
+  tipo?: 'proyectos' | 'tareas',
+  limit?: number,
+): Promise<ResultadoBusqueda> => {
+  const { data } = await apiService.get<ResultadoBusqueda>('/search/', { params: { q, tipo, limit } });
+  return data;
+};
+
+/* Proyectos y tareas que se solapan con [from, to] (fechas AAAA-MM-DD, inclusive) */
+export const getTimelineApi = async (from: string, to: string): Promise<Timeline> => {
+  const { data } = await apiService.get<Timeline>('/timeline/', { params: { from, to } });
+  return data;
+};
+
+/* --- Feed de cambios: réplica local de proyectos y tareas parchada con deltas --- */
+
+interface Replica {
+  cursor: number;
+  proyectos: Map<number, Proyecto>;
+  tareas: Map<number, Tarea>;
+}
+
+// Proyectos y tareas visibles, al día hasta `cursor`
+let replica: Replica | null = null;
+
+/* Sin `since` devuelve sólo el cursor actual; 410 si el cursor ya venció */
+export const getCambiosApi = async (since?: number): Promise<PaginaCambios> => {
+  const { data } = await apiService.get<PaginaCambios>('/changes/', {
+    params: since === undefined ? undefined : { since },
+  });
+  return data;
+};
+
+const aplicarCambios = (destino: Replica, cambios: Cambio[]): void => {
+  cambios.forEach((cambio) => {
+    if (cambio.tipo === 'proyecto') {
+      if (cambio.accion === 'upsert') {
+        destino.proyectos.set(cambio.id, cambio.data as Proyecto);
+        return;
+      }
+      destino.proyectos.delete(cambio.id);
+      // Las tareas del proyecto se borran en cascada
+      destino.tareas.forEach((tarea, id) => {
+        if (tarea.proyecto === cambio.id) destino.tareas.delete(id);
+      });
+    } else if (cambio.accion === 'upsert') {
+      destino.tareas.set(cambio.id, cambio.data as Tarea);
+    } else {
+      destino.tareas.delete(cambio.id);
+    }
+  });
+};
+
+const cargarReplica = async (): Promise<Replica> => {
+  // El cursor se pide antes de cargar: lo que cambie entretanto vuelve a llegar como delta
+  const { cursor } = await getCambiosApi();
+  const [proyectos, tareas] = await Promise.all([getProyectosApi(), getTareasApi()]);
+  return {
+    cursor,
+    proyectos: new Map(proyectos.map((p) => [p.id, p])),
+    tareas: new Map(tareas.map((t) => [t.id, t])),
+  };
+};
+
+// Mismo orden que la API: más recientes primero
+const porCreacion = (a: { id: number; created_at: string }, b: { id: number; created_at: string }): number =>
+  b.created_at.localeCompare(a.created_at) || b.id - a.id;
+
+const sincronizar = async (): Promise<{ proyectos: Proyecto[]; tareas: Tarea[] }> => {
+  let actual = replica;
+  if (!actual) {
+    actual = await cargarReplica();
+  } else {
+    try {
+      let pagina: PaginaCambios;
+      do {
+        pagina = await getCambiosApi(actual.cursor);
+        aplicarCambios(actual, pagina.cambios);
+        actual.cursor = pagina.cursor;
+      } while (pagina.mas);
+    } catch (err: any) {
+      if (err.response?.status !== 410) throw err;
+      actual = await cargarReplica();
+    }
+  }
+  replica = actual;
+  return {
+    proyectos: Array.from(actual.proyectos.values()).sort(porCreacion),
+    tareas: Array.from(actual.tareas.values()).sort(porCreacion),
+  };
+};
+
+// Una sincronización a la vez: dos en paralelo podrían aplicar deltas fuera de orden
+let sincronizacion: Promise<unknown> = Promise.resolve();
+
+/* Primera vez carga las colecciones completas; después sólo pide los cambios desde el cursor */
+export const sincronizarApi = (): Promise<{ proyectos: Proyecto[]; tareas: Tarea[] }> => {
+  const siguiente = sincronizacion.then(sincronizar, sincronizar);
+  sincronizacion = siguiente.catch(() => undefined);
+  return siguiente;
+};
+
+/* --- Canal de cambios en vivo (SSE) --- */
+
+/*
+ * Avisa (agrupando ráfagas) cada vez que llega un cambio visible o se
+ * reconecta el canal; quien llama vuelve a sincronizar con sincronizarApi.
+ * EventSource no envía cabeceras: en modo token no hay canal y se sigue
+ * sincronizando a pedido. Devuelve la función para cerrar el canal.
+ */
+export const suscribirCambiosApi = (alCambiar: () => void, esperaMs = 250): (() => void) => {
+  if (tokens || typeof EventSource === 'undefined') return () => {};
+  const fuente = new EventSource('/api/events/', { withCredentials: true });
+  let pendiente: ReturnType<typeof setTimeout> | null = null;
+  const avisar = () => {
+    if (pendiente) return;
+    pendiente = setTimeout(() => {
+      pendiente = null;
+      alCambiar();
+    }, esperaMs);
+  };
+  fuente.onmessage = avisar;
+  // Tras una reconexión pudo perderse algo: /changes/ lo recupera
+  fuente.onopen = avisar;
+  return () => {
+    if (pendiente) clearTimeout(pendiente);
+    fuente.close();
+  };
+};
+
 export default {
   apiService,
+  limpiarCacheApi,
+  getPaginaApi,
+  iterarPaginasApi,
   loginApi,
+  loginTokenApi,
+  refreshTokenApi,
   logoutApi,
   getCurrentUserApi,
   resetPasswordApi,
   confirmPasswordResetApi,
   createUsuarioApi,
   getUsuariosApi,
+  streamUsuariosApi,
   getUsuarioByIdApi,
   updateUsuarioApi,
   deleteUsuarioApi,
   getDashboardDataApi,
+  getDashboardSummaryApi,
+  getDashboardCompletoApi,
   getMongoData,
   getProyectosApi,
+  getProyectosConInclusionesApi,
+  streamProyectosApi,
   createProyectoApi,
   updateProyectoApi,
   deleteProyectoApi,
   getTareasApi,
+  streamTareasApi,
   createTareaApi,
   updateTareaApi,
   deleteTareaApi,
+  createTareasBulkApi,
+  updateTareasBulkApi,
+  deleteTareasBulkApi,
+  buscarApi,
+  getTimelineApi,
+  getCambiosApi,
+  sincronizarApi,
+  suscribirCambiosApi,
 };
\ No newline at end of file